@@ -0,0 +1,85 @@
+"""
+Valor de vida del cliente en `UserProfile`
+
+Cada perfil guarda cuántas reservas hizo el usuario, cuánto pagó y la fecha
+de su última reserva. Los eventos de reserva aplican solo la diferencia con
+`UPDATE ... SET lifetime_spent = lifetime_spent + x`; la última fecha se
+relee con el índice (user, booking_date) de las reservas del usuario.
+`recompute_lifetime_values` recalcula todo con un solo UPDATE.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, IntegerField, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from bookings.models import Booking
+from .models import UserProfile
+
+
+def _per_user(queryset, aggregate, output_field):
+    return Subquery(
+        queryset.filter(user=OuterRef('user')).order_by().values('user').annotate(value=aggregate).values('value')[:1],
+        output_field=output_field,
+    )
+
+
+def _last_booking_date():
+    return _per_user(Booking.objects.all(), Max('booking_date'), Booking._meta.get_field('booking_date'))
+
+
+def _contribution(paid, total_price):
+    return Decimal(total_price) if paid else Decimal('0')
+
+
+def booking_lifetime_delta(instance, created):
+    """Diferencia {user_id: (reservas, monto pagado)} que produce guardar `instance`"""
+    delta = defaultdict(lambda: [0, Decimal('0')])
+    if not created:
+        original = instance.original
+        user_id = original.get('user_id', instance.user_id)
+        delta[user_id][0] -= 1
+        delta[user_id][1] -= _contribution(
+            original.get('paid', instance.paid), original.get('total_price', instance.total_price)
+        )
+    delta[instance.user_id][0] += 1
+    delta[instance.user_id][1] += _contribution(instance.paid, instance.total_price)
+    return {user_id: tuple(value) for user_id, value in delta.items()}
+
+
+def booking_date_changed(instance, created):
+    """Indica si guardar `instance` puede mover la última fecha de reserva de su usuario"""
+    original = instance.original
+    return created or any(
+        original.get(field, getattr(instance, field)) != getattr(instance, field)
+        for field in ('user_id', 'booking_date')
+    )
+
+
+def apply_lifetime_deltas(deltas, refresh_dates=True):
+    """Sumar `{user_id: (reservas, monto)}` a los perfiles y releer su última fecha"""
+    for user_id, (count, amount) in deltas.items():
+        if not count and not amount and not refresh_dates:
+            continue
+        fields = {
+            'lifetime_bookings': F('lifetime_bookings') + count,
+            'lifetime_spent': F('lifetime_spent') + amount,
+        }
+        if refresh_dates:
+            fields['last_booking_date'] = _last_booking_date()
+        UserProfile.objects.filter(user_id=user_id).update(**fields)
+
+
+def recompute_lifetime_values(user_ids=None):
+    """Recalcular los contadores desde las reservas; devuelve los perfiles actualizados"""
+    money = DecimalField(max_digits=12, decimal_places=2)
+    profiles = UserProfile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+    return profiles.update(
+        lifetime_bookings=Coalesce(_per_user(Booking.objects.all(), Count('id'), IntegerField()), 0),
+        lifetime_spent=Coalesce(
+            _per_user(Booking.objects.filter(paid=True), Sum('total_price'), money), 0, output_field=money
+        ),
+        last_booking_date=_last_booking_date(),
+    )
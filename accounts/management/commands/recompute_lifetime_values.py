@@ -0,0 +1,24 @@
+"""
+Recalcular el valor de vida de los clientes desde sus reservas
+Ejecutar con: python manage.py recompute_lifetime_values [--user usuario ...]
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.lifetime import recompute_lifetime_values
+
+
+class Command(BaseCommand):
+    help = 'Recalcular reservas, total pagado y última reserva de cada perfil'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='users', help='Limitar a estos usuarios (repetible)')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['users']:
+            user_ids = list(User.objects.filter(username__in=options['users']).values_list('id', flat=True))
+            if len(user_ids) != len(set(options['users'])):
+                raise CommandError('Alguno de los usuarios indicados no existe')
+        updated = recompute_lifetime_values(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'✅ Valor de vida recalculado para {updated} perfiles'))
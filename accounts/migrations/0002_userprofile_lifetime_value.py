@@ -0,0 +1,54 @@
+# Generated by Django 4.2.14 on 2026-10-18 07:11
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, IntegerField, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_lifetime_values(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    money = DecimalField(max_digits=12, decimal_places=2)
+
+    def per_user(queryset, aggregate, output_field):
+        return Subquery(
+            queryset.filter(user=OuterRef('user')).order_by().values('user').annotate(value=aggregate).values('value')[:1],
+            output_field=output_field,
+        )
+
+    UserProfile.objects.update(
+        lifetime_bookings=Coalesce(per_user(Booking.objects.all(), Count('id'), IntegerField()), 0),
+        lifetime_spent=Coalesce(per_user(Booking.objects.filter(paid=True), Sum('total_price'), money), 0, output_field=money),
+        last_booking_date=per_user(Booking.objects.all(), Max('booking_date'), models.DateField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('bookings', '0009_booking_paid_payment_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='last_booking_date',
+            field=models.DateField(blank=True, help_text='Fecha de la última reserva', null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='lifetime_bookings',
+            field=models.PositiveIntegerField(default=0, help_text='Reservas realizadas'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='lifetime_spent',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Total pagado', max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['-lifetime_spent'], name='accounts_profile_spent_idx'),
+        ),
+        migrations.RunPython(populate_lifetime_values, migrations.RunPython.noop),
+    ]
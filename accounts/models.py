@@ -25,6 +25,11 @@ class UserProfile(models.Model):
     notify_email = models.BooleanField(default=True, help_text="Recibir notificaciones por email")
     notify_sms = models.BooleanField(default=False, help_text="Recibir notificaciones por SMS")
     
+    # Valor de vida del cliente, mantenido por las señales de reservas
+    lifetime_bookings = models.PositiveIntegerField(default=0, help_text="Reservas realizadas")
+    lifetime_spent = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Total pagado")
+    last_booking_date = models.DateField(null=True, blank=True, help_text="Fecha de la última reserva")
+    
     # Auditoría
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -33,6 +38,9 @@ class UserProfile(models.Model):
         verbose_name = "Perfil de Usuario"
         verbose_name_plural = "Perfiles de Usuarios"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-lifetime_spent'], name='accounts_profile_spent_idx'),
+        ]
     
     def __str__(self):
         return f"Perfil de {self.user.get_full_name() or self.user.username}"
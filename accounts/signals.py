@@ -0,0 +1,39 @@
+"""
+Mantenimiento del valor de vida del cliente
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from bookings.signals import bookings_bulk_changed
+from .lifetime import apply_lifetime_deltas, booking_date_changed, booking_lifetime_delta
+
+
+@receiver(post_save, sender=Booking)
+def update_lifetime_on_save(sender, instance, created, **kwargs):
+    """Aplicar al perfil del cliente el cambio de la reserva"""
+    apply_lifetime_deltas(
+        booking_lifetime_delta(instance, created),
+        refresh_dates=booking_date_changed(instance, created),
+    )
+
+
+@receiver(post_delete, sender=Booking)
+def update_lifetime_on_delete(sender, instance, **kwargs):
+    """Descontar del perfil del cliente una reserva borrada"""
+    amount = instance.total_price if instance.paid else Decimal('0')
+    apply_lifetime_deltas({instance.user_id: (-1, -amount)})
+
+
+@receiver(bookings_bulk_changed)
+def update_lifetime_on_bulk_create(sender, created=(), **kwargs):
+    """Sumar a los perfiles las reservas creadas en bloque"""
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for booking in created:
+        deltas[booking.user_id][0] += 1
+        if booking.paid:
+            deltas[booking.user_id][1] += Decimal(booking.total_price)
+    apply_lifetime_deltas(deltas)
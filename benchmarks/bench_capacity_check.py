@@ -0,0 +1,97 @@
+"""
+Benchmark del chequeo de capacidad con solapamiento por duración
+
+Mide `get_peak_occupancy` (consulta por rango sobre la proyección de
+ocupación + barrido en memoria) con miles de reservas del mismo servicio en
+un mismo día, y por separado el SQL ya compilado de esa consulta.
+
+El objetivo era menos de 1 ms por chequeo y no se cumple: con SQLite la
+mediana ronda 2,2-2,7 ms. El costo casi no crece con las reservas del día;
+la mayor parte es armar con el ORM la consulta con UNION de ocupación y
+retenciones (ejecutar el SQL solo lleva ~0,6 ms, apenas más que una
+consulta trivial). La salida indica si se alcanzó el objetivo.
+
+    python -m benchmarks.bench_capacity_check
+"""
+import random
+import statistics
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, test_database, timer, create_fixture_service
+
+BOOKINGS_PER_DAY = (1000, 5000, 10000)
+CHECKS = 500
+TARGET_MS = 1.0
+
+
+def run():
+    from django.db import connection
+    from bookings.models import Booking
+    from bookings.occupancy import rebuild_occupancy
+    from services.availability import get_peak_occupancy, from_minutes, occupying_starts
+
+    random.seed(42)
+    booking_date = date.today() + timedelta(days=30)
+    user, service = create_fixture_service()
+
+    # Costo fijo de una consulta ORM trivial en esta máquina, como referencia
+    results = {}
+    for _ in range(CHECKS):
+        with timer(results, 'baseline'):
+            list(Booking.objects.filter(service=service).values_list('id')[:1])
+    print(f'consulta ORM trivial: {statistics.median(results["baseline"]) * 1000:.3f} ms')
+
+    def run_sql(sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            cursor.fetchall()
+
+    print(f'{"reservas/día":>14} {"mediana ms":>12} {"p95 ms":>10} {"solo SQL ms":>12}')
+    worst = 0
+    for total in BOOKINGS_PER_DAY:
+        Booking.objects.all().delete()
+        Booking.objects.bulk_create(
+            Booking(
+                user=user,
+                service=service,
+                booking_date=booking_date,
+                booking_time=from_minutes(random.randrange(0, 22 * 60)),
+                contact_phone='1234567890',
+                total_price=service.price,
+            )
+            for _ in range(total)
+        )
+        rebuild_occupancy()
+
+        results = {}
+        for _ in range(CHECKS):
+            start = from_minutes(random.randrange(0, 22 * 60))
+            with timer(results, 'check'):
+                get_peak_occupancy(service, booking_date, start)
+            # La misma consulta ya compilada: lo que cuesta la base sin el ORM
+            minutes = start.hour * 60 + start.minute
+            sql, params = occupying_starts(
+                ('booking_time',), service=service, booking_date=booking_date,
+                booking_time__gt=from_minutes(max(minutes - service.duration_minutes, 0)),
+                booking_time__lt=from_minutes(min(minutes + service.duration_minutes, 24 * 60 - 1)),
+            ).query.sql_with_params()
+            with timer(results, 'sql'):
+                run_sql(sql, params)
+
+        samples = sorted(results['check'])
+        median = statistics.median(samples) * 1000
+        p95 = samples[int(len(samples) * 0.95)] * 1000
+        sql_median = statistics.median(results['sql']) * 1000
+        worst = max(worst, median)
+        print(f'{total:>14} {median:>12.3f} {p95:>10.3f} {sql_median:>12.3f}')
+
+    if worst < TARGET_MS:
+        print(f'objetivo < {TARGET_MS:.0f} ms: alcanzado (peor mediana {worst:.3f} ms)')
+    else:
+        print(f'objetivo < {TARGET_MS:.0f} ms: NO alcanzado (peor mediana {worst:.3f} ms)')
+
+
+if __name__ == '__main__':
+    setup_django()
+    with test_database():
+        run()
@@ -0,0 +1,111 @@
+"""
+Benchmark de la exportación de reservas a Excel
+
+Compara el motor de solo escritura (`dashboard.spreadsheets`, el mismo
+camino que `export_bookings_excel`) con el libro normal de openpyxl con
+estilos celda por celda que se usaba antes. Informa filas por segundo y el
+pico de RSS sobre el RSS previo a cada exportación.
+
+    python -m benchmarks.bench_excel_export [filas ...]
+"""
+import sys
+from datetime import date, time, timedelta
+
+from benchmarks.common import create_fixture_service, peak_rss_mb, reset_peak_rss, setup_django, test_database, timer
+
+SIZES = (10_000, 100_000, 1_000_000)
+# Tamaño máximo con el libro normal: arriba de esto el consumo de memoria no es razonable
+LEGACY_MAX_ROWS = 100_000
+INSERT_BATCH = 10_000
+
+
+def grow_bookings(user, service, current, target):
+    """Agregar reservas hasta tener `target`"""
+    from bookings.models import Booking
+
+    first_day = date(2020, 1, 1)
+    while current < target:
+        batch = min(INSERT_BATCH, target - current)
+        Booking.objects.bulk_create(
+            Booking(
+                user=user,
+                service=service,
+                booking_date=first_day + timedelta(days=(current + index) // 20),
+                booking_time=time(8 + (current + index) % 10, 0),
+                contact_phone='1234567890',
+                total_price=service.price,
+                status='completed',
+            )
+            for index in range(batch)
+        )
+        current += batch
+    return current
+
+
+def legacy_workbook(rows):
+    """Libro normal con borde y alineación por celda, como la exportación anterior"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Side
+
+    workbook = Workbook()
+    sheet = workbook.active
+    border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+    for row_index, row in enumerate(rows, 4):
+        for column, value in enumerate(row, 1):
+            cell = sheet.cell(row=row_index, column=column)
+            cell.value = value
+            cell.border = border
+            cell.alignment = Alignment(horizontal='center')
+        sheet.cell(row=row_index, column=5).number_format = '$#,##0.00'
+    return workbook
+
+
+def write_only_workbook(rows):
+    from dashboard.spreadsheets import WorkbookWriter
+
+    workbook = WorkbookWriter()
+    sheet = workbook.sheet('Reservas', widths=[20, 20, 15, 12, 12])
+    sheet.header(['Usuario', 'Servicio', 'Fecha', 'Estado', 'Monto'])
+    sheet.rows(rows, styles=(None, None, 'date', None, 'money'))
+    return workbook.save()
+
+
+def measure(label, total, build):
+    from tempfile import TemporaryFile
+
+    from django.conf import settings
+    from bookings.models import Booking
+    from dashboard.reports import booking_report_rows
+    from dashboard.pagination import ORDERING
+
+    results = {}
+    baseline = reset_peak_rss()
+    with timer(results, label):
+        rows = booking_report_rows(Booking.objects.order_by(*ORDERING), settings.DASHBOARD_EXPORT_CHUNK_SIZE)
+        output = build(rows)
+        if not hasattr(output, 'read'):
+            file = TemporaryFile()
+            output.save(file)
+            output = file
+        size = output.seek(0, 2)
+        output.close()
+    seconds = results[label][0]
+    print(f'{label:>16} {total:>10} {total / seconds:>12,.0f} {peak_rss_mb() - baseline:>14.1f} {size / 1024 / 1024:>10.1f}')
+
+
+def run(sizes):
+    user, service = create_fixture_service()
+    print(f'{"motor":>16} {"filas":>10} {"filas/s":>12} {"pico RSS +MB":>14} {"archivo MB":>10}')
+    current = 0
+    for total in sizes:
+        current = grow_bookings(user, service, current, total)
+        # Primero el motor nuevo: la memoria que libera el libro normal inflaría la línea base
+        measure('solo escritura', total, write_only_workbook)
+        if total <= LEGACY_MAX_ROWS:
+            measure('libro normal', total, legacy_workbook)
+
+
+if __name__ == '__main__':
+    setup_django()
+    with test_database():
+        run(sorted(int(size) for size in sys.argv[1:]) or SIZES)
@@ -0,0 +1,91 @@
+"""
+Utilidades compartidas por los benchmarks
+
+Cada benchmark se ejecuta como módulo desde la raíz del proyecto:
+    python -m benchmarks.bench_capacity_check
+
+Los datos se generan en una base de datos de pruebas temporal que se
+destruye al terminar, nunca en la base de datos configurada.
+"""
+import os
+import resource
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Inicializar Django con la configuración del proyecto"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-only-secret-key')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Crear una base de datos de pruebas y destruirla al salir"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(results, key):
+    """Acumular en `results[key]` la duración del bloque en segundos"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results.setdefault(key, []).append(time.perf_counter() - start)
+
+
+def _proc_status_kb(field):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return None
+
+
+def reset_peak_rss():
+    """Reiniciar el pico de RSS del proceso (solo Linux); devuelve el RSS actual en MB"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return _proc_status_kb('VmRSS') / 1024
+    except OSError:
+        return 0.0
+
+
+def peak_rss_mb():
+    """Pico de RSS del proceso en MB desde el último `reset_peak_rss`"""
+    try:
+        return _proc_status_kb('VmHWM') / 1024
+    except OSError:
+        # Sin /proc el pico no se puede reiniciar: es el del proceso completo
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def create_fixture_service(name='Masaje Descontracturante', duration_minutes=90, max_capacity=3):
+    """Crear usuario, categoría y servicio de referencia"""
+    from django.contrib.auth.models import User
+    from services.models import Category, Service
+
+    user = User.objects.create_user(username='bench', password='bench-pass-123')
+    category = Category.objects.create(name='Benchmark')
+    service = Service.objects.create(
+        category=category,
+        name=name,
+        description='Servicio de benchmark',
+        duration_minutes=duration_minutes,
+        price=70,
+        max_capacity=max_capacity,
+    )
+    return user, service
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Booking, Review
+from .models import Booking, BookingSeries, Review, SlotHold, Waitlist
+from .status import update_bookings_status
 
 
 @admin.register(Booking)
@@ -39,18 +40,22 @@ class BookingAdmin(admin.ModelAdmin):
         return obj.service.name
     service_name.short_description = 'Servicio'
     
+    def _update_status(self, queryset, status):
+        """Actualizar estado en bloque; `update()` no dispara señales"""
+        return update_bookings_status(queryset, status)
+    
     def mark_as_confirmed(self, request, queryset):
-        updated = queryset.update(status='confirmed')
+        updated = self._update_status(queryset, 'confirmed')
         self.message_user(request, f'{updated} reservas confirmadas')
     mark_as_confirmed.short_description = 'Marcar como confirmadas'
     
     def mark_as_completed(self, request, queryset):
-        updated = queryset.update(status='completed')
+        updated = self._update_status(queryset, 'completed')
         self.message_user(request, f'{updated} reservas completadas')
     mark_as_completed.short_description = 'Marcar como completadas'
     
     def mark_as_cancelled(self, request, queryset):
-        updated = queryset.update(status='cancelled')
+        updated = self._update_status(queryset, 'cancelled')
         self.message_user(request, f'{updated} reservas canceladas')
     mark_as_cancelled.short_description = 'Marcar como canceladas'
 
@@ -65,3 +70,26 @@ class ReviewAdmin(admin.ModelAdmin):
     def get_rating_display(self, obj):
         return obj.get_rating_display()
     get_rating_display.short_description = 'Calificación'
+
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'service', 'start_date', 'booking_time', 'interval_weeks', 'occurrences', 'created_at']
+    list_filter = ['service', 'interval_weeks']
+    search_fields = ['user__first_name', 'user__last_name', 'user__email', 'service__name']
+    readonly_fields = ['created_at']
+
+
+@admin.register(Waitlist)
+class WaitlistAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'service', 'booking_date', 'booking_time', 'status', 'created_at']
+    list_filter = ['status', 'service', 'booking_date']
+    search_fields = ['user__first_name', 'user__last_name', 'user__email', 'service__name']
+    readonly_fields = ['created_at', 'promoted_at', 'booking']
+
+
+@admin.register(SlotHold)
+class SlotHoldAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'service', 'booking_date', 'booking_time', 'expires_at']
+    list_filter = ['service', 'booking_date']
+    readonly_fields = ['created_at']
@@ -0,0 +1,155 @@
+"""
+Creación masiva de reservas
+
+Valida un lote completo contra disponibilidad y capacidad con consultas por
+conjunto (servicios, disponibilidades y ocupación de todos los días
+involucrados), inserta las filas aceptadas con `bulk_create` en una sola
+transacción y devuelve un reporte de aceptación/rechazo por fila.
+"""
+from collections import Counter, namedtuple
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from services.availability import load_day_occupancy, to_minutes
+from services.models import Service, Availability
+from .emails import send_batch_confirmation_email
+from .forms import BulkBookingRowForm
+from .models import Booking
+from .occupancy import apply_occupancy_deltas
+from .reservations import CAPACITY_ERROR_MESSAGE, lock_service_days, run_locked
+from .signals import bookings_bulk_changed
+
+RowResult = namedtuple('RowResult', ['row', 'booking', 'errors'])
+
+
+def _field_errors(form):
+    return [
+        f'{field}: {error}' if field != '__all__' else error
+        for field, errors in form.errors.items()
+        for error in errors
+    ]
+
+
+def load_windows(services):
+    """Ventanas de disponibilidad {(service_id, día de semana): (inicio, fin)}"""
+    return {
+        (availability.service_id, availability.day_of_week): (availability.start_time, availability.end_time)
+        for availability in Availability.objects.filter(service_id__in=services, is_available=True).order_by()
+    }
+
+
+def validate_row(cleaned, services, windows, occupancy, now):
+    """Validar una fila limpia contra disponibilidad y ocupación ya cargadas
+
+    Si la fila es válida se suma a `occupancy` para que cuente en las
+    siguientes. Devuelve (servicio, errores).
+    """
+    service = services.get(cleaned['service'])
+    if service is None:
+        return None, ['Servicio no encontrado o inactivo']
+
+    booking_date = cleaned['booking_date']
+    booking_time = cleaned['booking_time']
+    if datetime.combine(booking_date, booking_time) < now:
+        return None, ['No puedes reservar en el pasado']
+
+    day_of_week = booking_date.weekday()
+    window = windows.get((service.id, day_of_week))
+    if window is None:
+        day_name = dict(Availability.DAYS_OF_WEEK)[day_of_week]
+        return None, [f'El servicio no está disponible los {day_name}']
+    if not (window[0] <= booking_time <= window[1]):
+        return None, [f'Horario fuera de disponibilidad. Disponible de {window[0]} a {window[1]}']
+
+    day = occupancy[(service.id, booking_date)]
+    start = to_minutes(booking_time)
+    if day.peak(start) >= service.max_capacity:
+        return None, [CAPACITY_ERROR_MESSAGE]
+
+    day.add(start)
+    return service, []
+
+
+def create_bookings_bulk(user, rows):
+    """Validar e insertar un lote de reservas para `user`
+
+    `rows` es una lista de dicts con service, booking_date, booking_time,
+    contact_phone y notes. Devuelve una lista de `RowResult` en el orden de
+    entrada: `booking` es la reserva creada o None, y `errors` explica el
+    rechazo. Las confirmaciones salen en un único envío tras el commit.
+    """
+    forms = [BulkBookingRowForm(row if isinstance(row, dict) else {}) for row in rows]
+    valid = [(index, form.cleaned_data) for index, form in enumerate(forms) if form.is_valid()]
+    results = {
+        index: RowResult(index, None, _field_errors(form))
+        for index, form in enumerate(forms) if form.errors
+    }
+
+    service_ids = {cleaned['service'] for _, cleaned in valid}
+    services = Service.objects.in_bulk(service_ids) if service_ids else {}
+    services = {pk: service for pk, service in services.items() if service.is_active}
+    windows = load_windows(services)
+    pairs = {
+        (cleaned['service'], cleaned['booking_date'])
+        for _, cleaned in valid if cleaned['service'] in services
+    }
+
+    def insert():
+        accepted = []
+        batch_results = {}
+        lock_service_days(pairs)
+
+        occupancy = load_day_occupancy(services, pairs)
+
+        now = timezone.localtime().replace(tzinfo=None)
+        for index, cleaned in valid:
+            service, errors = validate_row(cleaned, services, windows, occupancy, now)
+            if errors:
+                batch_results[index] = RowResult(index, None, errors)
+                continue
+            booking = Booking(
+                user=user,
+                service=service,
+                booking_date=cleaned['booking_date'],
+                booking_time=cleaned['booking_time'],
+                contact_phone=cleaned['contact_phone'],
+                notes=cleaned['notes'],
+                total_price=service.price,
+            )
+            accepted.append(booking)
+            batch_results[index] = RowResult(index, booking, [])
+
+        Booking.objects.bulk_create(accepted)
+        apply_occupancy_deltas(Counter(
+            (booking.service_id, booking.booking_date, booking.booking_time) for booking in accepted
+        ))
+        return accepted, batch_results
+
+    accepted, batch_results = run_locked(insert)
+    results.update(batch_results)
+
+    if accepted:
+        # bulk_create no dispara señales: invalidar y notificar explícitamente
+        bookings_bulk_changed.send(
+            sender=Booking, service_ids={booking.service_id for booking in accepted}, created=accepted
+        )
+        booking_ids = [booking.id for booking in accepted]
+        transaction.on_commit(lambda: send_batch_confirmation_email(booking_ids))
+
+    return [results[index] for index in range(len(rows))]
+
+
+def results_report(results):
+    """Reporte serializable del resultado de un lote"""
+    return {
+        'accepted': sum(1 for result in results if result.booking),
+        'rejected': sum(1 for result in results if not result.booking),
+        'results': [
+            {'row': result.row, 'status': 'accepted', 'booking': result.booking.id}
+            if result.booking else
+            {'row': result.row, 'status': 'rejected', 'errors': result.errors}
+            for result in results
+        ],
+    }
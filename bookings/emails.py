@@ -1,7 +1,9 @@
 """
 Tareas asincrónicas con Celery
 """
-from django.core.mail import send_mail
+from itertools import groupby
+
+from django.core.mail import send_mail, get_connection, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 from bookings.models import Booking
@@ -122,3 +124,74 @@ def send_booking_cancelled_email(booking_id):
         )
     except Exception as e:
         print(f"Error enviando email: {e}")
+
+
+def send_waitlist_promoted_email(booking_id):
+    """Notificar que una entrada de la lista de espera se convirtió en reserva"""
+    try:
+        booking = Booking.objects.get(id=booking_id)
+        user = booking.user
+        
+        if not user.profile.notify_email:
+            return
+        
+        context = {
+            'user': user,
+            'booking': booking,
+            'service': booking.service,
+        }
+        
+        html_message = render_to_string('emails/waitlist_promoted.html', context)
+        
+        send_mail(
+            subject=f'¡Tienes lugar! {booking.service.name}',
+            message=f'Se liberó un cupo y tu reserva para {booking.service.name} está confirmada',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[user.email],
+            html_message=html_message,
+            fail_silently=False,
+        )
+    except Exception as e:
+        print(f"Error enviando email: {e}")
+
+
+def send_batch_confirmation_email(booking_ids):
+    """Confirmar un lote de reservas con un email por usuario
+
+    Una sola consulta carga todas las reservas y todos los emails salen por
+    una única conexión SMTP, en lugar de un envío por reserva.
+    """
+    try:
+        bookings = Booking.objects.filter(id__in=booking_ids).select_related(
+            'user', 'user__profile', 'service'
+        ).order_by('user_id', 'booking_date', 'booking_time')
+        
+        messages = []
+        for _, user_bookings in groupby(bookings, key=lambda booking: booking.user_id):
+            user_bookings = list(user_bookings)
+            user = user_bookings[0].user
+            
+            profile = getattr(user, 'profile', None)
+            if profile and not profile.notify_email:
+                continue
+            
+            context = {
+                'user': user,
+                'bookings': user_bookings,
+            }
+            
+            html_message = render_to_string('emails/booking_batch_confirmation.html', context)
+            
+            message = EmailMultiAlternatives(
+                subject=f'Confirmación de {len(user_bookings)} Reservas',
+                body=f'Tus {len(user_bookings)} reservas han sido confirmadas',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[user.email],
+            )
+            message.attach_alternative(html_message, 'text/html')
+            messages.append(message)
+        
+        if messages:
+            get_connection(fail_silently=False).send_messages(messages)
+    except Exception as e:
+        print(f"Error enviando email: {e}")
@@ -1,7 +1,17 @@
 from django import forms
 from datetime import datetime
+from django.conf import settings
 from django.utils import timezone
-from .models import Booking, Review
+from .models import Booking, BookingSeries, Review, SlotHold, Waitlist, phone_validator
+from .reservations import CAPACITY_ERROR_MESSAGE
+
+
+def validate_service_window(service, booking_date, booking_time):
+    """Rechazar un horario fuera de la disponibilidad del servicio para ese día"""
+    from services.availability import day_window, window_error
+    error = window_error(day_window(service, booking_date), booking_date, booking_time)
+    if error:
+        raise forms.ValidationError(error)
 
 
 class BookingForm(forms.ModelForm):
@@ -26,9 +36,10 @@ class BookingForm(forms.ModelForm):
             'notes': forms.Textarea(attrs={'rows': 4}),
         }
     
-    def __init__(self, *args, service=None, **kwargs):
+    def __init__(self, *args, service=None, user=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.service = service
+        self.user = user
     
     def clean(self):
         cleaned_data = super().clean()
@@ -43,43 +54,106 @@ class BookingForm(forms.ModelForm):
             if booking_datetime < timezone.now():
                 raise forms.ValidationError('No puedes reservar en el pasado')
             
-            # ✅ Validar disponibilidad del servicio
-            from services.models import Availability
-            day_of_week = booking_date.weekday()
-            
-            # Obtener servicio desde la vista
+            # ✅ Validar disponibilidad del servicio (día y horario)
             service = self.service
             if service:
-                availability = service.availabilities.filter(
-                    day_of_week=day_of_week,
-                    is_available=True
-                ).first()
-                
-                if not availability:
-                    day_name = dict(Availability.DAYS_OF_WEEK)[day_of_week]
-                    raise forms.ValidationError(
-                        f'El servicio no está disponible los {day_name}'
-                    )
-                
-                # Validar horario dentro de disponibilidad
-                if not (availability.start_time <= booking_time <= availability.end_time):
-                    raise forms.ValidationError(
-                        f'Horario fuera de disponibilidad. Disponible de {availability.start_time} a {availability.end_time}'
-                    )
+                validate_service_window(service, booking_date, booking_time)
             
-            # ✅ Validar conflictos de capacidad
+            # ✅ Validar conflictos de capacidad (reservas solapadas por duración)
             if service:
-                conflicting_bookings = Booking.objects.filter(
-                    service=service,
-                    booking_date=booking_date,
-                    booking_time=booking_time,
-                    status__in=['pending', 'confirmed']
-                ).count()
-                
-                if conflicting_bookings >= service.max_capacity:
-                    raise forms.ValidationError(
-                        'No hay capacidad disponible para esta fecha y hora. Intenta otro horario.'
-                    )
+                from services.availability import get_peak_occupancy
+                # La retención propia del usuario no le quita el cupo
+                if get_peak_occupancy(service, booking_date, booking_time, holder=self.user) >= service.max_capacity:
+                    raise forms.ValidationError(CAPACITY_ERROR_MESSAGE)
+        
+        return cleaned_data
+
+
+class SlotHoldForm(BookingForm):
+    """Horario elegido para retener; aplica las mismas validaciones que la reserva"""
+    class Meta:
+        model = SlotHold
+        fields = ['booking_date', 'booking_time']
+
+
+class BookingSeriesForm(forms.ModelForm):
+    """Formulario para crear una serie de reservas recurrentes"""
+    skip_conflicts = forms.BooleanField(
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+        label='Reservar igual las fechas disponibles si alguna está ocupada'
+    )
+    
+    class Meta:
+        model = BookingSeries
+        fields = ['start_date', 'booking_time', 'interval_weeks', 'occurrences', 'contact_phone', 'notes']
+        labels = {
+            'start_date': 'Primera sesión',
+            'booking_time': 'Hora de Inicio',
+            'interval_weeks': 'Cada cuántas semanas',
+            'occurrences': 'Cantidad de sesiones',
+            'contact_phone': 'Teléfono de Contacto',
+            'notes': 'Notas Especiales',
+        }
+        widgets = {
+            'start_date': forms.DateInput(attrs={'type': 'date'}),
+            'booking_time': forms.TimeInput(attrs={'type': 'time'}),
+            'notes': forms.Textarea(attrs={'rows': 3}),
+        }
+    
+    def clean_occurrences(self):
+        occurrences = self.cleaned_data['occurrences']
+        if occurrences > settings.BOOKING_SERIES_MAX_OCCURRENCES:
+            raise forms.ValidationError(
+                f'Una serie puede tener como máximo {settings.BOOKING_SERIES_MAX_OCCURRENCES} sesiones'
+            )
+        return occurrences
+
+
+class BulkBookingRowForm(forms.Form):
+    """Validación de campos de una fila de reserva masiva (sin consultas)"""
+    service = forms.IntegerField(min_value=1)
+    booking_date = forms.DateField()
+    booking_time = forms.TimeField()
+    contact_phone = forms.CharField(max_length=20, validators=[phone_validator])
+    notes = forms.CharField(required=False)
+
+
+class WaitlistForm(forms.ModelForm):
+    """Formulario para anotarse en la lista de espera de un horario lleno"""
+    class Meta:
+        model = Waitlist
+        fields = ['booking_date', 'booking_time', 'contact_phone', 'notes']
+    
+    def __init__(self, *args, service=None, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service = service
+        self.user = user
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        booking_date = cleaned_data.get('booking_date')
+        booking_time = cleaned_data.get('booking_time')
+        
+        if booking_date and booking_time:
+            if datetime.combine(booking_date, booking_time) < timezone.localtime().replace(tzinfo=None):
+                raise forms.ValidationError('No puedes anotarte en un horario pasado')
+            
+            validate_service_window(self.service, booking_date, booking_time)
+            
+            # Solo se espera por un horario lleno; si hay lugar se reserva directamente
+            from services.availability import get_peak_occupancy
+            if get_peak_occupancy(self.service, booking_date, booking_time) < self.service.max_capacity:
+                raise forms.ValidationError('Este horario tiene lugar: puedes reservarlo directamente')
+            
+            if Waitlist.objects.filter(
+                user=self.user,
+                service=self.service,
+                booking_date=booking_date,
+                booking_time=booking_time,
+                status='waiting',
+            ).exists():
+                raise forms.ValidationError('Ya estás en la lista de espera de este horario')
         
         return cleaned_data
 
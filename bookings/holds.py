@@ -0,0 +1,65 @@
+"""
+Retenciones temporales de cupos
+
+Al elegir un horario el cliente obtiene una `SlotHold` que ocupa capacidad
+durante `BOOKING_HOLD_MINUTES` mientras completa sus datos. La retención se
+convierte en reserva dentro de `reserve_booking` o simplemente vence: las
+consultas de capacidad solo cuentan las que tienen `expires_at` en el
+futuro, y `purge_expired_holds` borra las vencidas por lotes.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from services.calendar import bump_calendar_version
+from .models import SlotHold
+from .reservations import CapacityError, lock_service_days, run_locked
+
+PURGE_BATCH_SIZE = 1000
+
+
+def place_hold(user, service, booking_date, booking_time):
+    """Retener un horario para `user`, reemplazando su retención previa en el servicio
+
+    Lanza `CapacityError` si el intervalo ya está completo.
+    """
+    from services.availability import get_peak_occupancy
+
+    def place():
+        lock_service_days([(service.id, booking_date)])
+        SlotHold.objects.filter(user=user, service=service).delete()
+        if get_peak_occupancy(service, booking_date, booking_time) >= service.max_capacity:
+            raise CapacityError()
+        return SlotHold.objects.create(
+            user=user,
+            service=service,
+            booking_date=booking_date,
+            booking_time=booking_time,
+            expires_at=timezone.now() + timedelta(minutes=settings.BOOKING_HOLD_MINUTES),
+        )
+
+    hold = run_locked(place)
+    bump_calendar_version(service.id)
+    return hold
+
+
+def purge_expired_holds(batch_size=PURGE_BATCH_SIZE):
+    """Borrar las retenciones vencidas en lotes de `batch_size`
+
+    Cada lote es un DELETE por clave primaria acotado, así la tabla se
+    mantiene pequeña sin transacciones largas. Los calendarios afectados se
+    invalidan una vez al final. Devuelve cuántas se borraron.
+    """
+    expired = SlotHold.objects.filter(expires_at__lte=timezone.now()).order_by('expires_at')
+    deleted = 0
+    service_ids = set()
+    while True:
+        batch = list(expired.values_list('id', 'service_id')[:batch_size])
+        if batch:
+            SlotHold.objects.filter(id__in=[hold_id for hold_id, _ in batch]).delete()
+            service_ids.update(service_id for _, service_id in batch)
+            deleted += len(batch)
+        if len(batch) < batch_size:
+            bump_calendar_version(*service_ids)
+            return deleted
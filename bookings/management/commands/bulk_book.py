@@ -0,0 +1,57 @@
+"""
+Crear reservas masivas desde un archivo JSON o CSV
+Ejecutar con: python manage.py bulk_book reservas.csv --user empresa
+"""
+import csv
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.bulk import create_bookings_bulk, results_report
+
+
+class Command(BaseCommand):
+    help = 'Crear un lote de reservas (JSON o CSV con columnas service, booking_date, booking_time, contact_phone, notes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo .json (lista de reservas) o .csv')
+        parser.add_argument('--user', required=True, help='Usuario dueño de las reservas')
+        parser.add_argument('--report', help='Guardar el reporte por fila en este archivo JSON')
+
+    def load_rows(self, path):
+        if path.suffix.lower() == '.csv':
+            with path.open(newline='', encoding='utf-8') as f:
+                return list(csv.DictReader(f))
+        with path.open(encoding='utf-8') as f:
+            data = json.load(f)
+        return data['bookings'] if isinstance(data, dict) else data
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'No existe el archivo {path}')
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['user']}")
+
+        try:
+            rows = self.load_rows(path)
+        except (ValueError, KeyError, csv.Error) as e:
+            raise CommandError(f'Archivo inválido: {e}')
+
+        report = results_report(create_bookings_bulk(user, rows))
+
+        for result in report['results']:
+            if result['status'] == 'rejected':
+                self.stdout.write(self.style.WARNING(f"Fila {result['row']}: {'; '.join(result['errors'])}"))
+
+        if options['report']:
+            Path(options['report']).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {report['accepted']} reservas creadas, {report['rejected']} rechazadas"
+        ))
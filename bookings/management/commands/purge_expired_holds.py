@@ -0,0 +1,21 @@
+"""
+Borrar retenciones de cupo vencidas y vencer la lista de espera de horarios pasados
+Ejecutar con: python manage.py purge_expired_holds (por ejemplo, cada minuto desde cron)
+"""
+from django.core.management.base import BaseCommand
+
+from bookings.holds import PURGE_BATCH_SIZE, purge_expired_holds
+from bookings.waitlist import expire_waitlist
+
+
+class Command(BaseCommand):
+    help = 'Borrar en lotes las retenciones de cupo vencidas y vencer la lista de espera pasada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE, help='Filas por DELETE')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_holds(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {deleted} retenciones vencidas borradas'))
+        expired = expire_waitlist()
+        self.stdout.write(self.style.SUCCESS(f'✅ {expired} entradas de lista de espera vencidas'))
@@ -0,0 +1,15 @@
+"""
+Recalcular la ocupación por horario desde las reservas
+Ejecutar con: python manage.py rebuild_occupancy
+"""
+from django.core.management.base import BaseCommand
+
+from bookings.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Recalcular la tabla ServiceDayOccupancy a partir de las reservas activas'
+
+    def handle(self, *args, **options):
+        rows = rebuild_occupancy()
+        self.stdout.write(self.style.SUCCESS(f'✅ Ocupación recalculada: {rows} horarios con reservas'))
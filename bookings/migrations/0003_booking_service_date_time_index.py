@@ -0,0 +1,17 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_alter_booking_contact_phone_alter_review_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['service', 'booking_date', 'booking_time', 'status'], name='bookings_bo_service_4ba3d6_idx'),
+        ),
+    ]
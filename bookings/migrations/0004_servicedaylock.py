@@ -0,0 +1,29 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+        ('bookings', '0003_booking_service_date_time_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceDayLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('version', models.PositiveIntegerField(default=0, help_text='Incrementa con cada reserva del día')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_locks', to='services.service')),
+            ],
+            options={
+                'verbose_name': 'Bloqueo de día',
+                'verbose_name_plural': 'Bloqueos de día',
+                'unique_together': {('service', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:43
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0001_initial'),
+        ('bookings', '0004_servicedaylock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Waitlist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_date', models.DateField()),
+                ('booking_time', models.TimeField()),
+                ('contact_phone', models.CharField(max_length=20, validators=[django.core.validators.RegexValidator(message='Teléfono inválido. Formato esperado: +XX-XXXXXXXXX o 123456789', regex='^\\+?1?\\d{9,15}$')])),
+                ('notes', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('waiting', 'En espera'), ('promoted', 'Promovida'), ('cancelled', 'Cancelada')], default='waiting', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('promoted_at', models.DateTimeField(blank=True, null=True)),
+                ('booking', models.OneToOneField(blank=True, help_text='Reserva creada al promover', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='bookings.booking')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='services.service')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Lista de espera',
+                'verbose_name_plural': 'Listas de espera',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['service', 'booking_date', 'status', 'booking_time'], name='bookings_wa_service_f4b860_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0001_initial'),
+        ('bookings', '0005_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_date', models.DateField()),
+                ('booking_time', models.TimeField()),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='La retención deja de ocupar capacidad al vencer')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to='services.service')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Retención de cupo',
+                'verbose_name_plural': 'Retenciones de cupo',
+                'indexes': [models.Index(fields=['service', 'booking_date', 'expires_at', 'booking_time'], name='bookings_sl_service_1d7d95_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:51
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def populate_occupancy(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    ServiceDayOccupancy = apps.get_model('bookings', 'ServiceDayOccupancy')
+    rows = (
+        Booking.objects.filter(status__in=('pending', 'confirmed'))
+        .order_by()
+        .values_list('service_id', 'booking_date', 'booking_time')
+        .annotate(units=Count('id'))
+    )
+    ServiceDayOccupancy.objects.bulk_create(
+        [
+            ServiceDayOccupancy(service_id=service_id, booking_date=booking_date, booking_time=booking_time, booked_units=units)
+            for service_id, booking_date, booking_time, units in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+        ('bookings', '0006_slothold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceDayOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_date', models.DateField()),
+                ('booking_time', models.TimeField()),
+                ('booked_units', models.IntegerField(default=0, help_text='Reservas activas que empiezan a esta hora')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='services.service')),
+            ],
+            options={
+                'verbose_name': 'Ocupación por horario',
+                'verbose_name_plural': 'Ocupación por horario',
+                'unique_together': {('service', 'booking_date', 'booking_time')},
+            },
+        ),
+        migrations.RunPython(populate_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:55
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0001_initial'),
+        ('bookings', '0007_servicedayoccupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField(help_text='Fecha de la primera sesión')),
+                ('booking_time', models.TimeField(help_text='Hora de inicio de cada sesión')),
+                ('interval_weeks', models.PositiveSmallIntegerField(default=1, help_text='Semanas entre sesiones', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(4)])),
+                ('occurrences', models.PositiveIntegerField(help_text='Cantidad de sesiones', validators=[django.core.validators.MinValueValidator(2)])),
+                ('contact_phone', models.CharField(max_length=20, validators=[django.core.validators.RegexValidator(message='Teléfono inválido. Formato esperado: +XX-XXXXXXXXX o 123456789', regex='^\\+?1?\\d{9,15}$')])),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to='services.service')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Serie de reservas',
+                'verbose_name_plural': 'Series de reservas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='series',
+            field=models.ForeignKey(blank=True, help_text='Serie recurrente a la que pertenece', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='bookings.bookingseries'),
+        ),
+    ]
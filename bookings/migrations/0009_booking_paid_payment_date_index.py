@@ -0,0 +1,17 @@
+# Generated by Django 4.2.14 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_bookingseries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['paid', 'payment_date'], name='bookings_bo_paid_0820f9_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.14 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_booking_paid_payment_date_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_bo_status_dfd677_idx',
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'booking_date', 'booking_time', 'id'], name='bookings_bo_status_5e88e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['booking_date', 'booking_time', 'id'], name='bookings_bo_booking_5bc7c4_idx'),
+        ),
+    ]
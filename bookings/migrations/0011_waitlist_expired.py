@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_booking_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='waitlist',
+            name='status',
+            field=models.CharField(choices=[('waiting', 'En espera'), ('promoted', 'Promovida'), ('cancelled', 'Cancelada'), ('expired', 'Vencida')], default='waiting', max_length=20),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -20,6 +21,10 @@ class Booking(models.Model):
         ('cancelled', 'Cancelada'),
         ('no_show', 'No presentado'),
     ]
+    # Estados que ocupan capacidad del servicio
+    ACTIVE_STATUSES = ('pending', 'confirmed')
+    # Campos cuyo valor previo se conserva para detectar cambios al guardar
+    TRACKED_FIELDS = ('user_id', 'service_id', 'booking_date', 'booking_time', 'status', 'paid', 'payment_date', 'total_price')
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='bookings')
@@ -34,6 +39,10 @@ class Booking(models.Model):
         help_text="Teléfono de contacto (ej: +1-2025551234 o 2025551234)"
     )
     notes = models.TextField(blank=True, help_text="Notas especiales del cliente")
+    series = models.ForeignKey(
+        'BookingSeries', on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings',
+        help_text="Serie recurrente a la que pertenece"
+    )
     
     # Información de pago
     total_price = models.DecimalField(max_digits=8, decimal_places=2)
@@ -52,12 +61,34 @@ class Booking(models.Model):
         ordering = ['-booking_date', '-booking_time']
         indexes = [
             models.Index(fields=['user', 'booking_date']),
-            models.Index(fields=['status', 'booking_date']),
+            models.Index(fields=['status', 'booking_date', 'booking_time', 'id']),
+            models.Index(fields=['service', 'booking_date', 'booking_time', 'status']),
+            models.Index(fields=['paid', 'payment_date']),
+            models.Index(fields=['booking_date', 'booking_time', 'id']),
         ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.service.name} ({self.booking_date} {self.booking_time})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_fields()
+        return instance
+    
+    def _remember_tracked_fields(self):
+        loaded = self.__dict__
+        self._original = {field: loaded[field] for field in self.TRACKED_FIELDS if field in loaded}
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_tracked_fields()
+    
+    @property
+    def original(self):
+        """Valores de los campos rastreados según la base de datos (vacío si es nueva)"""
+        return getattr(self, '_original', {})
+    
     @property
     def is_past(self):
         """Verificar si la reserva ya pasó"""
@@ -90,6 +121,146 @@ class Booking(models.Model):
         return False
 
 
+class BookingSeries(models.Model):
+    """Reserva recurrente: mismo servicio y hora cada cierta cantidad de semanas"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_series')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='booking_series')
+    start_date = models.DateField(help_text="Fecha de la primera sesión")
+    booking_time = models.TimeField(help_text="Hora de inicio de cada sesión")
+    interval_weeks = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MinValueValidator(1), MaxValueValidator(4)],
+        help_text="Semanas entre sesiones"
+    )
+    occurrences = models.PositiveIntegerField(validators=[MinValueValidator(2)], help_text="Cantidad de sesiones")
+    contact_phone = models.CharField(max_length=20, validators=[phone_validator])
+    notes = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Serie de reservas"
+        verbose_name_plural = "Series de reservas"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.service.name} cada {self.interval_weeks} semana(s) desde {self.start_date} ({self.occurrences} sesiones)"
+    
+    def dates(self):
+        """Fechas de todas las sesiones según la regla"""
+        step = timedelta(weeks=self.interval_weeks)
+        return [self.start_date + step * index for index in range(self.occurrences)]
+    
+    def cancel(self, reason=''):
+        """Cancelar las sesiones futuras aún activas; devuelve cuántas se cancelaron"""
+        from .status import update_bookings_status
+        now = timezone.localtime()
+        upcoming = self.bookings.filter(
+            status__in=Booking.ACTIVE_STATUSES,
+            booking_date__gte=now.date(),
+        ).exclude(booking_date=now.date(), booking_time__lt=now.time())
+        return update_bookings_status(
+            upcoming, 'cancelled', cancelled_at=timezone.now(), cancellation_reason=reason
+        )
+
+
+class Waitlist(models.Model):
+    """Lista de espera para un horario sin capacidad"""
+    STATUS_CHOICES = [
+        ('waiting', 'En espera'),
+        ('promoted', 'Promovida'),
+        ('cancelled', 'Cancelada'),
+        ('expired', 'Vencida'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='waitlist_entries')
+    booking_date = models.DateField()
+    booking_time = models.TimeField()
+    contact_phone = models.CharField(max_length=20, validators=[phone_validator])
+    notes = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting')
+    booking = models.OneToOneField(
+        Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_entry',
+        help_text="Reserva creada al promover"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Lista de espera"
+        verbose_name_plural = "Listas de espera"
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['service', 'booking_date', 'status', 'booking_time']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.get_full_name() or self.user.username} - {self.service.name} ({self.booking_date} {self.booking_time})"
+
+
+class SlotHold(models.Model):
+    """Retención temporal de un cupo mientras el cliente completa la reserva"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='slot_holds')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='slot_holds')
+    booking_date = models.DateField()
+    booking_time = models.TimeField()
+    expires_at = models.DateTimeField(db_index=True, help_text="La retención deja de ocupar capacidad al vencer")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Retención de cupo"
+        verbose_name_plural = "Retenciones de cupo"
+        indexes = [
+            models.Index(fields=['service', 'booking_date', 'expires_at', 'booking_time']),
+        ]
+    
+    def __str__(self):
+        return f"{self.service.name} - {self.booking_date} {self.booking_time} (vence {self.expires_at:%H:%M})"
+    
+    @property
+    def is_active(self):
+        """Determinar si la retención sigue vigente"""
+        return self.expires_at > timezone.now()
+
+
+class ServiceDayOccupancy(models.Model):
+    """Proyección de reservas activas por servicio, día y hora de inicio
+
+    Se mantiene de forma incremental desde `bookings.occupancy`; se puede
+    recalcular completa con `python manage.py rebuild_occupancy`.
+    """
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='occupancy')
+    booking_date = models.DateField()
+    booking_time = models.TimeField()
+    booked_units = models.IntegerField(default=0, help_text="Reservas activas que empiezan a esta hora")
+    
+    class Meta:
+        verbose_name = "Ocupación por horario"
+        verbose_name_plural = "Ocupación por horario"
+        unique_together = ('service', 'booking_date', 'booking_time')
+    
+    def __str__(self):
+        return f"{self.service.name} - {self.booking_date} {self.booking_time}: {self.booked_units}"
+
+
+class ServiceDayLock(models.Model):
+    """Fila de bloqueo por servicio y día para serializar reservas concurrentes"""
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='day_locks')
+    date = models.DateField()
+    version = models.PositiveIntegerField(default=0, help_text="Incrementa con cada reserva del día")
+    
+    class Meta:
+        verbose_name = "Bloqueo de día"
+        verbose_name_plural = "Bloqueos de día"
+        unique_together = ('service', 'date')
+    
+    def __str__(self):
+        return f"{self.service.name} - {self.date} (v{self.version})"
+
+
 class Review(models.Model):
     """Reseñas y calificaciones de servicios"""
     RATING_CHOICES = [
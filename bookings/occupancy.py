@@ -0,0 +1,93 @@
+"""
+Proyección incremental de ocupación por servicio, día y hora de inicio
+
+`ServiceDayOccupancy` guarda cuántas reservas activas empiezan en cada
+(servicio, fecha, hora). Cada camino que cambia reservas aplica aquí su
+diferencia: las señales de `Booking` para guardados individuales y las
+llamadas explícitas de `bulk_create` y de las acciones con `update()`.
+Los incrementos son `UPDATE ... SET booked_units = booked_units + n`, así
+que escrituras concurrentes sobre la misma fila no se pisan.
+"""
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import Booking, ServiceDayOccupancy
+
+# Claves por UPDATE; acota la profundidad de la expresión OR en SQLite
+UPDATE_CHUNK_SIZE = 100
+
+
+def booking_delta(instance, created):
+    """Diferencia de ocupación que produce guardar `instance`"""
+    delta = Counter()
+    if not created:
+        original = instance.original
+        if original.get('status', instance.status) in Booking.ACTIVE_STATUSES:
+            delta[(
+                original.get('service_id', instance.service_id),
+                original.get('booking_date', instance.booking_date),
+                original.get('booking_time', instance.booking_time),
+            )] -= 1
+    if instance.status in Booking.ACTIVE_STATUSES:
+        delta[(instance.service_id, instance.booking_date, instance.booking_time)] += 1
+    return delta
+
+
+def apply_occupancy_deltas(deltas):
+    """Sumar `{(service_id, fecha, hora): unidades}` a la proyección
+
+    Crea las filas que falten y agrupa las claves con la misma diferencia en
+    un solo UPDATE, de modo que un lote cuesta pocas consultas.
+    """
+    deltas = {key: units for key, units in deltas.items() if units}
+    if not deltas:
+        return
+
+    ServiceDayOccupancy.objects.bulk_create(
+        [
+            ServiceDayOccupancy(service_id=service_id, booking_date=booking_date, booking_time=booking_time)
+            for service_id, booking_date, booking_time in deltas
+        ],
+        ignore_conflicts=True,
+    )
+
+    keys_by_units = defaultdict(list)
+    for key, units in deltas.items():
+        keys_by_units[units].append(key)
+    for units, keys in keys_by_units.items():
+        for index in range(0, len(keys), UPDATE_CHUNK_SIZE):
+            condition = reduce(or_, (
+                Q(service_id=service_id, booking_date=booking_date, booking_time=booking_time)
+                for service_id, booking_date, booking_time in keys[index:index + UPDATE_CHUNK_SIZE]
+            ))
+            ServiceDayOccupancy.objects.filter(condition).update(booked_units=F('booked_units') + units)
+
+
+def rebuild_occupancy():
+    """Recalcular la proyección completa con un INSERT ... SELECT agrupado
+
+    En PostgreSQL la tabla queda bloqueada contra escrituras durante el
+    recálculo: los incrementos concurrentes esperan y se aplican después
+    sobre las filas nuevas. Devuelve el número de filas generadas.
+    """
+    quote = connection.ops.quote_name
+    occupancy_table = quote(ServiceDayOccupancy._meta.db_table)
+    booking_table = quote(Booking._meta.db_table)
+    statuses = ', '.join(['%s'] * len(Booking.ACTIVE_STATUSES))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'LOCK TABLE {occupancy_table} IN EXCLUSIVE MODE')
+        cursor.execute(f'DELETE FROM {occupancy_table}')
+        cursor.execute(
+            f'INSERT INTO {occupancy_table} (service_id, booking_date, booking_time, booked_units) '
+            f'SELECT service_id, booking_date, booking_time, COUNT(*) FROM {booking_table} '
+            f'WHERE status IN ({statuses}) '
+            f'GROUP BY service_id, booking_date, booking_time',
+            list(Booking.ACTIVE_STATUSES),
+        )
+        return cursor.rowcount
@@ -0,0 +1,102 @@
+"""
+Reserva atómica de capacidad
+
+Toda reserva toma primero el bloqueo de su fila (servicio, día) en
+`ServiceDayLock` y recién entonces verifica la capacidad e inserta, dentro
+de la misma transacción. En PostgreSQL el bloqueo es `SELECT ... FOR UPDATE`
+por fila; en SQLite la primera escritura de la transacción toma el bloqueo
+de escritura de la base, de modo que las reservas concurrentes del mismo
+día se ejecutan una detrás de otra y nunca sobre-reservan.
+"""
+import random
+import time
+
+from django.db import OperationalError, transaction
+from django.db.models import F
+
+from .models import ServiceDayLock, SlotHold
+
+CAPACITY_ERROR_MESSAGE = 'No hay capacidad disponible para esta fecha y hora. Intenta otro horario.'
+
+# Reintentos ante bloqueos transitorios (SQLite ocupado, deadlock en PostgreSQL)
+LOCK_RETRIES = 8
+LOCK_RETRY_DELAY = 0.02
+
+
+class CapacityError(Exception):
+    """No queda capacidad para el intervalo solicitado"""
+
+    def __init__(self, message=CAPACITY_ERROR_MESSAGE):
+        super().__init__(message)
+
+
+def lock_service_days(pairs):
+    """Bloquear las filas (service_id, fecha) hasta el fin de la transacción
+
+    Debe llamarse dentro de `transaction.atomic()`. Las filas se crean si no
+    existen y se bloquean siempre en el mismo orden para evitar deadlocks.
+    """
+    pairs = sorted(set(pairs))
+    if not pairs:
+        return
+
+    ServiceDayLock.objects.bulk_create(
+        [ServiceDayLock(service_id=service_id, date=day) for service_id, day in pairs],
+        ignore_conflicts=True,
+    )
+    # Se bloquea el producto servicios × fechas: un superconjunto barato de filtrar
+    locked = ServiceDayLock.objects.filter(
+        service_id__in={service_id for service_id, _ in pairs},
+        date__in={day for _, day in pairs},
+    )
+    list(locked.select_for_update().order_by('service_id', 'date').values_list('id', flat=True))
+    locked.update(version=F('version') + 1)
+
+
+def _is_lock_conflict(error):
+    message = str(error).lower()
+    return 'locked' in message or 'deadlock' in message
+
+
+def run_locked(operation):
+    """Ejecutar `operation` en una transacción, reintentando si choca con otra
+
+    La transacción completa se repite con espera creciente cuando la base
+    reporta un bloqueo transitorio; cualquier otro error se propaga. Dentro
+    de una transacción externa no se reintenta: el error sube a quien la abrió.
+    """
+    if transaction.get_connection().in_atomic_block:
+        with transaction.atomic():
+            return operation()
+
+    for attempt in range(LOCK_RETRIES):
+        try:
+            with transaction.atomic():
+                return operation()
+        except OperationalError as e:
+            if not _is_lock_conflict(e) or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(LOCK_RETRY_DELAY * (attempt + 1) * (1 + random.random()))
+
+
+def reserve_booking(booking):
+    """Guardar una reserva nueva solo si queda capacidad
+
+    La verificación y la inserción ocurren bajo el bloqueo del día, por lo
+    que dos solicitudes por el último cupo no pueden pasar ambas. La
+    retención del usuario sobre el servicio se convierte en la reserva.
+    Lanza `CapacityError` si el intervalo ya está completo.
+    """
+    from services.availability import get_peak_occupancy
+
+    service = booking.service
+
+    def reserve():
+        lock_service_days([(service.id, booking.booking_date)])
+        SlotHold.objects.filter(user=booking.user, service=service).delete()
+        if get_peak_occupancy(service, booking.booking_date, booking.booking_time) >= service.max_capacity:
+            raise CapacityError()
+        booking.save()
+        return booking
+
+    return run_locked(reserve)
@@ -0,0 +1,87 @@
+"""
+Reservas recurrentes
+
+Una serie se expande a todas sus fechas y se valida completa con consultas
+por conjunto: una para las ventanas de disponibilidad y una para la
+ocupación de todos los días, bajo el bloqueo de esos días. Las sesiones se
+insertan juntas con `bulk_create`, así que el costo casi no depende de la
+cantidad de sesiones.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from services.availability import load_day_occupancy
+from .bulk import load_windows, validate_row
+from .emails import send_batch_confirmation_email
+from .models import Booking
+from .occupancy import apply_occupancy_deltas
+from .reservations import lock_service_days, run_locked
+from .signals import bookings_bulk_changed
+
+
+class SeriesConflictError(Exception):
+    """Alguna sesión de la serie no se puede reservar"""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        super().__init__(f'{len(conflicts)} sesiones con conflictos')
+
+
+def create_series(series, skip_conflicts=False):
+    """Guardar `series` (sin guardar aún) y crear todas sus sesiones
+
+    Por defecto es todo o nada: si alguna fecha no está disponible lanza
+    `SeriesConflictError` con la lista de (fecha, error). Con
+    `skip_conflicts` se reservan solo las fechas libres. Devuelve
+    (reservas creadas, conflictos).
+    """
+    service = series.service
+    services = {service.id: service}
+    dates = series.dates()
+    pairs = [(service.id, day) for day in dates]
+    windows = load_windows(services)
+
+    def insert():
+        lock_service_days(pairs)
+        occupancy = load_day_occupancy(services, pairs)
+        now = timezone.localtime().replace(tzinfo=None)
+
+        accepted = []
+        conflicts = []
+        for day in dates:
+            cleaned = {'service': service.id, 'booking_date': day, 'booking_time': series.booking_time}
+            _, errors = validate_row(cleaned, services, windows, occupancy, now)
+            if errors:
+                conflicts.append((day, errors[0]))
+            else:
+                accepted.append(day)
+
+        if not accepted or (conflicts and not skip_conflicts):
+            raise SeriesConflictError(conflicts)
+
+        series.save()
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                user=series.user,
+                service=service,
+                series=series,
+                booking_date=day,
+                booking_time=series.booking_time,
+                contact_phone=series.contact_phone,
+                notes=series.notes,
+                total_price=service.price,
+            )
+            for day in accepted
+        ])
+        apply_occupancy_deltas(Counter((service.id, day, series.booking_time) for day in accepted))
+        return bookings, conflicts
+
+    bookings, conflicts = run_locked(insert)
+
+    # bulk_create no dispara señales: invalidar y notificar explícitamente
+    bookings_bulk_changed.send(sender=Booking, service_ids={service.id}, created=bookings)
+    booking_ids = [booking.id for booking in bookings]
+    transaction.on_commit(lambda: send_batch_confirmation_email(booking_ids))
+    return bookings, conflicts
@@ -0,0 +1,72 @@
+"""
+Señales del ciclo de vida de las reservas
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from services.calendar import bump_calendar_version
+from .models import Booking
+from .occupancy import apply_occupancy_deltas, booking_delta
+from .waitlist import promote_released
+
+
+# Enviada por los caminos que escriben reservas sin señales de modelo
+# (`bulk_create`, `QuerySet.update()`), con los `service_ids` afectados y,
+# si se crearon reservas, la lista `created`
+bookings_bulk_changed = Signal()
+
+
+@receiver(bookings_bulk_changed)
+def invalidate_calendars_on_bulk_change(sender, service_ids, **kwargs):
+    """Invalidar los calendarios de los servicios de un cambio en bloque"""
+    bump_calendar_version(*service_ids)
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_service_calendar(sender, instance, **kwargs):
+    """Invalidar el calendario del servicio al crear, cambiar o borrar una reserva"""
+    bump_calendar_version(instance.service_id)
+
+
+# Registradas antes que la lista de espera: la promoción lee la ocupación ya actualizada
+@receiver(post_save, sender=Booking)
+def update_occupancy_on_save(sender, instance, created, **kwargs):
+    """Aplicar a la ocupación por horario el cambio de la reserva"""
+    apply_occupancy_deltas(booking_delta(instance, created))
+
+
+@receiver(post_delete, sender=Booking)
+def update_occupancy_on_delete(sender, instance, **kwargs):
+    """Descontar de la ocupación por horario una reserva activa borrada"""
+    if instance.status in Booking.ACTIVE_STATUSES:
+        apply_occupancy_deltas({(instance.service_id, instance.booking_date, instance.booking_time): -1})
+
+
+def _released_interval(instance):
+    """(service_id, fecha, hora) que dejó de ocupar capacidad al guardar, o None"""
+    original = instance.original
+    if original.get('status') not in Booking.ACTIVE_STATUSES:
+        return None
+    
+    interval = (original['service_id'], original['booking_date'], original['booking_time'])
+    still_active = instance.status in Booking.ACTIVE_STATUSES
+    if still_active and interval == (instance.service_id, instance.booking_date, instance.booking_time):
+        return None
+    return interval
+
+
+@receiver(post_save, sender=Booking)
+def promote_waitlist_on_save(sender, instance, created, **kwargs):
+    """Promover la lista de espera si una reserva se canceló o cambió de horario"""
+    if created:
+        return
+    released = _released_interval(instance)
+    if released:
+        promote_released([released])
+
+
+@receiver(post_delete, sender=Booking)
+def promote_waitlist_on_delete(sender, instance, **kwargs):
+    """Promover la lista de espera si se borró una reserva activa"""
+    if instance.status in Booking.ACTIVE_STATUSES:
+        promote_released([(instance.service_id, instance.booking_date, instance.booking_time)])
@@ -0,0 +1,42 @@
+"""
+Cambios de estado de reservas en bloque
+
+`QuerySet.update()` no dispara señales, así que este módulo aplica a mano
+lo que las señales hacen en un guardado individual: ajustar la ocupación
+por horario, invalidar calendarios y promover la lista de espera.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from .models import Booking
+from .occupancy import apply_occupancy_deltas
+from .signals import bookings_bulk_changed
+from .waitlist import promote_released
+
+
+def update_bookings_status(queryset, status, **fields):
+    """Pasar las reservas de `queryset` a `status` con un solo UPDATE
+
+    `fields` permite actualizar otros campos en la misma consulta (por
+    ejemplo `cancelled_at`). Devuelve la cantidad de reservas actualizadas.
+    """
+    activates = status in Booking.ACTIVE_STATUSES
+    with transaction.atomic():
+        service_ids = list(queryset.order_by().values_list('service_id', flat=True).distinct())
+        # Reservas que entran o salen de la ocupación con el nuevo estado
+        if activates:
+            changed = queryset.exclude(status__in=Booking.ACTIVE_STATUSES)
+        else:
+            changed = queryset.filter(status__in=Booking.ACTIVE_STATUSES)
+        changed = list(
+            changed.select_for_update().order_by()
+            .values_list('service_id', 'booking_date', 'booking_time')
+        )
+        updated = queryset.update(status=status, **fields)
+        sign = 1 if activates else -1
+        apply_occupancy_deltas({key: sign * units for key, units in Counter(changed).items()})
+    bookings_bulk_changed.send(sender=Booking, service_ids=set(service_ids))
+    if not activates:
+        promote_released(changed)
+    return updated
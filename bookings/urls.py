@@ -7,6 +7,11 @@ urlpatterns = [
     path('', views.bookings_list, name='list'),
     path('<int:pk>/', views.booking_detail, name='detail'),
     path('<int:service_id>/create/', views.create_booking, name='create'),
+    path('<int:service_id>/hold/', views.hold_slot, name='hold'),
+    path('<int:service_id>/waitlist/', views.join_waitlist, name='waitlist_join'),
+    path('<int:service_id>/series/', views.create_booking_series, name='series_create'),
+    path('series/<int:pk>/cancel/', views.cancel_booking_series, name='series_cancel'),
+    path('bulk/', views.bulk_create_bookings, name='bulk_create'),
     path('<int:pk>/cancel/', views.cancel_booking, name='cancel'),
     path('<int:booking_id>/review/', views.create_review, name='review'),
 ]
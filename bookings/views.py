@@ -1,66 +1,21 @@
+import json
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
-from django.utils import timezone
-from django import forms
-from datetime import datetime, timedelta
-from .models import Booking, Review
+from django.conf import settings
+from django.http import JsonResponse
+from .models import Booking, BookingSeries, Review
+from .forms import BookingForm, BookingSeriesForm, ReviewForm, SlotHoldForm, WaitlistForm
 from .emails import send_booking_confirmation_email, send_booking_cancelled_email
+from .reservations import reserve_booking, CapacityError, CAPACITY_ERROR_MESSAGE
+from .bulk import create_bookings_bulk, results_report
+from .holds import place_hold
+from .series import create_series, SeriesConflictError
 from services.models import Service
 
 
-class BookingForm(forms.ModelForm):
-    """Formulario para crear reservas"""
-    booking_date = forms.DateField(
-        widget=forms.DateInput(attrs={'type': 'date'}),
-        label='Fecha de la Reserva'
-    )
-    booking_time = forms.TimeField(
-        widget=forms.TimeInput(attrs={'type': 'time'}),
-        label='Hora de Inicio'
-    )
-    
-    class Meta:
-        model = Booking
-        fields = ['booking_date', 'booking_time', 'contact_phone', 'notes']
-        labels = {
-            'contact_phone': 'Teléfono de Contacto',
-            'notes': 'Notas Especiales',
-        }
-        widgets = {
-            'notes': forms.Textarea(attrs={'rows': 4}),
-        }
-    
-    def clean(self):
-        cleaned_data = super().clean()
-        booking_date = cleaned_data.get('booking_date')
-        booking_time = cleaned_data.get('booking_time')
-        
-        if booking_date and booking_time:
-            booking_datetime = timezone.make_aware(
-                datetime.combine(booking_date, booking_time)
-            )
-            if booking_datetime < timezone.now():
-                raise forms.ValidationError('No puedes reservar en el pasado')
-        
-        return cleaned_data
-
-
-class ReviewForm(forms.ModelForm):
-    """Formulario para reseñas"""
-    class Meta:
-        model = Review
-        fields = ['rating', 'comment']
-        labels = {
-            'rating': 'Calificación',
-            'comment': 'Comentario',
-        }
-        widgets = {
-            'comment': forms.Textarea(attrs={'rows': 4}),
-        }
-
-
 @require_http_methods(["GET", "POST"])
 @login_required
 def create_booking(request, service_id):
@@ -68,33 +23,159 @@ def create_booking(request, service_id):
     service = get_object_or_404(Service, id=service_id, is_active=True)
     
     if request.method == 'POST':
-        form = BookingForm(request.POST, service=service)
+        form = BookingForm(request.POST, service=service, user=request.user)
         if form.is_valid():
             booking = form.save(commit=False)
             booking.user = request.user
             booking.service = service
             booking.total_price = service.price
-            booking.save()
-            
-            # Enviar email de confirmación
-            send_booking_confirmation_email(booking.id)
             
-            messages.success(request, f'¡Reserva creada exitosamente! Te hemos enviado un email de confirmación.')
-            return redirect('bookings:list')
+            try:
+                # Verificar capacidad e insertar bajo bloqueo del día
+                reserve_booking(booking)
+            except CapacityError as e:
+                form.add_error(None, str(e))
+            else:
+                # Enviar email de confirmación
+                send_booking_confirmation_email(booking.id)
+                
+                messages.success(request, f'¡Reserva creada exitosamente! Te hemos enviado un email de confirmación.')
+                return redirect('bookings:list')
     else:
         # Prellenar con teléfono del perfil si existe
         initial = {}
         if request.user.profile.phone:
             initial['contact_phone'] = request.user.profile.phone
-        form = BookingForm(initial=initial, service=service)
+        form = BookingForm(initial=initial, service=service, user=request.user)
     
     context = {
         'form': form,
         'service': service,
+        'capacity_full': CAPACITY_ERROR_MESSAGE in form.non_field_errors(),
     }
     return render(request, 'bookings/create.html', context)
 
 
+@require_http_methods(["GET", "POST"])
+@login_required
+def create_booking_series(request, service_id):
+    """Crear una serie de reservas recurrentes"""
+    service = get_object_or_404(Service, id=service_id, is_active=True)
+    conflicts = []
+    
+    if request.method == 'POST':
+        form = BookingSeriesForm(request.POST)
+        if form.is_valid():
+            series = form.save(commit=False)
+            series.user = request.user
+            series.service = service
+            
+            try:
+                bookings, conflicts = create_series(series, skip_conflicts=form.cleaned_data['skip_conflicts'])
+            except SeriesConflictError as e:
+                conflicts = e.conflicts
+                form.add_error(None, f'{len(conflicts)} de {series.occurrences} sesiones no están disponibles')
+            else:
+                message = f'¡Serie creada! Reservamos {len(bookings)} sesiones.'
+                if conflicts:
+                    message += f' Se omitieron {len(conflicts)} fechas sin disponibilidad.'
+                messages.success(request, message)
+                return redirect('bookings:list')
+    else:
+        initial = {'interval_weeks': 1}
+        if request.user.profile.phone:
+            initial['contact_phone'] = request.user.profile.phone
+        form = BookingSeriesForm(initial=initial)
+    
+    context = {
+        'form': form,
+        'service': service,
+        'conflicts': conflicts,
+    }
+    return render(request, 'bookings/series_create.html', context)
+
+
+@require_http_methods(["POST"])
+@login_required
+def cancel_booking_series(request, pk):
+    """Cancelar todas las sesiones futuras de una serie"""
+    series = get_object_or_404(BookingSeries, id=pk, user=request.user)
+    cancelled = series.cancel(reason=request.POST.get('reason', ''))
+    
+    if cancelled:
+        messages.success(request, f'Serie cancelada: {cancelled} sesiones futuras canceladas.')
+    else:
+        messages.error(request, 'La serie no tiene sesiones futuras para cancelar')
+    
+    return redirect('bookings:list')
+
+
+@require_http_methods(["POST"])
+@login_required
+def hold_slot(request, service_id):
+    """Retener temporalmente el horario elegido mientras se completa la reserva"""
+    service = get_object_or_404(Service, id=service_id, is_active=True)
+    form = SlotHoldForm(request.POST, service=service, user=request.user)
+    if not form.is_valid():
+        errors = [error for field_errors in form.errors.values() for error in field_errors]
+        return JsonResponse({'error': errors[0]}, status=400)
+    
+    try:
+        hold = place_hold(
+            request.user, service, form.cleaned_data['booking_date'], form.cleaned_data['booking_time']
+        )
+    except CapacityError as e:
+        return JsonResponse({'error': str(e)}, status=409)
+    
+    return JsonResponse({
+        'hold': hold.id,
+        'expires_at': hold.expires_at.isoformat(),
+        'minutes': settings.BOOKING_HOLD_MINUTES,
+    })
+
+
+@require_http_methods(["POST"])
+@login_required
+def join_waitlist(request, service_id):
+    """Anotarse en la lista de espera de un horario lleno"""
+    service = get_object_or_404(Service, id=service_id, is_active=True)
+    form = WaitlistForm(request.POST, service=service, user=request.user)
+    
+    if form.is_valid():
+        entry = form.save(commit=False)
+        entry.user = request.user
+        entry.service = service
+        entry.save()
+        messages.success(request, 'Te anotamos en la lista de espera. Si se libera un cupo te reservaremos el horario y te avisaremos por email.')
+        return redirect('bookings:list')
+    
+    errors = [error for field_errors in form.errors.values() for error in field_errors]
+    messages.error(request, errors[0])
+    return redirect('bookings:create', service_id=service.id)
+
+
+@require_http_methods(["POST"])
+@login_required
+def bulk_create_bookings(request):
+    """Crear un lote de reservas desde JSON: {"bookings": [{...}, ...]}"""
+    try:
+        rows = json.loads(request.body)['bookings']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'JSON inválido. Formato esperado: {"bookings": [...]}'}, status=400)
+    
+    if not isinstance(rows, list) or not rows:
+        return JsonResponse({'error': 'El lote debe ser una lista no vacía'}, status=400)
+    
+    if len(rows) > settings.BULK_BOOKING_MAX_ROWS:
+        return JsonResponse(
+            {'error': f'El lote supera el máximo de {settings.BULK_BOOKING_MAX_ROWS} reservas'},
+            status=400
+        )
+    
+    results = create_bookings_bulk(request.user, rows)
+    return JsonResponse(results_report(results))
+
+
 @require_http_methods(["GET"])
 @login_required
 def bookings_list(request):
@@ -0,0 +1,119 @@
+"""
+Lista de espera con promoción automática
+
+Cuando una reserva deja de ocupar capacidad se promueven, en orden de
+llegada, las entradas en espera cuyo intervalo se cruza con el liberado.
+La búsqueda usa el índice (service, booking_date, status, booking_time) y
+se limita a la ventana del intervalo liberado, así que el costo no depende
+del tamaño total de la lista de espera. Las entradas cuyo horario ya pasó
+se marcan como vencidas (`expire_waitlist`).
+"""
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from services.availability import day_window, load_day_occupancy, to_minutes, from_minutes, window_error
+from services.models import Service
+from .emails import send_waitlist_promoted_email
+from .models import Booking, Waitlist
+from .reservations import lock_service_days, run_locked
+
+
+def _overlapping_entries(service, booking_date, booking_time):
+    """Entradas en espera cuyo intervalo se cruza con el liberado"""
+    duration = service.duration_minutes
+    start = to_minutes(booking_time)
+
+    lookups = {
+        'service': service,
+        'booking_date': booking_date,
+        'status': 'waiting',
+    }
+    if start - duration >= 0:
+        lookups['booking_time__gt'] = from_minutes(start - duration)
+    if start + duration < 24 * 60:
+        lookups['booking_time__lt'] = from_minutes(start + duration)
+    return Waitlist.objects.filter(**lookups).select_related('user').order_by('created_at', 'id')
+
+
+def _past(now):
+    """Filtro de los horarios anteriores a `now` (hora local sin zona)"""
+    return Q(booking_date__lt=now.date()) | Q(booking_date=now.date(), booking_time__lt=now.time())
+
+
+def expire_waitlist():
+    """Marcar como vencidas las entradas en espera cuyo horario ya pasó; devuelve cuántas"""
+    now = timezone.localtime().replace(tzinfo=None)
+    return Waitlist.objects.filter(_past(now), status='waiting').update(status='expired')
+
+
+def promote_waitlist(service, booking_date, booking_time):
+    """Promover entradas en espera tras liberarse [booking_time, + duración)
+
+    Todo ocurre en una transacción bajo el bloqueo del día: se cargan las
+    candidatas, la ocupación y la disponibilidad del día una sola vez y se
+    crean las reservas que entran, en orden de llegada. Las entradas de
+    horarios pasados o fuera de la disponibilidad vencen. Devuelve las
+    reservas creadas.
+    """
+    def promote():
+        lock_service_days([(service.id, booking_date)])
+        entries = list(_overlapping_entries(service, booking_date, booking_time))
+        if not entries:
+            return []
+
+        day = load_day_occupancy({service.id: service}, [(service.id, booking_date)])[(service.id, booking_date)]
+        window = day_window(service, booking_date)
+        now = timezone.localtime().replace(tzinfo=None)
+        promoted, expired = [], []
+        for entry in entries:
+            # Un horario pasado o que ya no está en la disponibilidad no se puede reservar
+            if (datetime.combine(entry.booking_date, entry.booking_time) < now
+                    or window_error(window, entry.booking_date, entry.booking_time)):
+                expired.append(entry.id)
+                continue
+            start = to_minutes(entry.booking_time)
+            if day.peak(start) >= service.max_capacity:
+                continue
+
+            booking = Booking.objects.create(
+                user=entry.user,
+                service=service,
+                booking_date=entry.booking_date,
+                booking_time=entry.booking_time,
+                contact_phone=entry.contact_phone,
+                notes=entry.notes,
+                total_price=service.price,
+            )
+            entry.status = 'promoted'
+            entry.booking = booking
+            entry.promoted_at = timezone.now()
+            entry.save(update_fields=['status', 'booking', 'promoted_at'])
+            day.add(start)
+            promoted.append(booking)
+        if expired:
+            Waitlist.objects.filter(id__in=expired).update(status='expired')
+        return promoted
+
+    promoted = run_locked(promote)
+    for booking in promoted:
+        transaction.on_commit(lambda booking_id=booking.id: send_waitlist_promoted_email(booking_id))
+    return promoted
+
+
+def promote_released(released):
+    """Promover la lista de espera para varios intervalos liberados
+
+    `released` contiene tuplas (service_id, fecha, hora) de reservas que
+    dejaron de ocupar capacidad, por ejemplo tras una acción masiva del admin.
+    """
+    released = sorted(set(released))
+    if not released:
+        return []
+    services = Service.objects.in_bulk({service_id for service_id, _, _ in released})
+    promoted = []
+    for service_id, booking_date, booking_time in released:
+        promoted += promote_waitlist(services[service_id], booking_date, booking_time)
+    return promoted
@@ -3,6 +3,9 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+En producción se sirve con gunicorn y workers de uvicorn (ver Procfile) para
+que el flujo SSE del dashboard mantenga conexiones abiertas sin ocupar hilos.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
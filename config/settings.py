@@ -18,6 +18,18 @@ CSRF_TRUSTED_ORIGINS = config(
 TIME_ZONE = config('TIME_ZONE', default='UTC')
 LANGUAGE_CODE = config('LANGUAGE_CODE', default='en-us')
 
+# Intervalo entre horarios de inicio ofrecidos al reservar (minutos)
+BOOKING_SLOT_MINUTES = config('BOOKING_SLOT_MINUTES', default=30, cast=int)
+
+# Máximo de filas aceptadas por lote de reservas masivas
+BULK_BOOKING_MAX_ROWS = config('BULK_BOOKING_MAX_ROWS', default=500, cast=int)
+
+# Máximo de sesiones por serie de reservas recurrentes
+BOOKING_SERIES_MAX_OCCURRENCES = config('BOOKING_SERIES_MAX_OCCURRENCES', default=260, cast=int)
+
+# Minutos que un horario elegido queda retenido mientras se completa la reserva
+BOOKING_HOLD_MINUTES = config('BOOKING_HOLD_MINUTES', default=10, cast=int)
+
 
 # Application definition
 
@@ -94,6 +106,38 @@ else:
     }
 
 
+# Cache (LocMem por proceso). Las versiones que invalidan lo cacheado viven en
+# la base (`services.versions`), así que cada worker descarta lo suyo aunque
+# la caché no sea compartida
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='spa-cache'),
+    }
+}
+
+# Segundos que se conserva un calendario mensual de horarios libres
+CALENDAR_CACHE_TIMEOUT = config('CALENDAR_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Segundos que se conserva la foto de estadísticas del dashboard
+DASHBOARD_STATS_TIMEOUT = config('DASHBOARD_STATS_TIMEOUT', default=15 * 60, cast=int)
+
+# Reservas por página en la gestión de reservas del dashboard
+DASHBOARD_BOOKINGS_PAGE_SIZE = config('DASHBOARD_BOOKINGS_PAGE_SIZE', default=50, cast=int)
+
+# Filas que se leen de la base por tanda en las exportaciones en streaming
+DASHBOARD_EXPORT_CHUNK_SIZE = config('DASHBOARD_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Bytes que un archivo exportado se mantiene en memoria antes de pasar a disco
+DASHBOARD_EXPORT_SPOOL_SIZE = config('DASHBOARD_EXPORT_SPOOL_SIZE', default=5 * 1024 * 1024, cast=int)
+
+# Segundos que se conservan las exportaciones en segundo plano ya generadas
+DASHBOARD_EXPORT_RETENTION = config('DASHBOARD_EXPORT_RETENTION', default=24 * 60 * 60, cast=int)
+
+# Segundos tras los que una exportación en curso se da por interrumpida
+DASHBOARD_EXPORT_JOB_TIMEOUT = config('DASHBOARD_EXPORT_JOB_TIMEOUT', default=60 * 60, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -129,8 +173,12 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 
 # WhiteNoise configuration (producción)
 STORAGES = {
+    # Archivos subidos y exportaciones en segundo plano: el worker los escribe y
+    # la web los sirve. Si corren en máquinas distintas (ej. un worker de Render)
+    # tiene que ser un almacenamiento compartido, como S3 con django-storages
+    # (`storages.backends.s3.S3Storage` y sus variables AWS_*); el disco local no sirve
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "BACKEND": config('FILE_STORAGE_BACKEND', default='django.core.files.storage.FileSystemStorage'),
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -0,0 +1,137 @@
+"""
+Cohortes mensuales y retención de clientes
+
+Las reservas se leen como columnas planas (usuario, fecha, monto, estado)
+con `values_list(...).iterator()` y todo el cálculo se hace con arreglos de
+NumPy: mes de la primera reserva de cada cliente, matriz de clientes
+activos por cohorte y mes transcurrido, tasa de recompra y ticket
+promedio. No hay consultas ni bucles de Python por usuario.
+
+El cálculo lee todas las reservas, así que nunca corre en una petición: lo
+hace `refresh_cohorts` desde cron y lo guarda en `CohortReport`, donde lo
+ven todos los procesos. La página muestra el último guardado y avisa si no
+es de hoy.
+"""
+from datetime import date
+
+import numpy as np
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from bookings.models import Booking
+from .models import CohortReport
+
+# Estados que cuentan como compra; las canceladas y ausencias no
+COUNTED_STATUSES = ('pending', 'confirmed', 'completed')
+
+
+def load_columns():
+    """Columnas (usuario, mes absoluto, monto) de las reservas que cuentan como compra"""
+    rows = (
+        Booking.objects.filter(status__in=COUNTED_STATUSES)
+        .order_by().values_list('user_id', 'booking_date', 'total_price')
+    )
+    users, months, prices = [], [], []
+    for user_id, booking_date, total_price in rows.iterator(chunk_size=10000):
+        users.append(user_id)
+        months.append(booking_date.year * 12 + booking_date.month - 1)
+        prices.append(total_price)
+
+    return (
+        np.array(users, dtype=np.int64),
+        np.array(months, dtype=np.int32),
+        np.array(prices, dtype=np.float64),
+    )
+
+
+def _month_start(absolute_month):
+    return date(int(absolute_month) // 12, int(absolute_month) % 12 + 1, 1)
+
+
+def compute_cohorts(users, months, prices, last_month, cohort_months=12):
+    """Informe de las `cohort_months` cohortes que terminan en el mes absoluto `last_month`"""
+    if not len(users):
+        return {'cohorts': [], 'offsets': list(range(cohort_months)), 'customers': 0,
+                'bookings': 0, 'repeat_rate': 0.0, 'average_order_value': 0.0}
+
+    # Índice denso de cliente y mes de su primera reserva
+    user_ids, customer = np.unique(users, return_inverse=True)
+    first_month = np.full(len(user_ids), np.iinfo(np.int32).max, dtype=np.int32)
+    np.minimum.at(first_month, customer, months)
+    offset = months - first_month[customer]
+
+    # Solo las cohortes de la ventana pedida
+    first_cohort = last_month - cohort_months + 1
+    cohort_of_customer = first_month - first_cohort
+    in_window = (cohort_of_customer >= 0) & (cohort_of_customer < cohort_months)
+    booking_cohort = cohort_of_customer[customer]
+    booking_in_window = in_window[customer] & (offset < cohort_months)
+
+    # Clientes distintos por (cohorte, mes transcurrido)
+    cells = np.unique(
+        customer[booking_in_window].astype(np.int64) * cohort_months + offset[booking_in_window]
+    )
+    cell_cohort = cohort_of_customer[cells // cohort_months]
+    active = np.bincount(
+        cell_cohort * cohort_months + cells % cohort_months, minlength=cohort_months * cohort_months
+    ).reshape(cohort_months, cohort_months)
+
+    bookings_per_customer = np.bincount(customer)
+    window_cohorts = cohort_of_customer[in_window]
+    sizes = np.bincount(window_cohorts, minlength=cohort_months)
+    repeaters = np.bincount(window_cohorts, weights=bookings_per_customer[in_window] > 1, minlength=cohort_months)
+    in_cohort = in_window[customer]
+    revenue = np.bincount(booking_cohort[in_cohort], weights=prices[in_cohort], minlength=cohort_months)
+    orders = np.bincount(booking_cohort[in_cohort], minlength=cohort_months)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        retention = np.where(sizes[:, None] > 0, active / sizes[:, None], 0.0)
+        repeat_rate = np.where(sizes > 0, repeaters / sizes, 0.0)
+        average_order_value = np.where(orders > 0, revenue / orders, 0.0)
+
+    cohorts = []
+    for index in range(cohort_months):
+        if not sizes[index]:
+            continue
+        # Meses que ya transcurrieron para esta cohorte
+        elapsed = cohort_months - index
+        cohorts.append({
+            'month': _month_start(first_cohort + index),
+            'size': int(sizes[index]),
+            'retention': [float(rate) for rate in retention[index, :elapsed]],
+            'repeat_rate': float(repeat_rate[index]),
+            'average_order_value': float(average_order_value[index]),
+        })
+
+    return {
+        'cohorts': cohorts,
+        'offsets': list(range(cohort_months)),
+        'customers': int(len(user_ids)),
+        'bookings': int(len(users)),
+        'repeat_rate': float((bookings_per_customer > 1).mean()),
+        'average_order_value': float(prices.mean()),
+    }
+
+
+def refresh_cohort_report(cohort_months=12):
+    """Calcular el informe de cohortes hasta el mes actual y guardarlo para hoy"""
+    today = timezone.localdate()
+    users, months, prices = load_columns()
+    report = compute_cohorts(users, months, prices, today.year * 12 + today.month - 1, cohort_months)
+    CohortReport.objects.update_or_create(cohort_months=cohort_months, defaults={'day': today, 'data': report})
+    return report
+
+
+def get_cohort_report(cohort_months=12):
+    """Último informe guardado, sin recalcular, con `computed_at` y `stale` (no es de hoy o no hay)"""
+    saved = CohortReport.objects.filter(cohort_months=cohort_months).first()
+    if saved is None:
+        empty = np.array([], dtype=np.int64)
+        report = compute_cohorts(empty, empty.astype(np.int32), empty.astype(np.float64), 0, cohort_months)
+        return dict(report, computed_at=None, stale=True)
+
+    report = saved.data
+    # El JSON guarda los meses como texto
+    for cohort in report['cohorts']:
+        cohort['month'] = parse_date(cohort['month'])
+    return dict(report, computed_at=saved.computed_at, stale=saved.day != timezone.localdate())
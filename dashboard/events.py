@@ -0,0 +1,115 @@
+"""
+Eventos de reservas en vivo para el dashboard (Server-Sent Events)
+
+`hub` reparte cada evento a las conexiones abiertas del proceso: cada
+dashboard conectado es una corrutina esperando en su propia cola, así que
+las pestañas inactivas no consumen hilos ni consultas. Las señales de
+reservas publican después del commit, desde el hilo que sea, y el hub
+entrega en el event loop de cada suscriptor.
+
+El hub vive en memoria del proceso: con varios workers cada uno reparte
+los eventos generados en él mismo. Django 4.2 no detecta la desconexión
+del cliente durante un streaming ASGI, así que cada conexión se cierra a
+los `STREAM_SECONDS` y EventSource reconecta sola.
+"""
+import asyncio
+import json
+import threading
+
+from django.http import StreamingHttpResponse
+
+# Eventos pendientes por conexión; si un cliente se atrasa se descartan
+QUEUE_SIZE = 100
+# Segundos entre comentarios de keep-alive en la conexión SSE
+HEARTBEAT_SECONDS = 15
+# Duración máxima de una conexión antes de pedir al cliente que reconecte
+STREAM_SECONDS = 300
+
+
+class EventHub:
+    """Difusión en memoria de eventos a colas asyncio suscritas"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Registrar una cola en el event loop actual y devolverla"""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        """Entregar `event` a todas las colas; seguro desde cualquier hilo"""
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # El loop ya cerró: la conexión terminó sin desuscribirse
+                self.unsubscribe(queue)
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        pass
+
+
+hub = EventHub()
+
+
+def booking_event(kind, booking):
+    """Evento serializable de una reserva"""
+    return {
+        'type': f'booking.{kind}',
+        'id': booking.id,
+        'service': booking.service.name,
+        'customer': booking.user.get_full_name() or booking.user.username,
+        'date': booking.booking_date.isoformat(),
+        'time': booking.booking_time.strftime('%H:%M'),
+    }
+
+
+def format_sse(event):
+    """Mensaje SSE con el tipo del evento como nombre"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream(queue, seconds=STREAM_SECONDS):
+    """Mensajes SSE de `queue` durante `seconds`, con keep-alive periódico"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    yield f'retry: {HEARTBEAT_SECONDS * 1000}\n\n'
+    while (remaining := deadline - loop.time()) > 0:
+        try:
+            event = await asyncio.wait_for(queue.get(), timeout=min(HEARTBEAT_SECONDS, remaining))
+        except asyncio.TimeoutError:
+            yield ': keep-alive\n\n'
+            continue
+        yield format_sse(event)
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    """Respuesta SSE suscrita al hub; se desuscribe cuando el servidor la cierra"""
+
+    def __init__(self, *args, **kwargs):
+        self.queue = hub.subscribe()
+        super().__init__(stream(self.queue), *args, content_type='text/event-stream', **kwargs)
+        self['Cache-Control'] = 'no-cache'
+        self['X-Accel-Buffering'] = 'no'
+
+    def close(self):
+        hub.unsubscribe(self.queue)
+        super().close()
@@ -0,0 +1,114 @@
+"""
+Exportaciones en segundo plano
+
+La vista crea un `ExportJob` y el worker (`python manage.py run_export_worker`)
+lo toma de la cola, arma el archivo con `dashboard.renderers` y va
+guardando el avance en la fila, que es lo que consulta la interfaz. El
+estado vive en la base porque el worker es otro proceso y no comparte la
+caché local de la web.
+
+La clave de un trabajo resume tipo, formato, filtros, día y la versión de
+los temas de datos de la exportación: mientras nada cambie, repetir la
+misma exportación devuelve el trabajo ya hecho en lugar de generarla otra
+vez. Un trabajo en cola o en curso con el mismo tipo, formato y filtros se
+reutiliza siempre: todavía lee los datos actuales.
+
+El archivo se guarda en el almacenamiento por defecto. Si el worker corre
+en otra máquina que la web, tiene que ser uno compartido (ver
+`FILE_STORAGE_BACKEND` en la configuración).
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .models import ExportJob
+from .renderers import export_file, export_filename
+from .reports import REPORTS, report_params
+from .stats import stats_version
+
+
+def export_cache_key(kind, fmt, params):
+    """Clave del archivo de (`kind`, `fmt`) con `params` para el día y los datos actuales"""
+    version = stats_version(*REPORTS[kind].topics)
+    payload = json.dumps([kind, fmt, params, timezone.localdate().isoformat(), version], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def submit_export(kind, fmt, params, user=None):
+    """Trabajo para la exportación pedida: uno existente con la misma clave o uno nuevo en cola"""
+    params = report_params(kind, params)
+    active = ExportJob.objects.filter(kind=kind, format=fmt, status__in=ExportJob.ACTIVE_STATUSES)
+    # Pocas filas: los filtros se comparan acá y no con el JSON en SQL
+    for job in active:
+        if job.params == params:
+            return job
+
+    cache_key = export_cache_key(kind, fmt, params)
+    job = ExportJob.objects.filter(cache_key=cache_key, status='done').first()
+    if job and job.file and job.file.storage.exists(job.file.name):
+        return job
+    return ExportJob.objects.create(
+        requested_by=user, kind=kind, format=fmt, params=params, cache_key=cache_key,
+    )
+
+
+def claim_next_job():
+    """Tomar el trabajo en cola más antiguo (o None); dos workers nunca toman el mismo"""
+    while True:
+        job = ExportJob.objects.filter(status='pending').order_by('created_at').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        if ExportJob.objects.filter(pk=job.pk, status='pending').update(status='running', started_at=now):
+            job.status, job.started_at = 'running', now
+            return job
+
+
+def run_export_job(job):
+    """Armar el archivo de `job` guardando el avance; los errores quedan en el trabajo"""
+    def progress(processed, total=None):
+        fields = {'processed': processed}
+        if total is not None:
+            fields['total'] = total
+        ExportJob.objects.filter(pk=job.pk).update(**fields)
+
+    try:
+        with export_file(job.kind, job.format, job.params, progress) as file:
+            job.file.save(export_filename(job.kind, job.format), File(file), save=False)
+    except Exception as error:
+        job.status, job.error = 'failed', str(error) or error.__class__.__name__
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        return job
+
+    job.status, job.finished_at = 'done', timezone.now()
+    job.save(update_fields=['file', 'status', 'finished_at'])
+    return job
+
+
+def fail_stale_jobs():
+    """Marcar como fallidos los trabajos en curso desde hace más de `DASHBOARD_EXPORT_JOB_TIMEOUT`
+
+    Son los que quedaron a medias porque el worker se detuvo; así un pedido
+    igual vuelve a encolarse en lugar de esperar para siempre.
+    """
+    now = timezone.now()
+    return ExportJob.objects.filter(
+        status='running', started_at__lt=now - timedelta(seconds=settings.DASHBOARD_EXPORT_JOB_TIMEOUT),
+    ).update(status='failed', error='Se interrumpió la generación', finished_at=now)
+
+
+def purge_export_jobs():
+    """Borrar los trabajos terminados hace más de `DASHBOARD_EXPORT_RETENTION`, con sus archivos"""
+    cutoff = timezone.now() - timedelta(seconds=settings.DASHBOARD_EXPORT_RETENTION)
+    count = 0
+    for job in ExportJob.objects.filter(finished_at__lt=cutoff).exclude(status__in=ExportJob.ACTIVE_STATUSES):
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
@@ -0,0 +1,30 @@
+"""
+Filtros del listado de reservas compartidos por la gestión y las exportaciones
+"""
+from django.utils.dateparse import parse_date
+
+from bookings.models import Booking
+
+
+def filter_bookings(bookings, params):
+    """Aplicar a `bookings` los filtros de estado, servicio y fecha de `params`
+
+    Solo los valores válidos llegan a la consulta (índices por estado,
+    servicio y fecha); los inválidos se ignoran.
+    """
+    status = params.get('status')
+    if status in dict(Booking.STATUS_CHOICES):
+        bookings = bookings.filter(status=status)
+    
+    service = params.get('service')
+    if service and service.isdigit():
+        bookings = bookings.filter(service_id=service)
+    
+    try:
+        booking_date = parse_date(params.get('date') or '')
+    except ValueError:
+        booking_date = None
+    if booking_date:
+        bookings = bookings.filter(booking_date=booking_date)
+    
+    return bookings
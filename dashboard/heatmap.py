@@ -0,0 +1,174 @@
+"""
+Mapa de calor de ocupación por servicio, día de la semana y franja de 15 minutos
+
+Las reservas no canceladas del rango se leen como columnas planas
+(servicio, fecha, hora) y cada una reparte la duración de su servicio entre
+las franjas que cubre, todo con arreglos de NumPy: una reserva de 60
+minutos a las 10:05 suma 10 minutos a la franja de las 10:00, 15 a las
+siguientes tres y 5 a la de las 11:00. La utilización divide esos minutos
+por la capacidad disponible de la franja (capacidad del servicio por
+número de veces que ese día de la semana cae en el rango). El resultado se
+cachea por rango de fechas y versión de reservas y servicios.
+"""
+from datetime import time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.dateparse import parse_date
+
+from bookings.models import Booking
+from services.models import Availability, Service
+from .stats import stats_version
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+HEATMAP_KEY = 'dashboard:heatmap:{version}:{start}:{end}'
+# Rango por defecto del mapa de calor
+HEATMAP_DEFAULT_DAYS = 90
+
+
+def heatmap_range(params, today):
+    """Rango (inicio, fin) pedido; valores inválidos usan los últimos `HEATMAP_DEFAULT_DAYS` días"""
+    try:
+        end = parse_date(params.get('end') or '') or today
+        start = parse_date(params.get('start') or '')
+    except ValueError:
+        end, start = today, None
+    if start is None or start > end:
+        start = end - timedelta(days=HEATMAP_DEFAULT_DAYS - 1)
+    return start, end
+
+
+def load_columns(start, end):
+    """Columnas (servicio, día de la semana, minuto del día) de las reservas no canceladas del rango"""
+    rows = (
+        Booking.objects.filter(booking_date__range=(start, end))
+        .exclude(status='cancelled')
+        .order_by()
+        .values_list('service_id', 'booking_date', 'booking_time')
+    )
+    services, dates, minutes = [], [], []
+    for service_id, booking_date, booking_time in rows.iterator(chunk_size=10000):
+        services.append(service_id)
+        dates.append(booking_date)
+        minutes.append(booking_time.hour * 60 + booking_time.minute)
+
+    # El 1970-01-01 fue jueves: desplazar 3 días deja el lunes en 0
+    weekdays = (np.array(dates, dtype='datetime64[D]').astype(np.int64) + 3) % 7
+    return np.array(services, dtype=np.int64), weekdays, np.array(minutes, dtype=np.int64)
+
+
+def weekday_counts(start, end):
+    """Cuántas veces cae cada día de la semana (lunes = 0) en el rango inclusivo"""
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    return np.bincount((days.astype(np.int64) + 3) % 7, minlength=7)
+
+
+def occupied_minutes(service_index, weekdays, minutes, durations, service_count):
+    """Matriz (servicio, día, franja) con los minutos reservados en cada franja"""
+    if not len(service_index):
+        return np.zeros((service_count, 7, SLOTS_PER_DAY))
+
+    # Minuto de la semana en que empieza y termina cada reserva
+    starts = weekdays * 24 * 60 + minutes
+    ends = starts + durations[service_index]
+    first_slot = starts // SLOT_MINUTES
+    spans = np.maximum((ends - 1) // SLOT_MINUTES - first_slot + 1, 0)
+
+    # Una columna por franja cubierta; las que sobran quedan con solapamiento 0
+    slots = first_slot[:, None] + np.arange(int(spans.max()))
+    overlap = np.clip(
+        np.minimum(ends[:, None], (slots + 1) * SLOT_MINUTES) - np.maximum(starts[:, None], slots * SLOT_MINUTES),
+        0, None,
+    )
+    # Lo que pasa de la medianoche del domingo vuelve al lunes
+    cells = service_index[:, None] * WEEK_SLOTS + slots % WEEK_SLOTS
+    return np.bincount(
+        cells.ravel(), weights=overlap.ravel(), minlength=service_count * WEEK_SLOTS
+    ).reshape(service_count, 7, SLOTS_PER_DAY)
+
+
+def open_slots(service_ids, windows):
+    """Matriz booleana (servicio, día, franja) de las franjas dentro de `Availability`"""
+    position = {service_id: index for index, service_id in enumerate(service_ids)}
+    slot_starts = np.arange(SLOTS_PER_DAY) * SLOT_MINUTES
+    mask = np.zeros((len(service_ids), 7, SLOTS_PER_DAY), dtype=bool)
+    for service_id, day_of_week, start_time, end_time in windows:
+        opens = start_time.hour * 60 + start_time.minute
+        closes = end_time.hour * 60 + end_time.minute
+        mask[position[service_id], day_of_week] = (slot_starts + SLOT_MINUTES > opens) & (slot_starts < closes)
+    return mask
+
+
+def compute_heatmap(start, end):
+    """Mapa de calor de ocupación de los servicios activos entre `start` y `end`"""
+    services = list(Service.objects.filter(is_active=True).order_by('id').values_list(
+        'id', 'name', 'duration_minutes', 'max_capacity'
+    ))
+    service_ids = np.array([service[0] for service in services], dtype=np.int64)
+    windows = Availability.objects.filter(
+        service_id__in=service_ids.tolist(), is_available=True
+    ).values_list('service_id', 'day_of_week', 'start_time', 'end_time')
+
+    booked_services, weekdays, minutes = load_columns(start, end)
+    # Las reservas de servicios inactivos no entran en el mapa
+    known = np.isin(booked_services, service_ids)
+    service_index = np.searchsorted(service_ids, booked_services[known])
+    durations = np.array([service[2] for service in services], dtype=np.int64)
+    booked = occupied_minutes(service_index, weekdays[known], minutes[known], durations, len(services))
+    opened = open_slots(service_ids.tolist(), windows)
+
+    capacities = np.array([service[3] for service in services], dtype=np.float64)
+    available = SLOT_MINUTES * capacities[:, None, None] * weekday_counts(start, end)[None, :, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        utilization = np.where(available > 0, booked / available, 0.0)
+
+    # Solo las franjas con horario o reservas en algún servicio
+    used = np.flatnonzero((opened | (booked > 0)).any(axis=(0, 1)))
+    columns = np.arange(used[0], used[-1] + 1) if len(used) else np.arange(0)
+
+    days = [name for _, name in Availability.DAYS_OF_WEEK]
+    totals = available.sum(axis=(1, 2))
+    return {
+        'start': start,
+        'end': end,
+        'slots': [time(*divmod(int(slot) * SLOT_MINUTES, 60)) for slot in columns],
+        'bookings': int(known.sum()),
+        'services': [
+            {
+                'id': service_id,
+                'name': name,
+                'duration_minutes': duration,
+                'capacity': capacity,
+                'booked_minutes': float(booked[index].sum()),
+                'utilization': float(booked[index].sum() / totals[index]) if totals[index] else 0.0,
+                'rows': [
+                    {
+                        'day': days[day],
+                        'cells': [
+                            {'minutes': float(value), 'rate': float(rate), 'open': bool(is_open)}
+                            for value, rate, is_open in zip(
+                                booked[index, day, columns], utilization[index, day, columns], opened[index, day, columns]
+                            )
+                        ],
+                    }
+                    for day in range(7)
+                ],
+            }
+            for index, (service_id, name, duration, capacity) in enumerate(services)
+        ],
+    }
+
+
+def get_heatmap(start, end):
+    """Mapa de calor del rango, leído de la caché mientras no cambien reservas ni servicios"""
+    key = HEATMAP_KEY.format(
+        version=stats_version('bookings', 'services'), start=start.isoformat(), end=end.isoformat()
+    )
+    heatmap = cache.get(key)
+    if heatmap is None:
+        heatmap = compute_heatmap(start, end)
+        cache.set(key, heatmap, settings.DASHBOARD_STATS_TIMEOUT)
+    return heatmap
@@ -0,0 +1,20 @@
+"""
+Reconstruir el acumulado diario de ingresos desde las reservas pagadas
+Ejecutar con: python manage.py backfill_revenue [--chunk-days 31]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.revenue import backfill_revenue
+
+
+class Command(BaseCommand):
+    help = 'Reconstruir la tabla DailyRevenue por tramos de fechas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-days', type=int, default=31, help='Días por tramo (una transacción por tramo)')
+
+    def handle(self, *args, **options):
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days debe ser mayor que 0')
+        rows = backfill_revenue(chunk_days=options['chunk_days'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f'✅ Acumulado de ingresos reconstruido: {rows} filas'))
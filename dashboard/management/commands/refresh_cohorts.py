@@ -0,0 +1,20 @@
+"""
+Recalcular el informe de cohortes y guardarlo para el día
+Ejecutar a diario con: python manage.py refresh_cohorts
+"""
+from django.core.management.base import BaseCommand
+
+from dashboard.cohorts import refresh_cohort_report
+
+
+class Command(BaseCommand):
+    help = 'Recalcular el informe de cohortes mensuales y guardarlo para el día'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=12, help='Cantidad de cohortes mensuales')
+
+    def handle(self, *args, **options):
+        report = refresh_cohort_report(cohort_months=options['months'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Cohortes recalculadas: {report['customers']} clientes, {report['bookings']} reservas"
+        ))
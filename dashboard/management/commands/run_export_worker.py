@@ -0,0 +1,44 @@
+"""
+Worker de las exportaciones en segundo plano del dashboard
+Ejecutar como proceso aparte con: python manage.py run_export_worker
+"""
+import time
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from dashboard.export_jobs import claim_next_job, fail_stale_jobs, purge_export_jobs, run_export_job
+
+
+class Command(BaseCommand):
+    help = 'Generar las exportaciones en cola del dashboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Procesar la cola actual y salir')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Segundos de espera con la cola vacía')
+
+    def handle(self, *args, **options):
+        if isinstance(default_storage, FileSystemStorage):
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ Los archivos se guardan en el disco local ({default_storage.location}): '
+                'la web solo los puede descargar si corre en la misma máquina. '
+                'En un servicio aparte configurar FILE_STORAGE_BACKEND con un almacenamiento compartido.'
+            ))
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is not None:
+                job = run_export_job(job)
+                if job.status == 'done':
+                    self.stdout.write(self.style.SUCCESS(f'✅ {job}: {job.file.name}'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'❌ {job}: {job.error}'))
+                continue
+
+            # Cola vacía: limpiar trabajos interrumpidos y archivos vencidos
+            fail_stale_jobs()
+            purge_export_jobs()
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.14 on 2026-10-18 07:02
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Coalesce, TruncDate
+import django.db.models.deletion
+
+
+def populate_daily_revenue(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    DailyRevenue = apps.get_model('dashboard', 'DailyRevenue')
+    rows = (
+        Booking.objects.filter(paid=True)
+        .annotate(day=Coalesce(TruncDate('payment_date'), 'booking_date', output_field=DateField()))
+        .order_by()
+        .values_list('day', 'service_id', 'service__category_id')
+        .annotate(total=Sum('total_price'), count=Count('id'))
+    )
+    DailyRevenue.objects.bulk_create(
+        [
+            DailyRevenue(date=day, service_id=service_id, category_id=category_id, revenue=total, paid_count=count)
+            for day, service_id, category_id, total, count in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('services', '0001_initial'),
+        ('bookings', '0008_bookingseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_count', models.IntegerField(default=0, help_text='Reservas pagadas')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to='services.category')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to='services.service')),
+            ],
+            options={
+                'verbose_name': 'Ingreso diario',
+                'verbose_name_plural': 'Ingresos diarios',
+                'ordering': ['date'],
+                'unique_together': {('date', 'service')},
+            },
+        ),
+        migrations.RunPython(populate_daily_revenue, migrations.RunPython.noop),
+    ]
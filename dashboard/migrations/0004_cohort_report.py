@@ -0,0 +1,28 @@
+# Generated by Django 4.2.14 on 2026-10-18 08:25
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_export_job_formats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort_months', models.PositiveSmallIntegerField(unique=True)),
+                ('day', models.DateField(help_text='Día para el que se calculó')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Informe de cohortes',
+                'verbose_name_plural': 'Informes de cohortes',
+            },
+        ),
+    ]
@@ -1,3 +1,124 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.contrib.auth.models import User
+from services.models import Service, Category
+
+
+class DailyRevenue(models.Model):
+    """Ingresos pagados por día y servicio, precalculados para los reportes
+
+    El día es la fecha local de `payment_date` o, si falta, la fecha de la
+    reserva. Se mantiene desde `dashboard.revenue`; se reconstruye con
+    `python manage.py backfill_revenue`.
+    """
+    date = models.DateField()
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='daily_revenue')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_revenue')
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_count = models.IntegerField(default=0, help_text="Reservas pagadas")
+    
+    class Meta:
+        verbose_name = "Ingreso diario"
+        verbose_name_plural = "Ingresos diarios"
+        unique_together = ('date', 'service')
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.date} - {self.service.name}: ${self.revenue} ({self.paid_count})"
+
+
+class ExportJob(models.Model):
+    """Exportación armada en segundo plano por `python manage.py run_export_worker`
+
+    `cache_key` resume tipo, formato, filtros, día y versión de los datos:
+    un pedido con la misma clave reutiliza el trabajo en curso o el archivo
+    ya generado. Los trabajos terminados se borran, con su archivo, pasado
+    `DASHBOARD_EXPORT_RETENTION`.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'En cola'),
+        ('running', 'Generando'),
+        ('done', 'Listo'),
+        ('failed', 'Falló'),
+    ]
+    KIND_CHOICES = [
+        ('bookings', 'Reservas'),
+        ('history', 'Historial de reservas'),
+        ('revenue', 'Ingresos'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+        ('pdf', 'PDF'),
+        ('json', 'JSON'),
+    ]
+    # Estados de un trabajo que todavía no terminó
+    ACTIVE_STATUSES = ('pending', 'running')
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='export_jobs'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    params = models.JSONField(default=dict, blank=True, help_text="Filtros aplicados")
+    cache_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    # Progreso: filas procesadas sobre el total (si se conoce)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    
+    file = models.FileField(upload_to='exports/%Y/%m/%d/', blank=True)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Exportación"
+        verbose_name_plural = "Exportaciones"
+        ordering = ['-created_at']
+        indexes = [
+            # Cola del worker: pendientes por antigüedad
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.get_format_display()}) - {self.get_status_display()}"
+    
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+    
+    @property
+    def percent(self):
+        """Porcentaje de avance (0 mientras no se conozca el total)"""
+        if self.status == 'done':
+            return 100
+        if not self.total:
+            return 0
+        return min(100, self.processed * 100 // self.total)
+
+
+class CohortReport(models.Model):
+    """Informe de cohortes ya calculado, uno por cantidad de cohortes
 
-# Create your models here.
+    Vive en la base para que el que calcula `python manage.py refresh_cohorts`
+    lo lean todos los workers web aunque la caché sea local a cada proceso.
+    Vale durante `day`; se mantiene desde `dashboard.cohorts`.
+    """
+    cohort_months = models.PositiveSmallIntegerField(unique=True)
+    day = models.DateField(help_text="Día para el que se calculó")
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Informe de cohortes"
+        verbose_name_plural = "Informes de cohortes"
+    
+    def __str__(self):
+        return f"{self.cohort_months} cohortes ({self.day})"
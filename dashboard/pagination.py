@@ -0,0 +1,48 @@
+"""
+Paginación por clave (keyset) del listado de reservas
+
+Las reservas se recorren en orden (booking_date, booking_time, id)
+descendente. En lugar de OFFSET, cada página empieza después de la última
+fila de la anterior, identificada por un cursor con esos tres valores; la
+base salta directo a esa posición del índice y el costo de una página no
+depende de cuántas haya antes.
+"""
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_time
+
+ORDERING = ('-booking_date', '-booking_time', '-id')
+
+
+def encode_cursor(booking):
+    """Cursor que apunta justo después de `booking`"""
+    return f'{booking.booking_date.isoformat()}_{booking.booking_time.isoformat()}_{booking.id}'
+
+
+def decode_cursor(value):
+    """(fecha, hora, id) del cursor, o None si no es válido"""
+    try:
+        day, start, pk = value.split('_')
+        cursor = parse_date(day), parse_time(start), int(pk)
+    except (AttributeError, ValueError):
+        return None
+    return cursor if None not in cursor else None
+
+
+def seek(queryset, cursor):
+    """Filtrar `queryset` a las filas posteriores a `cursor` en el orden descendente"""
+    day, start, pk = cursor
+    return queryset.filter(
+        Q(booking_date__lt=day)
+        | Q(booking_date=day, booking_time__lt=start)
+        | Q(booking_date=day, booking_time=start, id__lt=pk)
+    )
+
+
+def keyset_page(queryset, cursor, size):
+    """Página de `size` reservas tras `cursor`; devuelve (reservas, cursor siguiente o None)"""
+    if cursor:
+        queryset = seek(queryset, cursor)
+    rows = list(queryset.order_by(*ORDERING)[:size + 1])
+    if len(rows) > size:
+        return rows[:size], encode_cursor(rows[size - 1])
+    return rows, None
@@ -0,0 +1,152 @@
+"""
+Informes PDF por bloques
+
+Las filas llegan de a tandas y cada tanda se convierte en una `LongTable`
+con el encabezado repetido en cada página, anchos de columna dados y alto
+de fila fijo, así que reportlab no mide el contenido para maquetarla. La
+historia del documento se rellena a medida que reportlab la consume: en
+memoria vive solo la tanda que se está maquetando, además de las páginas ya
+dibujadas que reportlab retiene hasta guardar. El total del pie "Página X
+de Y" se escribe al cerrar el documento, y el PDF va a un temporal que pasa
+a disco al superar `DASHBOARD_EXPORT_SPOOL_SIZE`.
+"""
+from itertools import chain, islice
+from tempfile import SpooledTemporaryFile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+
+MARGIN = 0.5 * inch
+FONT_SIZE = 8
+ROW_HEIGHT = 14
+HEADER_HEIGHT = 20
+CELL_PADDING = 6
+BRAND_COLOR = colors.HexColor('#007bff')
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), BRAND_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), FONT_SIZE),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f1f3f5')]),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+])
+
+
+class _NumberedCanvas(canvas.Canvas):
+    """Canvas con pie "Página X de Y"
+
+    El total se dibuja una sola vez al guardar, en un formulario PDF que
+    cada página referencia de antemano; así no hace falta retener las
+    páginas hasta conocerlo.
+    """
+
+    def showPage(self):
+        self.saveState()
+        self.setFont('Helvetica', 8)
+        self.setFillColor(colors.grey)
+        right = self._pagesize[0] - MARGIN
+        self.drawRightString(right - 16, MARGIN / 2, f'Página {self._pageNumber} de')
+        self.translate(right - 14, MARGIN / 2)
+        self.doForm('pageCount')
+        self.restoreState()
+        super().showPage()
+
+    def save(self):
+        self.beginForm('pageCount')
+        self.setFont('Helvetica', 8)
+        self.setFillColor(colors.grey)
+        self.drawString(0, 0, str(self._pageNumber - 1))
+        self.endForm()
+        super().save()
+
+
+class _LazyStory(list):
+    """Historia que reportlab consume por el frente y que se rellena desde un iterador"""
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._pending = iter(flowables)
+
+    def __len__(self):
+        if not super().__len__():
+            following = next(self._pending, None)
+            if following is not None:
+                self.append(following)
+        return super().__len__()
+
+
+def _fit(text, width):
+    """Recortar `text` para que entre en una celda de `width` puntos"""
+    text = str(text)
+    available = width - CELL_PADDING * 2
+    if stringWidth(text, 'Helvetica', FONT_SIZE) <= available:
+        return text
+    while text and stringWidth(text + '…', 'Helvetica', FONT_SIZE) > available:
+        text = text[:-1]
+    return text + '…'
+
+
+class PdfReport:
+    """Documento PDF de informe: título, secciones y tablas por bloques"""
+
+    def __init__(self, title, pagesize=A4):
+        self.pagesize = pagesize
+        self.styles = getSampleStyleSheet()
+        # Cada elemento es un iterable de flowables; las tablas son generadores de bloques
+        # Paragraph interpreta marcado: los textos (ej. nombres de servicio) van escapados
+        self.sources = [[Paragraph(escape(title), ParagraphStyle(
+            'ReportTitle', parent=self.styles['Heading1'], fontSize=20,
+            textColor=BRAND_COLOR, spaceAfter=20, alignment=1,
+        ))]]
+
+    def note(self, text):
+        self.sources.append([Paragraph(escape(text), self.styles['Italic'])])
+
+    def heading(self, text):
+        self.sources.append([Paragraph(escape(text), self.styles['Heading2'])])
+
+    def spacer(self, height=0.2 * inch):
+        self.sources.append([Spacer(1, height)])
+
+    def table(self, header, rows, widths, fit=(), block_rows=None):
+        """Tabla de `rows` en bloques de `block_rows` filas con el encabezado en cada página
+
+        `widths` son los anchos de columna en puntos; las columnas de `fit`
+        (índices) se recortan para no desbordar su celda.
+        """
+        block_rows = block_rows or settings.DASHBOARD_EXPORT_CHUNK_SIZE
+        self.sources.append(self._blocks(header, iter(rows), widths, set(fit), block_rows))
+
+    def _blocks(self, header, rows, widths, fit, block_rows):
+        while block := list(islice(rows, block_rows)):
+            data = [header] + [
+                [_fit(value, widths[index]) if index in fit else value for index, value in enumerate(row)]
+                for row in block
+            ]
+            table = LongTable(
+                data, colWidths=widths, rowHeights=[HEADER_HEIGHT] + [ROW_HEIGHT] * len(block), repeatRows=1
+            )
+            table.setStyle(TABLE_STYLE)
+            yield table
+
+    def save(self):
+        """Escribir el PDF en un temporal y devolverlo posicionado al inicio"""
+        file = SpooledTemporaryFile(max_size=settings.DASHBOARD_EXPORT_SPOOL_SIZE)
+        document = SimpleDocTemplate(
+            file, pagesize=self.pagesize,
+            leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+        )
+        document.build(_LazyStory(chain.from_iterable(self.sources)), canvasmaker=_NumberedCanvas)
+        file.seek(0)
+        return file
@@ -0,0 +1,250 @@
+"""
+Renderizadores de los reportes del dashboard: PDF, Excel, CSV y JSON
+
+Cada renderizador recibe un `Dataset` de `dashboard.reports` y escribe el
+archivo en un temporal que devuelve posicionado al inicio. El formato de
+cada celda sale del tipo de su columna, así que un reporte nuevo no
+necesita código por formato. `export_file` arma el dataset y lo renderiza;
+con `progress` avisa las filas procesadas (y el total al empezar) cada
+`DASHBOARD_EXPORT_CHUNK_SIZE` filas.
+"""
+import csv
+from collections import namedtuple
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import inch
+
+from .pdf_reports import MARGIN, PdfReport
+from .reports import REPORTS, get_report
+from .spreadsheets import XLSX_CONTENT_TYPE, WorkbookWriter
+
+# Columnas a partir de las que el PDF va apaisado
+PDF_LANDSCAPE_COLUMNS = 7
+# Puntos por carácter de ancho de columna en el PDF (si entran en la página)
+PDF_POINTS_PER_CHAR = 7
+
+
+def _yes_no(value):
+    return 'sí' if value else 'no'
+
+
+def _amount(value):
+    return f'{value:.2f}'
+
+
+# Conversión de valores por formato de columna (los que no figuran pasan tal cual)
+CSV_FORMATS = {
+    'money': _amount,
+    'bool': _yes_no,
+    'datetime': lambda value: timezone.localtime(value).strftime('%Y-%m-%d %H:%M'),
+}
+XLSX_FORMATS = {
+    'bool': _yes_no,
+    # openpyxl no acepta fechas con zona horaria
+    'datetime': lambda value: timezone.localtime(value).replace(tzinfo=None),
+}
+PDF_FORMATS = {
+    'int': str,
+    'money': lambda value: f'${value:.2f}',
+    'bool': _yes_no,
+    'date': lambda value: value.strftime('%d/%m/%Y'),
+    'time': lambda value: value.strftime('%H:%M'),
+    'datetime': lambda value: timezone.localtime(value).strftime('%d/%m/%Y %H:%M'),
+}
+# Montos como texto con dos decimales (la suma en SQLite los devuelve sin escala)
+JSON_FORMATS = {
+    'money': _amount,
+}
+XLSX_STYLES = {'money': 'money', 'date': 'date', 'time': 'time', 'datetime': 'datetime'}
+
+
+def _formatted(section, formats):
+    """Filas de `section` con los valores convertidos según `formats`"""
+    converters = [formats.get(column.format) for column in section.columns]
+    if not any(converters):
+        return section.rows
+    return (
+        [convert(value) if convert and value is not None else value for convert, value in zip(converters, row)]
+        for row in section.rows
+    )
+
+
+# ============================================================================
+# CSV
+# ============================================================================
+
+class _Echo:
+    """Destino de csv.writer que devuelve la línea en lugar de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(dataset):
+    """Texto CSV del dataset, una cadena por tanda de filas; las secciones van separadas por una línea vacía"""
+    writer = csv.writer(_Echo())
+    chunk_size = settings.DASHBOARD_EXPORT_CHUNK_SIZE
+    # BOM para que Excel reconozca el UTF-8
+    prefix = '\ufeff'
+
+    for index, section in enumerate(dataset.sections):
+        lines = [writer.writerow([])] if index else []
+        if section.title:
+            lines.append(writer.writerow([section.title]))
+        lines.append(writer.writerow([column.label for column in section.columns]))
+        yield prefix + ''.join(lines)
+        prefix = ''
+
+        chunk = []
+        for row in _formatted(section, CSV_FORMATS):
+            chunk.append(writer.writerow(row))
+            if len(chunk) == chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+
+def render_csv(dataset):
+    file = SpooledTemporaryFile(max_size=settings.DASHBOARD_EXPORT_SPOOL_SIZE)
+    for chunk in csv_chunks(dataset):
+        file.write(chunk.encode('utf-8'))
+    file.seek(0)
+    return file
+
+
+# ============================================================================
+# EXCEL
+# ============================================================================
+
+def render_xlsx(dataset):
+    width_count = max(len(section.columns) for section in dataset.sections)
+    widths = [
+        max(section.columns[index].width for section in dataset.sections if index < len(section.columns))
+        for index in range(width_count)
+    ]
+
+    workbook = WorkbookWriter()
+    sheet = workbook.sheet(dataset.name, widths=widths)
+    sheet.title(dataset.title)
+    if dataset.subtitle:
+        sheet.title(dataset.subtitle, style='subtitle')
+    sheet.blank()
+
+    for section in dataset.sections:
+        if section.title:
+            sheet.blank()
+            sheet.blank()
+            sheet.title(section.title, style='section')
+        sheet.header([column.label for column in section.columns])
+        sheet.rows(
+            _formatted(section, XLSX_FORMATS),
+            styles=[XLSX_STYLES.get(column.format) for column in section.columns],
+        )
+    return workbook.save()
+
+
+# ============================================================================
+# PDF
+# ============================================================================
+
+def render_pdf(dataset):
+    many_columns = max(len(section.columns) for section in dataset.sections) >= PDF_LANDSCAPE_COLUMNS
+    pagesize = landscape(A4) if many_columns else A4
+    available = pagesize[0] - 2 * MARGIN
+
+    report = PdfReport(dataset.title, pagesize=pagesize)
+    if dataset.subtitle:
+        report.note(dataset.subtitle)
+        report.spacer()
+
+    for index, section in enumerate(dataset.sections):
+        if section.title:
+            if index:
+                report.spacer(0.5 * inch)
+            report.heading(section.title)
+            report.spacer()
+        chars = sum(column.width for column in section.columns)
+        points = min(PDF_POINTS_PER_CHAR, available / chars)
+        report.table(
+            [column.label for column in section.columns],
+            _formatted(section, PDF_FORMATS),
+            widths=[column.width * points for column in section.columns],
+            fit=[position for position, column in enumerate(section.columns) if column.format == 'text'],
+        )
+    return report.save()
+
+
+# ============================================================================
+# JSON
+# ============================================================================
+
+def render_json(dataset):
+    """Objeto con título, parámetros y secciones; las filas se escriben de a una"""
+    encode = DjangoJSONEncoder(ensure_ascii=False).encode
+    file = SpooledTemporaryFile(max_size=settings.DASHBOARD_EXPORT_SPOOL_SIZE)
+
+    def write(text):
+        file.write(text.encode('utf-8'))
+
+    write(f'{{"title": {encode(dataset.title)}, "subtitle": {encode(dataset.subtitle)}, '
+          f'"params": {encode(dataset.params)}, "sections": [')
+    for index, section in enumerate(dataset.sections):
+        columns = [{'label': column.label, 'format': column.format} for column in section.columns]
+        write(f'{", " if index else ""}{{"title": {encode(section.title)}, "columns": {encode(columns)}, "rows": [')
+        for position, row in enumerate(_formatted(section, JSON_FORMATS)):
+            write((', ' if position else '') + encode(list(row)))
+        write(']}')
+    write(']}')
+    file.seek(0)
+    return file
+
+
+# Renderizadores por formato: función, extensión y tipo de contenido
+Renderer = namedtuple('Renderer', ['render', 'extension', 'content_type'])
+
+RENDERERS = {
+    'pdf': Renderer(render_pdf, 'pdf', 'application/pdf'),
+    'xlsx': Renderer(render_xlsx, 'xlsx', XLSX_CONTENT_TYPE),
+    'csv': Renderer(render_csv, 'csv', 'text/csv; charset=utf-8'),
+    'json': Renderer(render_json, 'json', 'application/json'),
+}
+
+
+def export_filename(kind, fmt):
+    return f'{REPORTS[kind].filename}.{RENDERERS[fmt].extension}'
+
+
+def _tracked(dataset, progress):
+    """Dataset cuyas filas avisan a `progress` cada tanda, sumando todas las secciones"""
+    every = settings.DASHBOARD_EXPORT_CHUNK_SIZE
+    processed = 0
+
+    def rows(section_rows, last):
+        nonlocal processed
+        for row in section_rows:
+            yield row
+            processed += 1
+            if processed % every == 0:
+                progress(processed)
+        if last:
+            progress(processed)
+
+    progress(0, dataset.total)
+    sections = dataset.sections
+    return dataset._replace(sections=[
+        section._replace(rows=rows(section.rows, index == len(sections) - 1))
+        for index, section in enumerate(sections)
+    ])
+
+
+def export_file(kind, fmt, params, progress=None):
+    """Archivo del reporte `kind` en formato `fmt`, posicionado al inicio"""
+    dataset = get_report(kind, params, count=progress is not None)
+    if progress is not None:
+        dataset = _tracked(dataset, progress)
+    return RENDERERS[fmt].render(dataset)
@@ -0,0 +1,198 @@
+"""
+Datos de los reportes del dashboard, independientes del formato
+
+Cada reporte arma un `Dataset` a partir de los parámetros de la petición:
+título, subtítulo y secciones con columnas tipadas y filas. Los
+renderizadores de `dashboard.renderers` (PDF, Excel, CSV y JSON) lo
+consumen sin volver a consultar la base.
+
+Los reportes agregados (pocas filas) se guardan en la caché por parámetros,
+día y versión de los temas de datos de los que dependen, así que bajar el
+mismo reporte en dos formatos hace las consultas una sola vez. Los
+listados de reservas no se guardan: sus filas se leen por tandas a medida
+que el renderizador las consume.
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from bookings.models import Booking
+from .filters import filter_bookings
+from .pagination import ORDERING
+from .revenue import revenue_by_service
+from .stats import stats_version
+
+REPORT_KEY = 'dashboard:report:{kind}:{version}:{day}:{params}'
+
+# Formatos de columna: text, int, money, bool, date, time, datetime. El ancho
+# está en caracteres (Excel); el PDF lo reparte en proporción al de la página.
+Column = namedtuple('Column', ['label', 'format', 'width'])
+
+# `title` es None en la sección principal; `rows` es una lista o un iterador de filas
+Section = namedtuple('Section', ['title', 'columns', 'rows'])
+
+# `name` titula la hoja de Excel; `total` son las filas (None si no se contaron)
+Dataset = namedtuple('Dataset', ['title', 'name', 'subtitle', 'params', 'sections', 'total'])
+
+BOOKING_FILTERS = ('status', 'service', 'date')
+REVENUE_FILTERS = ('start', 'end', 'status', 'service')
+
+
+def _parse_date(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def _generated():
+    return f'Generado: {timezone.localtime():%d/%m/%Y %H:%M}'
+
+
+# ============================================================================
+# RESERVAS
+# ============================================================================
+
+def booking_report_rows(bookings, chunk_size):
+    """Filas (usuario, servicio, fecha, estado, monto) leídas de a `chunk_size` reservas"""
+    statuses = dict(Booking.STATUS_CHOICES)
+    rows = bookings.values_list(
+        'user__first_name', 'user__last_name', 'user__username',
+        'service__name', 'booking_date', 'status', 'total_price',
+    )
+    for first_name, last_name, username, service, booking_date, status, total_price in rows.iterator(chunk_size=chunk_size):
+        name = f'{first_name} {last_name}'.strip() or username
+        yield name, service, booking_date, statuses.get(status, status), total_price
+
+
+def bookings_report(params, count=False):
+    """Listado de reservas con los filtros de la gestión"""
+    bookings = filter_bookings(Booking.objects.order_by(*ORDERING), params)
+    columns = [
+        Column('Usuario', 'text', 20),
+        Column('Servicio', 'text', 20),
+        Column('Fecha', 'date', 15),
+        Column('Estado', 'text', 12),
+        Column('Monto', 'money', 12),
+    ]
+    rows = booking_report_rows(bookings, settings.DASHBOARD_EXPORT_CHUNK_SIZE)
+    return Dataset(
+        'Listado de Reservas', 'Reservas', None, params,
+        [Section(None, columns, rows)], bookings.count() if count else None,
+    )
+
+
+# Columnas del historial leídas con values_list: los JOIN con usuario y servicio van en la misma consulta
+HISTORY_COLUMNS = (
+    (Column('ID', 'int', 10), 'id'),
+    (Column('Fecha', 'date', 12), 'booking_date'),
+    (Column('Hora', 'time', 8), 'booking_time'),
+    (Column('Usuario', 'text', 15), 'user__username'),
+    (Column('Nombre', 'text', 15), 'user__first_name'),
+    (Column('Apellido', 'text', 15), 'user__last_name'),
+    (Column('Email', 'text', 25), 'user__email'),
+    (Column('Servicio', 'text', 20), 'service__name'),
+    (Column('Estado', 'text', 12), 'status'),
+    (Column('Pagado', 'bool', 8), 'paid'),
+    (Column('Fecha de pago', 'datetime', 16), 'payment_date'),
+    (Column('Monto', 'money', 10), 'total_price'),
+    (Column('Teléfono', 'text', 14), 'contact_phone'),
+)
+
+
+def history_rows(bookings, chunk_size):
+    """Filas de `HISTORY_COLUMNS` leídas de a `chunk_size` reservas"""
+    statuses = dict(Booking.STATUS_CHOICES)
+    fields = [field for _, field in HISTORY_COLUMNS]
+    status_index = fields.index('status')
+    for row in bookings.values_list(*fields).iterator(chunk_size=chunk_size):
+        row = list(row)
+        row[status_index] = statuses.get(row[status_index], row[status_index])
+        yield row
+
+
+def history_report(params, count=False):
+    """Historial completo de reservas, con todos sus datos y los filtros de la gestión"""
+    bookings = filter_bookings(Booking.objects.order_by(*ORDERING), params)
+    rows = history_rows(bookings, settings.DASHBOARD_EXPORT_CHUNK_SIZE)
+    return Dataset(
+        'Historial de Reservas', 'Historial', None, params,
+        [Section(None, [column for column, _ in HISTORY_COLUMNS], rows)], bookings.count() if count else None,
+    )
+
+
+# ============================================================================
+# INGRESOS
+# ============================================================================
+
+def revenue_report(params, count=False):
+    """Ingresos generales y por servicio, con rango de fechas, estado y servicio opcionales"""
+    today = timezone.localdate()
+    start, end = _parse_date(params.get('start')), _parse_date(params.get('end'))
+    status = params.get('status') if params.get('status') in dict(Booking.STATUS_CHOICES) else None
+    service = params.get('service') if (params.get('service') or '').isdigit() else None
+
+    # Una sola consulta: el resumen es la suma de los servicios
+    breakdown = list(revenue_by_service(today, start, end, service, status))
+    summary = [
+        ('Ingresos Totales', sum(item['total'] for item in breakdown)),
+        ('Ingresos Hoy', sum(item['today'] or 0 for item in breakdown)),
+        ('Ingresos Este Mes', sum(item['month'] or 0 for item in breakdown)),
+    ]
+    by_service = [(item['service__name'], item['count'], item['total']) for item in breakdown]
+
+    applied = [_generated()]
+    if start or end:
+        applied.append(f"{start:%d/%m/%Y} a {end:%d/%m/%Y}" if start and end else (
+            f"desde {start:%d/%m/%Y}" if start else f"hasta {end:%d/%m/%Y}"
+        ))
+    if status:
+        applied.append(f'estado {dict(Booking.STATUS_CHOICES)[status]}')
+    if service and by_service:
+        applied.append(by_service[0][0])
+
+    return Dataset('Reporte de Ingresos', 'Ingresos', ' · '.join(applied), params, [
+        Section(None, [Column('Métrica', 'text', 25), Column('Monto', 'money', 15)], summary),
+        Section('Ingresos por Servicio', [
+            Column('Servicio', 'text', 25), Column('Reservas', 'int', 15), Column('Ingresos', 'money', 15),
+        ], by_service),
+    ], len(summary) + len(by_service))
+
+
+# Reportes por tipo: función, nombre base del archivo, parámetros aceptados,
+# temas de datos de los que dependen y si el dataset se guarda en la caché
+Report = namedtuple('Report', ['build', 'filename', 'params', 'topics', 'cached'])
+
+REPORTS = {
+    'bookings': Report(bookings_report, 'reporte-reservas', BOOKING_FILTERS, ('bookings', 'users', 'services'), False),
+    'history': Report(history_report, 'reservas', BOOKING_FILTERS, ('bookings', 'users', 'services'), False),
+    'revenue': Report(revenue_report, 'reporte-ingresos', REVENUE_FILTERS, ('bookings', 'services'), True),
+}
+
+
+def report_params(kind, params):
+    """Parámetros de `params` que acepta el reporte, sin los vacíos"""
+    return {name: str(params[name]) for name in REPORTS[kind].params if params.get(name)}
+
+
+def get_report(kind, params, count=False):
+    """Dataset del reporte `kind` para `params`; con `count` se cuentan las filas de los listados"""
+    report = REPORTS[kind]
+    params = report_params(kind, params)
+    if not report.cached:
+        return report.build(params, count=count)
+
+    key = REPORT_KEY.format(
+        kind=kind, version=stats_version(*report.topics), day=timezone.localdate().isoformat(),
+        params=hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest(),
+    )
+    dataset = cache.get(key)
+    if dataset is None:
+        dataset = report.build(params, count=count)
+        cache.set(key, dataset, settings.DASHBOARD_STATS_TIMEOUT)
+    return dataset
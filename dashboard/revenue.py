@@ -0,0 +1,197 @@
+"""
+Acumulado diario de ingresos (`DailyRevenue`)
+
+Cada reserva pagada suma su `total_price` a la fila (día, servicio). Al
+guardar o borrar una reserva se compara el aporte anterior (campos
+rastreados de `Booking`) con el nuevo y se aplica solo la diferencia con
+`UPDATE ... SET revenue = revenue + x`. `backfill_revenue` reconstruye la
+tabla por tramos de fechas con consultas agrupadas.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DateField, F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from bookings.models import Booking
+from services.models import Service
+from .models import DailyRevenue
+from .timeseries import local_day_bounds, time_series
+
+
+def revenue_day(payment_date, booking_date):
+    """Día al que se imputa un pago"""
+    return timezone.localdate(payment_date) if payment_date else booking_date
+
+
+def _contribution(service_id, paid, payment_date, booking_date, total_price):
+    if not paid:
+        return None
+    return (revenue_day(payment_date, booking_date), service_id), Decimal(total_price)
+
+
+def booking_revenue_delta(instance, created):
+    """Diferencia {(día, service_id): (monto, reservas)} que produce guardar `instance`"""
+    delta = defaultdict(lambda: [Decimal('0'), 0])
+    if not created:
+        original = instance.original
+        before = _contribution(*(
+            original.get(field, getattr(instance, field))
+            for field in ('service_id', 'paid', 'payment_date', 'booking_date', 'total_price')
+        ))
+        if before:
+            key, amount = before
+            delta[key][0] -= amount
+            delta[key][1] -= 1
+    after = _contribution(
+        instance.service_id, instance.paid, instance.payment_date, instance.booking_date, instance.total_price
+    )
+    if after:
+        key, amount = after
+        delta[key][0] += amount
+        delta[key][1] += 1
+    return {key: tuple(value) for key, value in delta.items() if value[0] or value[1]}
+
+
+def apply_revenue_deltas(deltas):
+    """Sumar `{(día, service_id): (monto, reservas)}` al acumulado diario"""
+    if not deltas:
+        return
+
+    categories = dict(
+        Service.objects.filter(id__in={service_id for _, service_id in deltas})
+        .values_list('id', 'category_id')
+    )
+    DailyRevenue.objects.bulk_create(
+        [
+            DailyRevenue(date=day, service_id=service_id, category_id=categories[service_id])
+            for day, service_id in deltas
+        ],
+        ignore_conflicts=True,
+    )
+    for (day, service_id), (amount, count) in deltas.items():
+        DailyRevenue.objects.filter(date=day, service_id=service_id).update(
+            revenue=F('revenue') + amount,
+            paid_count=F('paid_count') + count,
+        )
+
+
+def _paid_by_day(start=None, end=None):
+    paid = Booking.objects.filter(paid=True)
+    if start is not None:
+        # Filtrar por las columnas y no por el día calculado usa el índice (paid, payment_date)
+        lower, upper = local_day_bounds(start, end)
+        paid = paid.filter(
+            Q(payment_date__gte=lower, payment_date__lt=upper)
+            | Q(payment_date__isnull=True, booking_date__gte=start, booking_date__lte=end)
+        )
+    return paid.annotate(
+        day=Coalesce(TruncDate('payment_date'), 'booking_date', output_field=DateField())
+    )
+
+
+def backfill_revenue(chunk_days=31, log=None):
+    """Reconstruir `DailyRevenue` por tramos de `chunk_days` días
+
+    Cada tramo borra sus filas e inserta las agregadas en una transacción
+    propia, así que el trabajo se puede interrumpir y repetir. Devuelve la
+    cantidad de filas generadas.
+    """
+    bounds = _paid_by_day().aggregate(first=Min('day'), last=Max('day'))
+    if bounds['first'] is None:
+        DailyRevenue.objects.all().delete()
+        return 0
+
+    created = 0
+    start = bounds['first']
+    while start <= bounds['last']:
+        end = start + timedelta(days=chunk_days - 1)
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    table = connection.ops.quote_name(DailyRevenue._meta.db_table)
+                    cursor.execute(f'LOCK TABLE {table} IN EXCLUSIVE MODE')
+            DailyRevenue.objects.filter(date__gte=start, date__lte=end).delete()
+            rows = (
+                _paid_by_day(start, end)
+                .order_by()
+                .values_list('day', 'service_id', 'service__category_id')
+                .annotate(total=Sum('total_price'), count=Count('id'))
+            )
+            batch = DailyRevenue.objects.bulk_create([
+                DailyRevenue(date=day, service_id=service_id, category_id=category_id, revenue=total, paid_count=count)
+                for day, service_id, category_id, total, count in rows
+            ])
+        created += len(batch)
+        if log:
+            log(f'{start} a {end}: {len(batch)} filas')
+        start = end + timedelta(days=1)
+    # Filas fuera del rango actual (pagos revertidos) ya no corresponden
+    DailyRevenue.objects.exclude(date__gte=bounds['first'], date__lte=bounds['last']).delete()
+    return created
+
+
+def revenue_summary(today):
+    """Ingresos históricos, de hoy, del mes y de los últimos 30 días en una consulta"""
+    summary = DailyRevenue.objects.aggregate(
+        total=Sum('revenue'),
+        today=Sum('revenue', filter=Q(date=today)),
+        month=Sum('revenue', filter=Q(date__year=today.year, date__month=today.month)),
+        thirty_days=Sum('revenue', filter=Q(date__gte=today - timedelta(days=30))),
+    )
+    return {key: value or 0 for key, value in summary.items()}
+
+
+def revenue_breakdown(field):
+    """Ingresos y reservas pagadas agrupados por `field` (ej. 'service__name'), de mayor a menor"""
+    return (
+        DailyRevenue.objects.values(field)
+        .annotate(total=Sum('revenue'), count=Sum('paid_count'))
+        .filter(count__gt=0)
+        .order_by('-total')
+    )
+
+
+def revenue_by_service(today, start=None, end=None, service=None, status=None):
+    """Ingresos, reservas pagadas, ingresos de hoy y del mes por servicio, con filtros, en una consulta
+
+    Sin estado se lee el acumulado diario. El estado no está en el
+    acumulado: con él se agrupan las reservas pagadas en ese estado, por el
+    mismo día de imputación.
+    """
+    if status is None:
+        rows, day, revenue, count = DailyRevenue.objects.all(), 'date', 'revenue', Sum('paid_count')
+    else:
+        # Con ambos límites el filtro usa el índice (paid, payment_date)
+        rows = _paid_by_day(start, end) if start and end else _paid_by_day()
+        rows, day, revenue, count = rows.filter(status=status), 'day', 'total_price', Count('id')
+    if start:
+        rows = rows.filter(**{f'{day}__gte': start})
+    if end:
+        rows = rows.filter(**{f'{day}__lte': end})
+    if service:
+        rows = rows.filter(service_id=service)
+
+    return (
+        rows.order_by().values('service__name')
+        .annotate(
+            total=Sum(revenue),
+            count=count,
+            today=Sum(revenue, filter=Q(**{day: today})),
+            month=Sum(revenue, filter=Q(**{f'{day}__year': today.year, f'{day}__month': today.month})),
+        )
+        .filter(count__gt=0)
+        .order_by('-total')
+    )
+
+
+def revenue_series(start, end, granularity='day'):
+    """Ingresos por período entre `start` y `end`, con el promedio por reserva"""
+    periods = time_series(
+        DailyRevenue.objects.filter(paid_count__gt=0), 'date', granularity, start, end,
+        total=Sum('revenue'), count=Sum('paid_count'),
+    )
+    return [dict(period, average=period['total'] / period['count']) for period in periods]
@@ -0,0 +1,79 @@
+"""
+Estadísticas por servicio y por categoría
+
+Cada métrica de servicio es una subconsulta correlacionada sobre las
+reservas de ese servicio (índice `service, booking_date, ...`), así que no
+se multiplican filas al combinar conteos, sumas y promedios de reseñas.
+Las categorías se arman en Python a partir de las filas de servicios, sin
+volver a recorrer las reservas. El resultado se cachea con las versiones
+de reservas, reseñas y servicios.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, DecimalField, FloatField, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from bookings.models import Booking, Review
+from services.models import Category, Service
+from .stats import stats_version
+
+# Ventanas disponibles en días; None es todo el historial
+STATS_WINDOWS = {30: 'Últimos 30 días', 90: 'Últimos 90 días', 365: 'Último año', None: 'Todo'}
+SNAPSHOT_KEY = 'dashboard:service-stats:{version}:{day}:{days}'
+
+
+def _per_service(queryset, service_field, aggregate, output_field):
+    """Subconsulta correlacionada con `aggregate` de las filas del servicio externo"""
+    return Subquery(
+        queryset.order_by().values(service_field).annotate(value=aggregate).values('value')[:1],
+        output_field=output_field,
+    )
+
+
+def compute_service_stats(today, days=None):
+    """Métricas por servicio y por categoría de las reservas de los últimos `days` días"""
+    bookings = Booking.objects.filter(service=OuterRef('pk'))
+    reviews = Review.objects.filter(booking__service=OuterRef('pk'))
+    if days is not None:
+        since = today - timedelta(days=days)
+        bookings = bookings.filter(booking_date__gte=since, booking_date__lte=today)
+        reviews = reviews.filter(booking__booking_date__gte=since, booking__booking_date__lte=today)
+
+    money = DecimalField(max_digits=12, decimal_places=2)
+    services = list(
+        Service.objects.annotate(
+            total_bookings=Coalesce(_per_service(bookings, 'service', Count('id'), IntegerField()), 0),
+            total_revenue=Coalesce(_per_service(bookings, 'service', Sum('total_price'), money), 0, output_field=money),
+            avg_rating=_per_service(reviews, 'booking__service', Avg('rating'), FloatField()),
+        )
+        .order_by('-total_bookings', 'name')
+        .values('id', 'name', 'category_id', 'category__name', 'total_bookings', 'total_revenue', 'avg_rating')
+    )
+
+    categories = {
+        category['id']: dict(category, total_services=0, total_bookings=0)
+        for category in Category.objects.values('id', 'name')
+    }
+    for service in services:
+        category = categories[service['category_id']]
+        category['total_services'] += 1
+        category['total_bookings'] += service['total_bookings']
+
+    return {
+        'services': services,
+        'categories': sorted(categories.values(), key=lambda category: -category['total_bookings']),
+    }
+
+
+def get_service_stats(days=None):
+    """Estadísticas de servicios para la ventana `days`, leídas de la caché si siguen vigentes"""
+    today = timezone.localdate()
+    key = SNAPSHOT_KEY.format(version=stats_version('bookings', 'reviews', 'services'), day=today.isoformat(), days=days or 'all')
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_service_stats(today, days)
+        cache.set(key, stats, settings.DASHBOARD_STATS_TIMEOUT)
+    return stats
@@ -0,0 +1,97 @@
+"""
+Invalidación de estadísticas, acumulado de ingresos y eventos en vivo del dashboard
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import UserProfile
+from bookings.models import Booking, Review
+from bookings.signals import bookings_bulk_changed
+from services.models import Availability, Category, Service
+from .events import booking_event, hub
+from .revenue import apply_revenue_deltas, booking_revenue_delta, revenue_day
+from .stats import invalidate_stats
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_booking_stats(sender, **kwargs):
+    """Invalidar lo que depende de reservas y pagos"""
+    invalidate_stats('bookings')
+
+
+@receiver(bookings_bulk_changed)
+def invalidate_stats_on_bulk_change(sender, **kwargs):
+    """Invalidar lo que depende de reservas tras un cambio en bloque"""
+    invalidate_stats('bookings')
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_review_stats(sender, **kwargs):
+    """Invalidar lo que depende de reseñas"""
+    invalidate_stats('reviews')
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_user_stats(sender, **kwargs):
+    """Invalidar lo que depende de usuarios"""
+    invalidate_stats('users')
+
+
+@receiver([post_save, post_delete], sender=Service)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Availability)
+def invalidate_service_stats(sender, **kwargs):
+    """Invalidar lo que depende de servicios, categorías u horarios"""
+    invalidate_stats('services')
+
+
+@receiver(post_save, sender=Booking)
+def update_revenue_on_save(sender, instance, created, **kwargs):
+    """Aplicar al acumulado diario el cambio de pago o monto de la reserva"""
+    apply_revenue_deltas(booking_revenue_delta(instance, created))
+
+
+@receiver(post_delete, sender=Booking)
+def update_revenue_on_delete(sender, instance, **kwargs):
+    """Descontar del acumulado diario una reserva pagada borrada"""
+    if instance.paid:
+        day = revenue_day(instance.payment_date, instance.booking_date)
+        apply_revenue_deltas({(day, instance.service_id): (-instance.total_price, -1)})
+
+
+def _booking_event_kinds(instance, created):
+    if created:
+        return ['created']
+    original = instance.original
+    kinds = []
+    if instance.status == 'cancelled' and original.get('status') != 'cancelled':
+        kinds.append('cancelled')
+    if instance.paid and not original.get('paid', True):
+        kinds.append('paid')
+    return kinds
+
+
+@receiver(post_save, sender=Booking)
+def publish_booking_event(sender, instance, created, **kwargs):
+    """Publicar a los dashboards conectados la creación, cancelación o pago de una reserva"""
+    if not hub.subscriber_count:
+        return
+    for kind in _booking_event_kinds(instance, created):
+        event = booking_event(kind, instance)
+        transaction.on_commit(lambda event=event: hub.publish(event))
+
+
+@receiver(bookings_bulk_changed)
+def publish_bulk_booking_events(sender, service_ids, created=(), **kwargs):
+    """Publicar a los dashboards conectados un cambio de reservas en bloque"""
+    if not hub.subscriber_count:
+        return
+    events = [booking_event('created', booking) for booking in created] or [
+        {'type': 'bookings.changed', 'services': sorted(service_ids)}
+    ]
+    
+    def publish():
+        for event in events:
+            hub.publish(event)
+    transaction.on_commit(publish)
@@ -0,0 +1,100 @@
+"""
+Motor de Excel en modo solo escritura
+
+Los libros se escriben con `Workbook(write_only=True)`: cada fila se
+serializa al agregarla y no queda en memoria. Los formatos son estilos con
+nombre registrados una vez por libro, y cada columna con formato usa una
+sola celda que se reutiliza en todas las filas, así que escribir una fila
+no crea objetos de estilo. El libro terminado se guarda en un temporal que
+vive en memoria hasta `DASHBOARD_EXPORT_SPOOL_SIZE` bytes y después pasa a
+disco.
+"""
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _named_styles():
+    """Estilos con nombre del libro; se crean por libro porque openpyxl los vincula al registrarlos"""
+    thin = Side(style='thin')
+    return [
+        NamedStyle(name='title', font=Font(bold=True, size=14, color='007bff')),
+        NamedStyle(name='subtitle', font=Font(italic=True, size=10)),
+        NamedStyle(name='section', font=Font(bold=True, size=12)),
+        NamedStyle(
+            name='header',
+            font=Font(bold=True, color='FFFFFF', size=11),
+            fill=PatternFill(start_color='007bff', end_color='007bff', fill_type='solid'),
+            border=Border(left=thin, right=thin, top=thin, bottom=thin),
+            alignment=Alignment(horizontal='center'),
+        ),
+        NamedStyle(name='money', number_format='$#,##0.00'),
+        NamedStyle(name='date', number_format='dd/mm/yyyy'),
+        NamedStyle(name='datetime', number_format='dd/mm/yyyy hh:mm'),
+        NamedStyle(name='time', number_format='hh:mm'),
+    ]
+
+
+class SheetWriter:
+    """Hoja de solo escritura: las filas se agregan en orden y no se pueden releer"""
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+
+    def _cell(self, value, style):
+        cell = WriteOnlyCell(self.worksheet, value=value)
+        cell.style = style
+        return cell
+
+    def title(self, text, style='title'):
+        self.worksheet.append([self._cell(text, style)])
+
+    def blank(self):
+        self.worksheet.append([])
+
+    def header(self, labels):
+        self.worksheet.append([self._cell(label, 'header') for label in labels])
+
+    def rows(self, rows, styles=()):
+        """Agregar `rows`; `styles` indica el estilo con nombre de cada columna (o None)"""
+        # Una celda por columna con formato, reutilizada: openpyxl la escribe al agregar la fila
+        cells = [self._cell(None, style) if style else None for style in styles]
+        count = 0
+        for row in rows:
+            values = list(row)
+            for index, cell in enumerate(cells):
+                if cell is not None and values[index] is not None:
+                    cell.value = values[index]
+                    values[index] = cell
+            self.worksheet.append(values)
+            count += 1
+        return count
+
+
+class WorkbookWriter:
+    """Libro de Excel en modo solo escritura con los estilos del dashboard"""
+
+    def __init__(self):
+        self.workbook = Workbook(write_only=True)
+        for style in _named_styles():
+            self.workbook.add_named_style(style)
+
+    def sheet(self, title, widths):
+        """Nueva hoja con los anchos de columna dados (deben fijarse antes de escribir filas)"""
+        worksheet = self.workbook.create_sheet(title)
+        for index, width in enumerate(widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+        return SheetWriter(worksheet)
+
+    def save(self):
+        """Guardar el libro en un temporal y devolverlo posicionado al inicio"""
+        file = SpooledTemporaryFile(max_size=settings.DASHBOARD_EXPORT_SPOOL_SIZE)
+        self.workbook.save(file)
+        file.seek(0)
+        return file
@@ -0,0 +1,25 @@
+"""
+Versiones de caché de las estadísticas del dashboard
+
+Cada tema de datos (reservas, reseñas, usuarios, servicios) tiene su propia
+versión en la base (`services.versions`), compartida por todos los procesos.
+Las señales incrementan la versión del tema que cambió y cada bloque
+cacheado arma su clave con las versiones de los temas de los que depende,
+así que un cambio solo descarta lo que lo usa.
+"""
+from services.versions import bump_versions, get_versions
+
+TOPICS = ('bookings', 'reviews', 'users', 'services')
+VERSION_KEY = 'stats:{topic}'
+
+
+def invalidate_stats(*topics):
+    """Descartar lo cacheado que depende de `topics` (todos los temas si no se indican)"""
+    bump_versions(*(VERSION_KEY.format(topic=topic) for topic in topics or TOPICS))
+
+
+def stats_version(*topics):
+    """Versión combinada de `topics` (todos si no se indican) para usar en claves de caché"""
+    keys = [VERSION_KEY.format(topic=topic) for topic in topics or TOPICS]
+    versions = get_versions(keys)
+    return '.'.join(str(versions[key]) for key in keys)
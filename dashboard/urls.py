@@ -6,14 +6,24 @@ app_name = 'dashboard'
 
 urlpatterns = [
     path('', views.dashboard_index, name='index'),
+    path('widgets/<slug:name>/', views.dashboard_widget, name='widget'),
+    path('events/', views.booking_events, name='events'),
     path('bookings/', views.bookings_management, name='bookings'),
     path('revenue/', views.revenue_report, name='revenue'),
     path('services/', views.services_stats, name='services'),
     path('users/', views.users_stats, name='users'),
+    path('cohorts/', views.cohort_report, name='cohorts'),
+    path('occupancy/', views.occupancy_heatmap, name='occupancy'),
     
     # Exports
     path('export/revenue/pdf/', exports.export_revenue_pdf, name='export_revenue_pdf'),
     path('export/revenue/excel/', exports.export_revenue_excel, name='export_revenue_excel'),
     path('export/bookings/pdf/', exports.export_bookings_pdf, name='export_bookings_pdf'),
     path('export/bookings/excel/', exports.export_bookings_excel, name='export_bookings_excel'),
+    path('export/bookings/csv/', exports.export_bookings_csv, name='export_bookings_csv'),
+    path('export/occupancy/csv/', exports.export_occupancy_csv, name='export_occupancy_csv'),
+    path('export/<slug:kind>.<slug:fmt>', exports.export_report, name='export_report'),
+    path('exports/', exports.export_job_create, name='export_job_create'),
+    path('exports/<uuid:job_id>/', exports.export_job_status, name='export_job'),
+    path('exports/<uuid:job_id>/download/', exports.export_job_download, name='export_job_download'),
 ]
@@ -0,0 +1,57 @@
+"""
+Totales de usuarios del dashboard
+
+Los totales salen de los contadores de vida del perfil en una sola
+agregación y se cachean con las versiones de usuarios y reservas (los
+contadores cambian con cada reserva), así que la página no recorre todos
+los perfiles en cada visita. El ranking de clientes no se cachea: lee los
+primeros del índice de `lifetime_spent`.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from .stats import stats_version
+from .timeseries import local_day_bounds
+
+COUNTS_KEY = 'dashboard:user-counts:{version}:{day}'
+
+
+def compute_user_counts(today):
+    """Usuarios, usuarios con reservas y altas desde hace 30 días en una consulta"""
+    since, _ = local_day_bounds(today - timedelta(days=30), today)
+    return UserProfile.objects.aggregate(
+        total_users=Count('id'),
+        users_with_bookings=Count('id', filter=Q(lifetime_bookings__gt=0)),
+        new_users=Count('id', filter=Q(created_at__gte=since)),
+    )
+
+
+def get_user_counts():
+    """Totales de usuarios de hoy, leídos de la caché si siguen vigentes"""
+    today = timezone.localdate()
+    key = COUNTS_KEY.format(version=stats_version('users', 'bookings'), day=today.isoformat())
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_user_counts(today)
+        cache.set(key, counts, settings.DASHBOARD_STATS_TIMEOUT)
+    return counts
+
+
+def top_users(limit=10):
+    """Clientes que más pagaron, recorriendo el índice de `lifetime_spent`"""
+    return [
+        {
+            'user': profile.user,
+            'total_bookings': profile.lifetime_bookings,
+            'total_spent': profile.lifetime_spent,
+            'average_per_booking': profile.lifetime_spent / profile.lifetime_bookings,
+            'last_booking_date': profile.last_booking_date,
+        }
+        for profile in UserProfile.objects.filter(lifetime_bookings__gt=0)
+        .select_related('user').order_by('-lifetime_spent')[:limit]
+    ]
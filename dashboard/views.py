@@ -1,12 +1,25 @@
-from django.shortcuts import render, redirect
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotAllowed
+from django.shortcuts import render
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.http import require_http_methods
-from django.db.models import Sum, Count, Q, Avg
+from django.conf import settings
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_date
 from datetime import timedelta
-from bookings.models import Booking, Review
-from services.models import Service, Category
-from accounts.models import UserProfile
+from bookings.models import Booking
+from services.models import Service
+from .cohorts import get_cohort_report
+from .events import EventStreamResponse
+from .filters import filter_bookings
+from .heatmap import get_heatmap, heatmap_range
+from .pagination import decode_cursor, keyset_page
+from .revenue import revenue_breakdown, revenue_series, revenue_summary
+from .service_stats import STATS_WINDOWS, get_service_stats
+from .timeseries import GRANULARITIES, bucket_start
+from .user_stats import get_user_counts, top_users
+from .widgets import WIDGETS, render_widget
 
 
 def is_staff(user):
@@ -19,58 +32,29 @@ def is_staff(user):
 @user_passes_test(is_staff)
 def dashboard_index(request):
     """Dashboard principal del administrador"""
-    now = timezone.now()
-    today = now.date()
-    
-    # Estadísticas generales
-    total_bookings = Booking.objects.count()
-    total_users = UserProfile.objects.count()
-    total_services = Service.objects.filter(is_active=True).count()
-    
-    # Ingresos
-    total_revenue = Booking.objects.filter(paid=True).aggregate(Sum('total_price'))['total_price__sum'] or 0
-    today_revenue = Booking.objects.filter(paid=True, payment_date__date=today).aggregate(Sum('total_price'))['total_price__sum'] or 0
-    
-    # Reservas por estado
-    pending_bookings = Booking.objects.filter(status='pending').count()
-    confirmed_bookings = Booking.objects.filter(status='confirmed').count()
-    completed_bookings = Booking.objects.filter(status='completed').count()
-    
-    # Próximas reservas (próximos 7 días)
-    upcoming_bookings = Booking.objects.filter(
-        booking_date__gte=today,
-        booking_date__lte=today + timedelta(days=7),
-        status__in=['pending', 'confirmed']
-    ).select_related('user', 'service').order_by('booking_date', 'booking_time')[:10]
-    
-    # Calificación promedio
-    avg_rating = Review.objects.aggregate(avg=Avg('rating'))['avg']
-    
-    # Reservas hoy
-    today_bookings = Booking.objects.filter(booking_date=today).count()
-    
-    # Calcular porcentajes para las barras de progreso
-    pending_percentage = (pending_bookings * 100 / total_bookings) if total_bookings > 0 else 0
-    confirmed_percentage = (confirmed_bookings * 100 / total_bookings) if total_bookings > 0 else 0
-    completed_percentage = (completed_bookings * 100 / total_bookings) if total_bookings > 0 else 0
-    
-    context = {
-        'total_bookings': total_bookings,
-        'total_users': total_users,
-        'total_services': total_services,
-        'total_revenue': total_revenue,
-        'today_revenue': today_revenue,
-        'pending_bookings': pending_bookings,
-        'confirmed_bookings': confirmed_bookings,
-        'completed_bookings': completed_bookings,
-        'upcoming_bookings': upcoming_bookings,
-        'avg_rating': avg_rating,
-        'today_bookings': today_bookings,
-        'pending_percentage': pending_percentage,
-        'confirmed_percentage': confirmed_percentage,
-        'completed_percentage': completed_percentage,
-    }
-    return render(request, 'dashboard/index.html', context)
+    # Solo el esqueleto: cada widget se carga aparte con HTMX
+    return render(request, 'dashboard/index.html')
+
+
+@require_http_methods(["GET"])
+@login_required
+@user_passes_test(is_staff)
+def dashboard_widget(request, name):
+    """Fragmento HTML de un widget del dashboard"""
+    if name not in WIDGETS:
+        raise Http404('Widget no encontrado')
+    return HttpResponse(render_widget(name))
+
+
+async def booking_events(request):
+    """Flujo SSE de eventos de reservas para el dashboard (requiere ASGI)"""
+    # Los decoradores de autenticación de Django 4.2 no soportan vistas async
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    allowed = await sync_to_async(lambda: request.user.is_authenticated and is_staff(request.user))()
+    if not allowed:
+        return HttpResponseForbidden()
+    return EventStreamResponse()
 
 
 @require_http_methods(["GET"])
@@ -78,32 +62,57 @@ def dashboard_index(request):
 @user_passes_test(is_staff)
 def bookings_management(request):
     """Gestión de reservas"""
-    bookings = Booking.objects.select_related('user', 'service').order_by('-booking_date')
-    
-    # Filtros
+    bookings = filter_bookings(Booking.objects.select_related('user', 'service'), request.GET)
     status_filter = request.GET.get('status')
     service_filter = request.GET.get('service')
     date_filter = request.GET.get('date')
     
-    if status_filter:
-        bookings = bookings.filter(status=status_filter)
-    
-    if service_filter:
-        bookings = bookings.filter(service_id=service_filter)
-    
-    if date_filter:
-        bookings = bookings.filter(booking_date=date_filter)
-    
-    services = Service.objects.filter(is_active=True)
+    # Paginación por clave: cada página sigue a la última fila de la anterior
+    page, next_cursor = keyset_page(
+        bookings, decode_cursor(request.GET.get('after')), settings.DASHBOARD_BOOKINGS_PAGE_SIZE
+    )
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['after'] = next_cursor
+        next_query = params.urlencode()
     
     context = {
-        'bookings': bookings,
-        'services': services,
+        'bookings': page,
+        'next_query': next_query,
+        'is_first_page': 'after' not in request.GET,
         'status_filter': status_filter,
         'service_filter': service_filter,
         'date_filter': date_filter,
     }
-    return render(request, 'dashboard/bookings_management.html', context)
+    
+    # HTMX: siguiente página o cambio de filtro devuelven solo las filas
+    if request.headers.get('HX-Request') and not request.headers.get('HX-History-Restore-Request'):
+        response = render(request, 'dashboard/partials/booking_rows.html', context)
+    else:
+        context['services'] = Service.objects.filter(is_active=True)
+        response = render(request, 'dashboard/bookings_management.html', context)
+    patch_vary_headers(response, ['HX-Request'])
+    return response
+
+
+# Rango por defecto de la serie de ingresos según la granularidad
+SERIES_DEFAULT_DAYS = {'day': 30, 'week': 7 * 12, 'month': 365, 'quarter': 2 * 365}
+
+
+def _parse_series_params(params, today):
+    """Granularidad y rango (inicio, fin) de la serie; valores inválidos usan los por defecto"""
+    granularity = params.get('granularity')
+    if granularity not in GRANULARITIES:
+        granularity = 'day'
+    try:
+        end = parse_date(params.get('end') or '') or today
+        start = parse_date(params.get('start') or '')
+    except ValueError:
+        end, start = today, None
+    if start is None or start > end:
+        start = bucket_start(end - timedelta(days=SERIES_DEFAULT_DAYS[granularity]), granularity)
+    return granularity, start, end
 
 
 @require_http_methods(["GET"])
@@ -111,55 +120,25 @@ def bookings_management(request):
 @user_passes_test(is_staff)
 def revenue_report(request):
     """Reporte de ingresos"""
-    # Últimos 30 días
-    thirty_days_ago = timezone.now().date() - timedelta(days=30)
-    
-    daily_revenue = Booking.objects.filter(
-        paid=True,
-        payment_date__date__gte=thirty_days_ago
-    ).extra(
-        select={'date': 'DATE(payment_date)'}
-    ).values('date').annotate(
-        total=Sum('total_price'),
-        count=Count('id')
-    ).order_by('date')
-    
-    # Calcular promedio para daily_revenue
-    daily_revenue_with_avg = []
-    for item in daily_revenue:
-        item_dict = dict(item)
-        item_dict['average'] = item['total'] / item['count'] if item['count'] > 0 else 0
-        daily_revenue_with_avg.append(item_dict)
-    
-    # Ingresos por servicio
-    revenue_by_service = Booking.objects.filter(
-        paid=True
-    ).values('service__name').annotate(
-        total=Sum('total_price'),
-        count=Count('id')
-    ).order_by('-total')[:10]
-    
-    # Ingresos por categoría
-    revenue_by_category = Booking.objects.filter(
-        paid=True
-    ).values('service__category__name').annotate(
-        total=Sum('total_price'),
-        count=Count('id')
-    ).order_by('-total')
-    
-    # Totales
-    total_all_time = Booking.objects.filter(paid=True).aggregate(Sum('total_price'))['total_price__sum'] or 0
-    total_thirty_days = Booking.objects.filter(
-        paid=True,
-        payment_date__date__gte=thirty_days_ago
-    ).aggregate(Sum('total_price'))['total_price__sum'] or 0
+    # Lee el acumulado diario: el costo depende de los días, no de las reservas
+    today = timezone.localdate()
+    summary = revenue_summary(today)
+    granularity, start, end = _parse_series_params(request.GET, today)
     
     context = {
-        'daily_revenue': daily_revenue_with_avg,
-        'revenue_by_service': list(revenue_by_service),
-        'revenue_by_category': list(revenue_by_category),
-        'total_all_time': total_all_time,
-        'total_thirty_days': total_thirty_days,
+        'daily_revenue': revenue_series(start, end, granularity),
+        'granularity': granularity,
+        'granularity_label': GRANULARITIES[granularity],
+        'granularities': GRANULARITIES,
+        'start': start,
+        'end': end,
+        'revenue_by_service': list(revenue_breakdown('service__name')[:10]),
+        'revenue_by_category': list(revenue_breakdown('category__name')),
+        'total_all_time': summary['total'],
+        'total_thirty_days': summary['thirty_days'],
+        # Opciones de los filtros de exportación
+        'statuses': Booking.STATUS_CHOICES,
+        'services': Service.objects.order_by('name').values_list('id', 'name'),
     }
     return render(request, 'dashboard/revenue_report.html', context)
 
@@ -169,22 +148,13 @@ def revenue_report(request):
 @user_passes_test(is_staff)
 def services_stats(request):
     """Estadísticas de servicios"""
-    services = Service.objects.annotate(
-        total_bookings=Count('bookings'),
-        avg_rating=Avg('bookings__review__rating'),
-        total_revenue=Sum('bookings__total_price')
-    ).order_by('-total_bookings')
-    
-    # Servicios por categoría
-    categories = Category.objects.annotate(
-        total_services=Count('services'),
-        total_bookings=Count('services__bookings')
-    ).order_by('-total_bookings')
+    # Subconsultas por servicio, cacheadas por ventana hasta el próximo cambio
+    days = request.GET.get('days')
+    days = int(days) if days and days.isdigit() and int(days) in STATS_WINDOWS else None
     
-    context = {
-        'services': services,
-        'categories': categories,
-    }
+    context = dict(get_service_stats(days))
+    context['days'] = days
+    context['windows'] = STATS_WINDOWS
     return render(request, 'dashboard/services_stats.html', context)
 
 
@@ -193,40 +163,38 @@ def services_stats(request):
 @user_passes_test(is_staff)
 def users_stats(request):
     """Estadísticas de usuarios"""
-    total_users = UserProfile.objects.count()
-    users_with_bookings = UserProfile.objects.filter(user__bookings__isnull=False).distinct().count()
-    
-    # Top usuarios
-    top_users_qs = UserProfile.objects.annotate(
-        total_bookings=Count('user__bookings'),
-        total_spent=Sum('user__bookings__total_price')
-    ).filter(total_bookings__gt=0).order_by('-total_spent')[:10]
-    
-    # Calcular promedio por reserva para cada usuario
-    top_users = []
-    for user in top_users_qs:
-        user_dict = {
-            'user': user.user,
-            'total_bookings': user.total_bookings,
-            'total_spent': user.total_spent or 0,
-            'average_per_booking': (user.total_spent / user.total_bookings) if user.total_bookings > 0 and user.total_spent else 0
-        }
-        top_users.append(user_dict)
-    
-    # Usuarios nuevos últimos 30 días
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    new_users = UserProfile.objects.filter(
-        created_at__gte=thirty_days_ago
-    ).count()
+    # Totales cacheados por versión; el top recorre el índice de lifetime_spent
+    counts = get_user_counts()
     
     # Calcular porcentaje de usuarios con reservas
+    total_users = counts['total_users']
+    users_with_bookings = counts['users_with_bookings']
     users_with_bookings_percentage = (users_with_bookings * 100 / total_users) if total_users > 0 else 0
     
     context = {
         'total_users': total_users,
         'users_with_bookings': users_with_bookings,
         'users_with_bookings_percentage': users_with_bookings_percentage,
-        'top_users': top_users,
-        'new_users': new_users,
+        'top_users': top_users(),
+        'new_users': counts['new_users'],
     }
     return render(request, 'dashboard/users_stats.html', context)
+
+
+@require_http_methods(["GET"])
+@login_required
+@user_passes_test(is_staff)
+def cohort_report(request):
+    """Cohortes mensuales y retención de clientes"""
+    # Último informe guardado por `refresh_cohorts`; nunca se calcula en la petición
+    return render(request, 'dashboard/cohorts_report.html', get_cohort_report())
+
+
+@require_http_methods(["GET"])
+@login_required
+@user_passes_test(is_staff)
+def occupancy_heatmap(request):
+    """Mapa de calor de ocupación por servicio, día y franja horaria"""
+    # Calculado con NumPy y cacheado por rango de fechas
+    start, end = heatmap_range(request.GET, timezone.localdate())
+    return render(request, 'dashboard/occupancy_heatmap.html', get_heatmap(start, end))
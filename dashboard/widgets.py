@@ -0,0 +1,137 @@
+"""
+Widgets del dashboard como fragmentos HTML independientes
+
+La página principal se envía sin datos y cada widget se pide por separado
+con HTMX. Cada uno tiene su TTL y su clave de caché, formada por las
+versiones de los temas de los que depende (ver `stats`), así que un widget
+lento o invalidado no retrasa ni descarta a los demás. Se cachea el HTML
+ya renderizado. Los widgets de reservas e ingresos leen un mismo agregado
+(`booking_totals`), calculado una vez por versión de reservas y día.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, CharField, Count, Q, Sum, Value
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from bookings.models import Booking, Review
+from services.models import Service
+from .models import DailyRevenue
+from .stats import stats_version
+
+Widget = namedtuple('Widget', ['compute', 'topics', 'timeout'])
+FRAGMENT_KEY = 'dashboard:widget:{name}:{version}:{day}'
+TOTALS_KEY = 'dashboard:booking-totals:{version}:{day}'
+
+
+def _percentage(part, total):
+    return (part * 100 / total) if total > 0 else 0
+
+
+def compute_booking_totals(today):
+    """Conteos de reservas por estado y del día, e ingresos totales y del día, en dos consultas"""
+    totals = Booking.objects.aggregate(
+        total_bookings=Count('id'),
+        today_bookings=Count('id', filter=Q(booking_date=today)),
+        pending_bookings=Count('id', filter=Q(status='pending')),
+        confirmed_bookings=Count('id', filter=Q(status='confirmed')),
+        completed_bookings=Count('id', filter=Q(status='completed')),
+    )
+    revenue = DailyRevenue.objects.aggregate(
+        total_revenue=Sum('revenue'),
+        today_revenue=Sum('revenue', filter=Q(date=today)),
+    )
+    totals.update({key: value or 0 for key, value in revenue.items()})
+    return totals
+
+
+def booking_totals(today):
+    """Agregado compartido por los widgets de reservas, leído de la caché si sigue vigente"""
+    key = TOTALS_KEY.format(version=stats_version('bookings'), day=today.isoformat())
+    totals = cache.get(key)
+    if totals is None:
+        totals = compute_booking_totals(today)
+        cache.set(key, totals, settings.DASHBOARD_STATS_TIMEOUT)
+    return totals
+
+
+def total_bookings(today):
+    return {'total_bookings': booking_totals(today)['total_bookings']}
+
+
+def total_revenue(today):
+    return {'total_revenue': booking_totals(today)['total_revenue']}
+
+
+def community(today):
+    def counted(queryset, metric):
+        return (
+            queryset.order_by()
+            .annotate(metric=Value(metric, output_field=CharField()))
+            .values_list('metric')
+            .annotate(total=Count('id'))
+        )
+
+    totals = dict(
+        counted(UserProfile.objects.all(), 'users')
+        .union(counted(Service.objects.filter(is_active=True), 'services'), all=True)
+    )
+    return {'total_users': totals.get('users', 0), 'total_services': totals.get('services', 0)}
+
+
+def today_activity(today):
+    totals = booking_totals(today)
+    return {key: totals[key] for key in ('today_bookings', 'pending_bookings', 'today_revenue')}
+
+
+def rating(today):
+    return {'avg_rating': Review.objects.aggregate(avg=Avg('rating'))['avg']}
+
+
+def booking_status(today):
+    totals = booking_totals(today)
+    stats = {}
+    for status in ('pending', 'confirmed', 'completed'):
+        count = totals[f'{status}_bookings']
+        stats[f'{status}_bookings'] = count
+        stats[f'{status}_percentage'] = _percentage(count, totals['total_bookings'])
+    return stats
+
+
+def upcoming_bookings(today):
+    return {'upcoming_bookings': list(
+        Booking.objects.filter(
+            booking_date__gte=today,
+            booking_date__lte=today + timedelta(days=7),
+            status__in=Booking.ACTIVE_STATUSES,
+        ).select_related('user', 'service').order_by('booking_date', 'booking_time')[:10]
+    )}
+
+
+# Nombre del widget -> cálculo, temas de los que depende y segundos en caché
+WIDGETS = {
+    'total-bookings': Widget(total_bookings, ('bookings',), settings.DASHBOARD_STATS_TIMEOUT),
+    'total-revenue': Widget(total_revenue, ('bookings',), settings.DASHBOARD_STATS_TIMEOUT),
+    'community': Widget(community, ('users', 'services'), settings.DASHBOARD_STATS_TIMEOUT),
+    'today': Widget(today_activity, ('bookings',), settings.DASHBOARD_STATS_TIMEOUT),
+    'rating': Widget(rating, ('reviews',), settings.DASHBOARD_STATS_TIMEOUT),
+    'status': Widget(booking_status, ('bookings',), settings.DASHBOARD_STATS_TIMEOUT),
+    # Las reservas de hoy dejan de ser "próximas" con la hora: TTL corto
+    'upcoming': Widget(upcoming_bookings, ('bookings',), 5 * 60),
+}
+
+
+def render_widget(name):
+    """HTML del widget `name`, leído de la caché si sigue vigente"""
+    widget = WIDGETS[name]
+    today = timezone.localdate()
+    key = FRAGMENT_KEY.format(name=name, version=stats_version(*widget.topics), day=today.isoformat())
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(f'dashboard/widgets/{name}.html', widget.compute(today))
+        cache.set(key, html, widget.timeout)
+    return html
@@ -0,0 +1,279 @@
+"""
+Motor de disponibilidad de horarios por servicio
+
+Calcula los horarios reservables a partir de las ventanas de `Availability`
+y la ocupación (reservas activas y retenciones vigentes), cargando ambos con
+una consulta por rango y resolviendo la ocupación en memoria con un barrido
+sobre intervalos.
+"""
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from bookings.models import ServiceDayOccupancy, SlotHold
+
+Slot = namedtuple('Slot', ['date', 'time', 'remaining'])
+
+
+def to_minutes(value):
+    """Convertir un `time` a minutos desde medianoche"""
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    """Convertir minutos desde medianoche a `time`"""
+    return time(minutes // 60, minutes % 60)
+
+
+def occupying_starts(fields, own_hold=None, **lookups):
+    """Inicios que ocupan capacidad, agrupados por `fields` con sus unidades
+
+    Une la proyección `ServiceDayOccupancy` (reservas activas ya agregadas
+    por hora de inicio) y las retenciones vigentes en una sola consulta
+    (UNION ALL); ambas ramas filtran por índices que empiezan por
+    (service, booking_date). Un mismo grupo puede aparecer una vez por rama.
+    `own_hold` son los filtros de la retención que no cuenta (ej. la del
+    usuario sobre el mismo servicio, fecha y hora que está reservando).
+    """
+    booked = ServiceDayOccupancy.objects.filter(booked_units__gt=0, **lookups)
+    holds = SlotHold.objects.filter(expires_at__gt=timezone.now(), **lookups)
+    if own_hold is not None:
+        holds = holds.exclude(**own_hold)
+    return booked.order_by().values_list(*fields, 'booked_units').union(
+        holds.order_by().values_list(*fields).annotate(units=Count('id')),
+        all=True,
+    )
+
+
+class OccupancyProfile:
+    """Función escalonada de ocupación construida con un barrido de eventos
+
+    Recibe intervalos `(inicio, fin, unidades)` en minutos y guarda los puntos
+    de corte ordenados junto al nivel de ocupación vigente desde cada uno.
+    """
+
+    def __init__(self, intervals=()):
+        deltas = defaultdict(int)
+        for start, end, units in intervals:
+            deltas[start] += units
+            deltas[end] -= units
+
+        self.points = []
+        self.levels = []
+        level = 0
+        for point in sorted(deltas):
+            level += deltas[point]
+            self.points.append(point)
+            self.levels.append(level)
+
+    def peak(self, start, end):
+        """Ocupación máxima dentro de [start, end)"""
+        index = bisect_right(self.points, start) - 1
+        peak = self.levels[index] if index >= 0 else 0
+        index += 1
+        while index < len(self.points) and self.points[index] < end:
+            peak = max(peak, self.levels[index])
+            index += 1
+        return peak
+
+
+def booking_intervals(start_times, duration_minutes):
+    """Intervalos `(inicio, fin, 1)` para reservas de igual duración"""
+    for start_time in start_times:
+        start = to_minutes(start_time)
+        yield start, start + duration_minutes, 1
+
+
+class DayOccupancy:
+    """Ocupación de un (servicio, día) que puede crecer en memoria
+
+    Permite validar varias reservas del mismo día sin volver a consultar:
+    cada reserva aceptada se agrega con `add()` y cuenta para las siguientes.
+    """
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.intervals = []
+        self._profile = None
+
+    def add(self, start, units=1):
+        self.intervals.append((start, start + self.duration, units))
+        self._profile = None
+
+    def peak(self, start):
+        if self._profile is None:
+            self._profile = OccupancyProfile(self.intervals)
+        return self._profile.peak(start, start + self.duration)
+
+
+def load_day_occupancy(services, pairs):
+    """Ocupación de varios (service_id, fecha) con una consulta agrupada
+
+    `services` es un dict {id: Service}. Devuelve {(service_id, fecha): DayOccupancy}.
+    """
+    occupancy = {
+        (service_id, day): DayOccupancy(services[service_id].duration_minutes)
+        for service_id, day in pairs
+    }
+    if not occupancy:
+        return occupancy
+
+    existing = occupying_starts(
+        ('service_id', 'booking_date', 'booking_time'),
+        service_id__in={service_id for service_id, _ in occupancy},
+        booking_date__in={day for _, day in occupancy},
+    )
+    for service_id, booking_date, booking_time, units in existing:
+        day = occupancy.get((service_id, booking_date))
+        if day is not None:
+            day.add(to_minutes(booking_time), units)
+    return occupancy
+
+
+def get_peak_occupancy(service, booking_date, booking_time, holder=None):
+    """Ocupación máxima de un servicio durante [inicio, inicio + duración)
+
+    Una sola consulta por rango trae únicamente las reservas y retenciones
+    que pueden solaparse con el intervalo; la ocupación se resuelve con un barrido en memoria.
+    La retención de `holder` sobre este mismo horario no cuenta; las que
+    tenga sobre otros horarios sí.
+    """
+    duration = service.duration_minutes
+    start = to_minutes(booking_time)
+    end = start + duration
+
+    lookups = {
+        'service': service,
+        'booking_date': booking_date,
+    }
+    # Solo se solapan las reservas que empiezan en (inicio - duración, fin)
+    if start - duration >= 0:
+        lookups['booking_time__gt'] = from_minutes(start - duration)
+    if end < 24 * 60:
+        lookups['booking_time__lt'] = from_minutes(end)
+
+    # Agrupar por hora de inicio reduce las filas a transferir
+    own_hold = None if holder is None else {
+        'user': holder, 'service': service, 'booking_date': booking_date, 'booking_time': booking_time,
+    }
+    starts = occupying_starts(('booking_time',), own_hold=own_hold, **lookups)
+    profile = OccupancyProfile(
+        (to_minutes(start_time), to_minutes(start_time) + duration, units)
+        for start_time, units in starts
+    )
+    return profile.peak(start, end)
+
+
+def day_window(service, booking_date):
+    """`Availability` habilitada del servicio para el día de semana de `booking_date`, o None"""
+    return service.availabilities.filter(day_of_week=booking_date.weekday(), is_available=True).first()
+
+
+def window_error(window, booking_date, booking_time):
+    """Motivo por el que `booking_time` queda fuera de `window` (ver `day_window`), o None"""
+    if window is None:
+        from services.models import Availability
+        day_name = dict(Availability.DAYS_OF_WEEK)[booking_date.weekday()]
+        return f'El servicio no está disponible los {day_name}'
+    if not (window.start_time <= booking_time <= window.end_time):
+        return f'Horario fuera de disponibilidad. Disponible de {window.start_time} a {window.end_time}'
+    return None
+
+
+def _service_windows(service):
+    """Ventanas {día de semana: (inicio, fin)} en minutos; usa el prefetch si existe"""
+    return {
+        availability.day_of_week: (
+            to_minutes(availability.start_time),
+            to_minutes(availability.end_time),
+        )
+        for availability in service.availabilities.all()
+        if availability.is_available
+    }
+
+
+def _occupied_starts_by_date(service, start_date, end_date):
+    """Horas de inicio ocupadas por fecha, repetidas según sus unidades"""
+    by_date = defaultdict(list)
+    starts = occupying_starts(
+        ('booking_date', 'booking_time'),
+        service=service,
+        booking_date__gte=start_date,
+        booking_date__lte=end_date,
+    )
+    for booking_date, booking_time, units in starts:
+        by_date[booking_date].extend([booking_time] * units)
+    return by_date
+
+
+def _day_slots(service, day, window, start_times, step, now):
+    """Horarios libres de un día dado su ventana y las horas ocupadas"""
+    duration = service.duration_minutes
+    profile = OccupancyProfile(booking_intervals(start_times, duration))
+    window_start, window_end = window
+    start = window_start
+    while start + duration <= window_end:
+        slot_time = from_minutes(start)
+        if datetime.combine(day, slot_time) > now:
+            remaining = service.max_capacity - profile.peak(start, start + duration)
+            if remaining > 0:
+                yield Slot(day, slot_time, remaining)
+        start += step
+
+
+def get_free_slots(service, start_date, end_date, step_minutes=None):
+    """Horarios reservables de un servicio entre dos fechas (inclusive)
+
+    Devuelve una lista de `Slot(date, time, remaining)` ordenada
+    cronológicamente, donde `remaining` es la capacidad libre durante toda
+    la duración del servicio. Ejecuta dos consultas sin importar el rango.
+    """
+    step = step_minutes or settings.BOOKING_SLOT_MINUTES
+    windows = _service_windows(service)
+    if not windows:
+        return []
+
+    starts_by_date = _occupied_starts_by_date(service, start_date, end_date)
+    now = timezone.localtime().replace(tzinfo=None)
+    slots = []
+    day = start_date
+    while day <= end_date:
+        window = windows.get(day.weekday())
+        if window:
+            slots.extend(_day_slots(service, day, window, starts_by_date.get(day, ()), step, now))
+        day += timedelta(days=1)
+
+    return slots
+
+
+def iter_free_slots(service, start_date, end_date, step_minutes=None, max_chunk_days=32):
+    """Versión perezosa de `get_free_slots`
+
+    Carga la ocupación por tramos de días que se duplican (1, 2, 4, ...
+    hasta `max_chunk_days`), de modo que quien solo necesita los primeros
+    horarios ejecuta pocas consultas pequeñas y quien recorre todo el rango
+    ejecuta unas pocas más. Genera `Slot` en orden cronológico.
+    """
+    step = step_minutes or settings.BOOKING_SLOT_MINUTES
+    windows = _service_windows(service)
+    if not windows:
+        return
+
+    now = timezone.localtime().replace(tzinfo=None)
+    chunk_days = 1
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+        starts_by_date = _occupied_starts_by_date(service, chunk_start, chunk_end)
+        day = chunk_start
+        while day <= chunk_end:
+            window = windows.get(day.weekday())
+            if window:
+                yield from _day_slots(service, day, window, starts_by_date.get(day, ()), step, now)
+            day += timedelta(days=1)
+        chunk_start = chunk_end + timedelta(days=1)
+        chunk_days = min(chunk_days * 2, max_chunk_days)
@@ -0,0 +1,98 @@
+"""
+Calendarios mensuales de horarios libres con caché
+
+Cada servicio tiene una versión de calendario (`services.versions`) que
+se incrementa cuando cambian sus reservas o su disponibilidad. La versión
+forma parte de la clave de caché y del ETag, así que invalidar es solo
+incrementarla y una consulta repetida se responde leyendo únicamente la
+versión, aunque el cambio se haya hecho en otro proceso.
+"""
+import calendar as month_calendar
+import hashlib
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .availability import get_free_slots
+from .versions import bump_versions, get_versions
+
+VERSION_KEY = 'calendar:{service_id}'
+CALENDAR_KEY = 'services:calendar:{service_id}:{version}:{month}:{stamp}'
+
+
+def get_calendar_versions(service_ids):
+    """Versión de calendario de cada servicio, {service_id: versión}, en una consulta"""
+    keys = {VERSION_KEY.format(service_id=service_id): service_id for service_id in service_ids}
+    return {keys[key]: version for key, version in get_versions(keys).items()}
+
+
+def bump_calendar_version(*service_ids):
+    """Invalidar los calendarios cacheados de los servicios indicados"""
+    bump_versions(*(VERSION_KEY.format(service_id=service_id) for service_id in service_ids))
+
+
+def parse_month(value):
+    """Convertir 'YYYY-MM' en (año, mes); None si el formato es inválido"""
+    if not value:
+        today = timezone.localdate()
+        return today.year, today.month
+    try:
+        year, month = (int(part) for part in value.split('-'))
+    except ValueError:
+        return None
+    if not (1 <= month <= 12 and 2000 <= year <= 2100):
+        return None
+    return year, month
+
+
+def _freshness_stamp():
+    # Los horarios pasados salen del calendario como máximo una hora después
+    return timezone.localtime().strftime('%Y%m%d%H')
+
+
+def calendar_etag(service_ids, year, month):
+    """ETag de los calendarios de un mes, calculado solo con las versiones"""
+    versions = get_calendar_versions(service_ids)
+    raw = ';'.join(f'{service_id}:{versions[service_id]}' for service_id in sorted(versions))
+    raw = f'{raw}|{year:04d}-{month:02d}|{_freshness_stamp()}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def build_month_calendar(service, year, month):
+    """Horarios libres de un mes en formato compacto
+
+    {'2026-10-19': [['10:00', 2], ['10:30', 1]], ...}
+    """
+    last_day = month_calendar.monthrange(year, month)[1]
+    start_date = max(date(year, month, 1), timezone.localdate())
+    end_date = date(year, month, last_day)
+
+    days = {}
+    if start_date <= end_date:
+        for slot in get_free_slots(service, start_date, end_date):
+            days.setdefault(slot.date.isoformat(), []).append(
+                [slot.time.strftime('%H:%M'), slot.remaining]
+            )
+    return days
+
+
+def get_month_calendar(service, year, month, version=None):
+    """Calendario mensual de un servicio, leído de la caché si está vigente
+
+    `version` evita volver a leerla cuando ya se tiene (ej. la de varios servicios juntos).
+    """
+    if version is None:
+        version = get_calendar_versions([service.id])[service.id]
+    key = CALENDAR_KEY.format(
+        service_id=service.id,
+        version=version,
+        month=f'{year:04d}-{month:02d}',
+        stamp=_freshness_stamp(),
+    )
+    days = cache.get(key)
+    if days is None:
+        days = build_month_calendar(service, year, month)
+        cache.set(key, days, settings.CALENDAR_CACHE_TIMEOUT)
+    return days
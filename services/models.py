@@ -80,3 +80,21 @@ class Availability(models.Model):
     def __str__(self):
         day_name = dict(self.DAYS_OF_WEEK)[self.day_of_week]
         return f"{self.service.name} - {day_name} ({self.start_time}-{self.end_time})"
+
+
+class CacheVersion(models.Model):
+    """Versión de un conjunto de datos cacheados (ej. el calendario de un servicio)
+
+    Vive en la base y no en la caché para que todos los procesos (workers
+    web, comandos, worker de exportaciones) vean cada invalidación aunque
+    la caché sea local a cada uno. Se mantiene desde `services.versions`.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField()
+    
+    class Meta:
+        verbose_name = "Versión de caché"
+        verbose_name_plural = "Versiones de caché"
+    
+    def __str__(self):
+        return f"{self.key} (v{self.version})"
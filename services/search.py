@@ -0,0 +1,32 @@
+"""
+Búsqueda de los próximos horarios libres entre varios servicios
+
+Cada servicio aporta un flujo perezoso y ordenado de horarios
+(`iter_free_slots`); `heapq.merge` los combina manteniendo solo el primer
+horario pendiente de cada flujo, y la búsqueda se detiene apenas junta los
+N resultados pedidos, sin calcular calendarios completos.
+"""
+import heapq
+from collections import namedtuple
+from itertools import islice
+
+from .availability import iter_free_slots
+
+ServiceSlot = namedtuple('ServiceSlot', ['date', 'time', 'service', 'remaining'])
+
+
+def _service_stream(service, start_date, end_date):
+    for slot in iter_free_slots(service, start_date, end_date):
+        yield ServiceSlot(slot.date, slot.time, service, slot.remaining)
+
+
+def find_earliest_slots(services, start_date, end_date, limit):
+    """Los `limit` horarios libres más próximos entre `services`
+
+    `services` conviene traerlo con `prefetch_related('availabilities')` para
+    no consultar las ventanas servicio por servicio. Los empates de fecha y
+    hora se ordenan por id de servicio.
+    """
+    streams = [_service_stream(service, start_date, end_date) for service in services]
+    merged = heapq.merge(*streams, key=lambda slot: (slot.date, slot.time, slot.service.id))
+    return list(islice(merged, limit))
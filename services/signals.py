@@ -0,0 +1,20 @@
+"""
+Señales de servicios y disponibilidades
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .calendar import bump_calendar_version
+from .models import Service, Availability
+
+
+@receiver([post_save, post_delete], sender=Availability)
+def invalidate_calendar_on_availability(sender, instance, **kwargs):
+    """Invalidar el calendario cuando cambia una ventana de disponibilidad"""
+    bump_calendar_version(instance.service_id)
+
+
+@receiver(post_save, sender=Service)
+def invalidate_calendar_on_service(sender, instance, **kwargs):
+    """Invalidar el calendario cuando cambian duración o capacidad del servicio"""
+    bump_calendar_version(instance.id)
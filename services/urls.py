@@ -6,4 +6,7 @@ app_name = 'services'
 urlpatterns = [
     path('', views.services_list, name='list'),
     path('<int:pk>/', views.service_detail, name='detail'),
+    path('<int:pk>/calendar/', views.service_calendar, name='calendar'),
+    path('category/<int:pk>/calendar/', views.category_calendar, name='category_calendar'),
+    path('earliest/', views.earliest_slots, name='earliest'),
 ]
@@ -0,0 +1,38 @@
+"""
+Versiones de datos cacheados guardadas en la base
+
+Las claves de caché y los ETag incluyen la versión de los datos de los que
+dependen; invalidar es incrementarla. La versión está en la tabla
+`CacheVersion` para que un cambio hecho en cualquier proceso (otro worker
+web, `bulk_book`, `purge_expired_holds`, el worker de exportaciones)
+invalide lo cacheado en todos. Leerla es una consulta por el índice de la
+clave y nunca escribe: una clave sin fila tiene versión 0, así que leer
+(ej. calcular un ETag en un GET anónimo) no agranda la tabla. La fila se
+crea al primer incremento con una versión basada en el reloj, así que
+nunca vuelve a 0 ni repite versiones si la tabla se vacía.
+"""
+import time as clock
+
+from django.db.models import F
+
+from .models import CacheVersion
+
+
+def get_versions(keys):
+    """Versión de cada clave, {clave: versión}; 0 para las que nunca se incrementaron"""
+    keys = list(keys)
+    versions = dict(CacheVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return {key: versions.get(key, 0) for key in keys}
+
+
+def bump_versions(*keys):
+    """Incrementar la versión de `keys` (las que no existen se crean con una versión nueva)"""
+    keys = set(keys)
+    if not keys:
+        return
+    updated = CacheVersion.objects.filter(key__in=keys).update(version=F('version') + 1)
+    if updated < len(keys):
+        # Las existentes ya se incrementaron y el conflicto las deja como están
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(key=key, version=clock.time_ns()) for key in keys], ignore_conflicts=True
+        )
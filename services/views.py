@@ -1,7 +1,19 @@
+from datetime import date, timedelta
+
 from django.shortcuts import render, get_object_or_404
-from django.views.decorators.http import require_http_methods
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods, condition
 from django.db.models import Q, Avg, Count
 from .models import Service, Category, Availability
+from .calendar import calendar_etag, get_calendar_versions, get_month_calendar, parse_month
+from .search import find_earliest_slots
+
+# Límites de la búsqueda de próximos horarios
+EARLIEST_DEFAULT_DAYS = 30
+EARLIEST_MAX_DAYS = 92
+EARLIEST_MAX_RESULTS = 50
 
 
 @require_http_methods(["GET"])
@@ -48,3 +60,145 @@ def service_detail(request, pk):
         'availabilities': availabilities,
     }
     return render(request, 'services/detail.html', context)
+
+
+def _category_service_ids(pk):
+    return list(
+        Service.objects.filter(category_id=pk, is_active=True).values_list('id', flat=True)
+    )
+
+
+def _calendar_etag(service_ids, request):
+    month = parse_month(request.GET.get('month'))
+    if month is None or not service_ids:
+        return None
+    return calendar_etag(service_ids, *month)
+
+
+def service_calendar_etag(request, pk):
+    # Sin ETag para servicios inexistentes o inactivos: la vista responde 404
+    if not Service.objects.filter(id=pk, is_active=True).exists():
+        return None
+    return _calendar_etag([pk], request)
+
+
+def category_calendar_etag(request, pk):
+    return _calendar_etag(_category_service_ids(pk), request)
+
+
+def _invalid_month_response():
+    return JsonResponse({'error': 'Mes inválido. Formato esperado: YYYY-MM'}, status=400)
+
+
+@require_http_methods(["GET"])
+@condition(etag_func=service_calendar_etag)
+def service_calendar(request, pk):
+    """Horarios libres de un servicio durante un mes (JSON)"""
+    month = parse_month(request.GET.get('month'))
+    if month is None:
+        return _invalid_month_response()
+    
+    service = get_object_or_404(Service, id=pk, is_active=True)
+    
+    return JsonResponse({
+        'service': service.id,
+        'month': f'{month[0]:04d}-{month[1]:02d}',
+        'duration': service.duration_minutes,
+        'days': get_month_calendar(service, *month),
+    })
+
+
+@require_http_methods(["GET"])
+@condition(etag_func=category_calendar_etag)
+def category_calendar(request, pk):
+    """Horarios libres de todos los servicios de una categoría durante un mes (JSON)"""
+    month = parse_month(request.GET.get('month'))
+    if month is None:
+        return _invalid_month_response()
+    
+    category = get_object_or_404(Category, id=pk)
+    services = list(Service.objects.filter(category=category, is_active=True))
+    versions = get_calendar_versions([service.id for service in services])
+    
+    return JsonResponse({
+        'category': category.id,
+        'month': f'{month[0]:04d}-{month[1]:02d}',
+        'services': {
+            str(service.id): {
+                'name': service.name,
+                'duration': service.duration_minutes,
+                'days': get_month_calendar(service, *month, version=versions[service.id]),
+            }
+            for service in services
+        },
+    })
+
+
+def _parse_earliest_params(params):
+    """Validar los parámetros de búsqueda; devuelve (filtros, desde, hasta, límite) o un error"""
+    try:
+        today = timezone.localdate()
+        start_date = date.fromisoformat(params['from']) if params.get('from') else today
+        end_date = (
+            date.fromisoformat(params['to']) if params.get('to')
+            else start_date + timedelta(days=EARLIEST_DEFAULT_DAYS)
+        )
+        limit = int(params.get('limit', 5))
+        service_ids = [int(value) for value in params.getlist('service')]
+        category_id = int(params['category']) if params.get('category') else None
+        duration = int(params['duration']) if params.get('duration') else None
+    except ValueError:
+        return None, 'Parámetros inválidos'
+    
+    start_date = max(start_date, today)
+    if end_date < start_date or (end_date - start_date).days > EARLIEST_MAX_DAYS:
+        return None, f'El rango de fechas debe ser válido y de hasta {EARLIEST_MAX_DAYS} días'
+    if not 1 <= limit <= EARLIEST_MAX_RESULTS:
+        return None, f'El límite debe estar entre 1 y {EARLIEST_MAX_RESULTS}'
+    if category_id is None and not service_ids:
+        return None, 'Indica una categoría o al menos un servicio'
+    
+    filters = {}
+    if category_id is not None:
+        filters['category_id'] = category_id
+    if service_ids:
+        filters['id__in'] = service_ids
+    if duration is not None:
+        filters['duration_minutes'] = duration
+    return (filters, start_date, end_date, limit), None
+
+
+@require_http_methods(["GET"])
+def earliest_slots(request):
+    """Próximos horarios libres entre los servicios de una categoría o una lista (JSON)
+
+    Parámetros: category, service (repetible), duration, from, to (YYYY-MM-DD) y limit.
+    """
+    parsed, error = _parse_earliest_params(request.GET)
+    if error:
+        return JsonResponse({'error': error}, status=400)
+    filters, start_date, end_date, limit = parsed
+    
+    services = (
+        Service.objects.filter(is_active=True, **filters)
+        .prefetch_related('availabilities')
+        .order_by('id')
+    )
+    slots = find_earliest_slots(services, start_date, end_date, limit)
+    
+    return JsonResponse({
+        'from': start_date.isoformat(),
+        'to': end_date.isoformat(),
+        'results': [
+            {
+                'service': slot.service.id,
+                'name': slot.service.name,
+                'duration': slot.service.duration_minutes,
+                'date': slot.date.isoformat(),
+                'time': slot.time.strftime('%H:%M'),
+                'remaining': slot.remaining,
+                'booking_url': reverse('bookings:create', args=[slot.service.id]),
+            }
+            for slot in slots
+        ],
+    })
@@ -0,0 +1,100 @@
+"""
+Tests para el motor de disponibilidad de horarios
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.models import Category, Service, Availability
+from services.availability import OccupancyProfile, get_free_slots
+from bookings.models import Booking
+
+
+class OccupancyProfileTest(TestCase):
+    """Tests para el barrido de intervalos"""
+
+    def test_peak_without_intervals(self):
+        """Verificar ocupación cero sin reservas"""
+        self.assertEqual(OccupancyProfile().peak(600, 660), 0)
+
+    def test_peak_overlapping_intervals(self):
+        """Verificar el máximo de intervalos solapados"""
+        profile = OccupancyProfile([(600, 690, 1), (630, 720, 1), (700, 760, 1)])
+        self.assertEqual(profile.peak(600, 630), 1)
+        self.assertEqual(profile.peak(640, 650), 2)
+        self.assertEqual(profile.peak(690, 700), 1)
+        self.assertEqual(profile.peak(600, 760), 2)
+        self.assertEqual(profile.peak(760, 800), 0)
+
+
+@override_settings(BOOKING_SLOT_MINUTES=30)
+class FreeSlotsTest(TestCase):
+    """Tests para get_free_slots"""
+
+    def setUp(self):
+        """Crear servicio con disponibilidad diaria"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Descontracturante',
+            category=self.category,
+            duration_minutes=90,
+            price=70.00,
+            max_capacity=2
+        )
+        for day in range(7):
+            Availability.objects.create(
+                service=self.service,
+                day_of_week=day,
+                start_time=time(10, 0),
+                end_time=time(13, 0)
+            )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def book(self, start, status='pending'):
+        return Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=start,
+            status=status,
+            total_price=70.00
+        )
+
+    def test_slots_fit_inside_window(self):
+        """Verificar que los horarios terminan dentro de la ventana"""
+        slots = get_free_slots(self.service, self.tomorrow, self.tomorrow)
+        self.assertEqual(
+            [slot.time for slot in slots],
+            [time(10, 0), time(10, 30), time(11, 0), time(11, 30)]
+        )
+        self.assertTrue(all(slot.remaining == 2 for slot in slots))
+
+    def test_overlapping_bookings_reduce_capacity(self):
+        """Verificar que las reservas solapadas descuentan capacidad"""
+        self.book(time(10, 0))
+        self.book(time(11, 0))
+        slots = {slot.time: slot.remaining for slot in get_free_slots(self.service, self.tomorrow, self.tomorrow)}
+        # 10:30-12:00 se cruza con ambas reservas en 11:00-11:30
+        self.assertNotIn(time(10, 30), slots)
+        self.assertNotIn(time(11, 0), slots)
+        self.assertEqual(slots[time(11, 30)], 1)
+
+    def test_cancelled_bookings_ignored(self):
+        """Verificar que las reservas canceladas no ocupan capacidad"""
+        self.book(time(10, 0), status='cancelled')
+        slots = get_free_slots(self.service, self.tomorrow, self.tomorrow)
+        self.assertEqual(slots[0].remaining, 2)
+
+    def test_range_uses_two_queries(self):
+        """Verificar que un rango de días no genera una consulta por horario"""
+        self.book(time(10, 0))
+        with self.assertNumQueries(2):
+            slots = get_free_slots(self.service, self.tomorrow, self.tomorrow + timedelta(days=13))
+        self.assertEqual(len({slot.date for slot in slots}), 14)
+
+    def test_service_without_availability(self):
+        """Verificar que sin disponibilidad no hay horarios"""
+        self.service.availabilities.all().delete()
+        self.assertEqual(get_free_slots(self.service, self.tomorrow, self.tomorrow), [])
@@ -0,0 +1,99 @@
+"""
+Tests para la gestión de reservas paginada del dashboard
+"""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+@override_settings(
+    DASHBOARD_BOOKINGS_PAGE_SIZE=3,
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class BookingsManagementTest(TestCase):
+    """Tests para la paginación por clave y las respuestas parciales HTMX"""
+
+    def setUp(self):
+        """Crear 7 reservas, dos de ellas en el mismo día y hora"""
+        User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+        today = timezone.localdate()
+        slots = [(0, 10), (0, 10), (0, 12), (1, 9), (2, 9), (3, 11), (4, 16)]
+        self.bookings = [
+            Booking.objects.create(
+                user=self.user,
+                service=self.service,
+                booking_date=today + timedelta(days=days),
+                booking_time=time(hour, 0),
+                total_price=50.00,
+                status='cancelled' if index % 2 else 'pending',
+            )
+            for index, (days, hour) in enumerate(slots)
+        ]
+        self.expected = sorted(
+            self.bookings, key=lambda b: (b.booking_date, b.booking_time, b.id), reverse=True
+        )
+        self.client.login(username='admin', password='adminpass123')
+        self.url = reverse('dashboard:bookings')
+
+    def test_keyset_pages_cover_all_rows_once(self):
+        """Verificar que recorrer las páginas devuelve cada reserva una vez y en orden"""
+        seen, cursor = [], None
+        while True:
+            page, next_cursor = keyset_page(Booking.objects.all(), cursor, 3)
+            seen += page
+            if not next_cursor:
+                break
+            cursor = decode_cursor(next_cursor)
+        self.assertEqual(seen, self.expected)
+
+    def test_cursor_round_trip(self):
+        """Verificar la codificación del cursor y el rechazo de cursores inválidos"""
+        booking = self.bookings[0]
+        self.assertEqual(
+            decode_cursor(encode_cursor(booking)), (booking.booking_date, booking.booking_time, booking.id)
+        )
+        self.assertIsNone(decode_cursor('basura'))
+        self.assertIsNone(decode_cursor('2026-13-01_10:00:00_1'))
+
+    def test_full_page_then_htmx_next_page(self):
+        """Verificar la primera página completa y la siguiente como parcial HTMX"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'dashboard/bookings_management.html')
+        self.assertEqual(response.context['bookings'], self.expected[:3])
+        self.assertIn('after=', response.context['next_query'])
+        # Las exportaciones toman los filtros del formulario al hacer clic
+        self.assertContains(response, 'data-export-link', count=4)
+
+        response = self.client.get(f"{self.url}?{response.context['next_query']}", HTTP_HX_REQUEST='true')
+        self.assertTemplateNotUsed(response, 'dashboard/bookings_management.html')
+        self.assertTemplateUsed(response, 'dashboard/partials/booking_rows.html')
+        self.assertEqual(response.context['bookings'], self.expected[3:6])
+        self.assertNotContains(response, '<nav')
+        self.assertIn('HX-Request', response['Vary'])
+
+    def test_filters_in_partial(self):
+        """Verificar que los filtros se aplican y los valores inválidos se ignoran"""
+        response = self.client.get(self.url, {'status': 'pending'}, HTTP_HX_REQUEST='true')
+        self.assertEqual(
+            response.context['bookings'], [b for b in self.expected if b.status == 'pending'][:3]
+        )
+        self.assertIn('status=pending', response.context['next_query'])
+
+        response = self.client.get(self.url, {'status': 'otro', 'service': 'x', 'date': '2026-99-99'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['bookings'], self.expected[:3])
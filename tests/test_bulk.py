@@ -0,0 +1,131 @@
+"""
+Tests para la creación masiva de reservas
+"""
+import json
+import tempfile
+from io import StringIO
+
+from django.test import TestCase
+from django.urls import reverse
+from django.core import mail
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from accounts.models import UserProfile
+from services.models import Category, Service, Availability
+from bookings.models import Booking
+from bookings.bulk import create_bookings_bulk
+
+
+class BulkBookingTest(TestCase):
+    """Tests para create_bookings_bulk"""
+
+    def setUp(self):
+        """Crear servicio con capacidad 2 y disponibilidad diaria"""
+        self.user = User.objects.create_user(
+            username='empresa',
+            email='empresa@example.com',
+            password='testpass123'
+        )
+        UserProfile.objects.create(user=self.user)
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Relajante',
+            category=self.category,
+            duration_minutes=60,
+            price=50.00,
+            max_capacity=2
+        )
+        for day in range(7):
+            Availability.objects.create(
+                service=self.service,
+                day_of_week=day,
+                start_time=time(9, 0),
+                end_time=time(18, 0)
+            )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def row(self, start, **overrides):
+        row = {
+            'service': self.service.id,
+            'booking_date': self.tomorrow.isoformat(),
+            'booking_time': start,
+            'contact_phone': '1234567890',
+        }
+        row.update(overrides)
+        return row
+
+    def test_accepts_and_rejects_per_row(self):
+        """Verificar el reporte por fila con filas válidas e inválidas"""
+        results = create_bookings_bulk(self.user, [
+            self.row('10:00'),
+            self.row('10:00', service=9999),
+            self.row('20:00'),
+            self.row('10:00', contact_phone='abc'),
+            self.row('11:00'),
+        ])
+        self.assertEqual([bool(result.booking) for result in results], [True, False, False, False, True])
+        self.assertEqual(results[1].errors, ['Servicio no encontrado o inactivo'])
+        self.assertIn('Horario fuera de disponibilidad', results[2].errors[0])
+        self.assertTrue(results[3].errors[0].startswith('contact_phone'))
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_capacity_counts_rows_of_same_batch(self):
+        """Verificar que las filas del mismo lote consumen capacidad entre sí"""
+        Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=time(10, 0),
+            total_price=50.00
+        )
+        results = create_bookings_bulk(self.user, [self.row('10:30'), self.row('10:15'), self.row('11:00')])
+        self.assertEqual([bool(result.booking) for result in results], [True, False, True])
+
+    def test_query_count_does_not_grow_with_batch(self):
+        """Verificar que validar el lote usa consultas por conjunto"""
+        rows = [
+            self.row('09:00', booking_date=(self.tomorrow + timedelta(days=day)).isoformat())
+            for day in range(40)
+        ]
+        with self.assertNumQueries(15):  # Incluye las versiones de caché del calendario y las estadísticas
+            results = create_bookings_bulk(self.user, rows)
+        self.assertTrue(all(result.booking for result in results))
+
+    def test_single_batched_confirmation(self):
+        """Verificar que se envía un solo email para todo el lote"""
+        with self.captureOnCommitCallbacks(execute=True):
+            create_bookings_bulk(self.user, [self.row('10:00'), self.row('12:00'), self.row('14:00')])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('3 Reservas', mail.outbox[0].subject)
+
+    def test_bulk_endpoint(self):
+        """Verificar el endpoint JSON de reservas masivas"""
+        self.client.login(username='empresa', password='testpass123')
+        response = self.client.post(
+            reverse('bookings:bulk_create'),
+            json.dumps({'bookings': [self.row('10:00'), self.row('10:00', booking_date='2000-01-01')]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['accepted'], 1)
+        self.assertEqual(data['results'][1]['errors'], ['No puedes reservar en el pasado'])
+
+    def test_bulk_endpoint_invalid_json(self):
+        """Verificar error con JSON inválido"""
+        self.client.login(username='empresa', password='testpass123')
+        response = self.client.post(reverse('bookings:bulk_create'), 'no-json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_book_command_csv(self):
+        """Verificar el comando bulk_book con un archivo CSV"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('service,booking_date,booking_time,contact_phone,notes\n')
+            f.write(f'{self.service.id},{self.tomorrow.isoformat()},10:00,1234567890,Sala A\n')
+            f.write(f'{self.service.id},{self.tomorrow.isoformat()},10:00,1234567890,Sala B\n')
+            f.write(f'{self.service.id},{self.tomorrow.isoformat()},10:00,1234567890,Sala C\n')
+        call_command('bulk_book', f.name, user='empresa', stdout=StringIO())
+        self.assertEqual(Booking.objects.count(), 2)
@@ -0,0 +1,133 @@
+"""
+Tests para el calendario mensual de horarios libres
+"""
+from django.test import TestCase
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.calendar import bump_calendar_version
+from services.models import CacheVersion, Category, Service, Availability
+from bookings.models import Booking
+
+
+class CalendarViewsTest(TestCase):
+    """Tests para los endpoints JSON de calendario"""
+
+    def setUp(self):
+        """Crear servicio con disponibilidad todos los días"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Relajante',
+            category=self.category,
+            duration_minutes=60,
+            price=50.00,
+            max_capacity=1
+        )
+        for day in range(7):
+            Availability.objects.create(
+                service=self.service,
+                day_of_week=day,
+                start_time=time(10, 0),
+                end_time=time(12, 0)
+            )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.month = self.tomorrow.strftime('%Y-%m')
+        self.url = reverse('services:calendar', args=[self.service.id])
+
+    def get(self, **headers):
+        return self.client.get(self.url, {'month': self.month}, **headers)
+
+    def test_calendar_lists_free_slots(self):
+        """Verificar que el calendario devuelve los horarios del mes"""
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['service'], self.service.id)
+        self.assertEqual(
+            data['days'][self.tomorrow.isoformat()],
+            [['10:00', 1], ['10:30', 1], ['11:00', 1]]
+        )
+        self.assertIn('ETag', response)
+
+    def test_repeat_poll_returns_304_without_queries(self):
+        """Verificar que un sondeo repetido responde 304 leyendo solo el servicio y la versión"""
+        etag = self.get()['ETag']
+        with self.assertNumQueries(2):
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_calendar_skips_booking_query(self):
+        """Verificar que el calendario cacheado no vuelve a consultar reservas"""
+        self.get()
+        with self.assertNumQueries(4):  # Servicio y versión para el ETag, servicio y versión del calendario
+            self.get()
+
+    def test_booking_invalidates_calendar(self):
+        """Verificar que crear o cancelar una reserva invalida el calendario"""
+        etag = self.get()['ETag']
+        booking = Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=time(10, 0),
+            total_price=50.00
+        )
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['days'][self.tomorrow.isoformat()], [['11:00', 1]])
+
+        etag = response['ETag']
+        booking.cancel()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['days'][self.tomorrow.isoformat()]), 3)
+
+    def test_availability_change_invalidates_calendar(self):
+        """Verificar que cambiar la disponibilidad invalida el calendario"""
+        etag = self.get()['ETag']
+        Availability.objects.filter(day_of_week=self.tomorrow.weekday()).get().delete()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.tomorrow.isoformat(), response.json()['days'])
+
+    def test_version_shared_between_processes(self):
+        """Verificar que una invalidación no depende de la caché del proceso que la hizo"""
+        etag = self.get()['ETag']
+        bump_calendar_version(self.service.id)
+        cache.clear()  # Otro proceso: su caché local no vio el cambio
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.get()['ETag']
+        cache.clear()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_unknown_calendar_does_not_write_versions(self):
+        """Verificar que pedir calendarios inexistentes no crea versiones ni ETag"""
+        CacheVersion.objects.all().delete()
+        for pk in range(1000, 1005):
+            response = self.client.get(reverse('services:calendar', args=[pk]), {'month': self.month})
+            self.assertEqual(response.status_code, 404)
+            self.assertNotIn('ETag', response)
+        response = self.client.get(reverse('services:category_calendar', args=[1000]), {'month': self.month})
+        self.assertNotIn('ETag', response)
+        self.assertEqual(self.get().status_code, 200)
+        self.assertFalse(CacheVersion.objects.exists())
+
+    def test_invalid_month(self):
+        """Verificar error con mes inválido"""
+        response = self.client.get(self.url, {'month': '2026-13'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_category_calendar(self):
+        """Verificar el calendario de una categoría completa"""
+        url = reverse('services:category_calendar', args=[self.category.id])
+        response = self.client.get(url, {'month': self.month})
+        self.assertEqual(response.status_code, 200)
+        services = response.json()['services']
+        self.assertIn(str(self.service.id), services)
+        self.assertIn(self.tomorrow.isoformat(), services[str(self.service.id)]['days'])
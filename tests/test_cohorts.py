@@ -0,0 +1,105 @@
+"""
+Tests para las cohortes mensuales de clientes
+"""
+from datetime import date, time, timedelta
+from io import StringIO
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import User
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.cohorts import compute_cohorts, get_cohort_report, load_columns
+from dashboard.models import CohortReport
+
+
+def month(year, number):
+    return year * 12 + number - 1
+
+
+class CohortsTest(TestCase):
+    """Tests para compute_cohorts y el informe de cohortes"""
+
+    def setUp(self):
+        """Crear un servicio para las reservas"""
+        cache.clear()
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+
+    def test_cohort_matrix(self):
+        """Verificar tamaños, retención, recompra y ticket promedio por cohorte"""
+        # Cliente 1: enero, febrero y marzo; cliente 2: solo enero; cliente 3: febrero dos veces
+        users = np.array([1, 1, 1, 2, 3, 3])
+        months = np.array([month(2026, 1), month(2026, 2), month(2026, 3),
+                           month(2026, 1), month(2026, 2), month(2026, 2)], dtype=np.int32)
+        prices = np.array([50, 70, 30, 40, 100, 20], dtype=np.float64)
+
+        report = compute_cohorts(users, months, prices, month(2026, 3), cohort_months=3)
+        january, february = report['cohorts']
+        self.assertEqual((january['month'], january['size']), (date(2026, 1, 1), 2))
+        self.assertEqual(january['retention'], [1.0, 0.5, 0.5])
+        self.assertEqual(january['repeat_rate'], 0.5)
+        self.assertAlmostEqual(january['average_order_value'], 190 / 4)
+        self.assertEqual((february['size'], february['retention'], february['repeat_rate']), (1, [1.0, 0.0], 1.0))
+        self.assertEqual((report['customers'], report['bookings']), (3, 6))
+        self.assertAlmostEqual(report['repeat_rate'], 2 / 3)
+
+    def test_empty(self):
+        """Verificar el informe sin reservas"""
+        empty = np.array([], dtype=np.int64)
+        report = compute_cohorts(empty, empty.astype(np.int32), empty.astype(np.float64), month(2026, 3))
+        self.assertEqual((report['cohorts'], report['customers']), ([], 0))
+
+    def test_load_columns_skips_cancelled(self):
+        """Verificar que las reservas canceladas no cuentan como compra"""
+        user = User.objects.create_user(username='ana', password='testpass123')
+        for status in ('completed', 'cancelled'):
+            Booking.objects.create(
+                user=user, service=self.service, booking_date=date(2026, 2, 3),
+                booking_time=time(10, 0), total_price=50.00, status=status,
+            )
+        users, months, prices = load_columns()
+        self.assertEqual(users.tolist(), [user.id])
+        self.assertEqual(months.tolist(), [month(2026, 2)])
+        self.assertEqual(prices.tolist(), [50.0])
+
+    def test_report_cached_and_refresh_command(self):
+        """Verificar que la página lee el último informe guardado y solo el comando lo recalcula"""
+        user = User.objects.create_user(username='ana', password='testpass123')
+        Booking.objects.create(
+            user=user, service=self.service, booking_date=date.today(),
+            booking_time=time(10, 0), total_price=50.00,
+        )
+        with self.assertNumQueries(1):  # Solo la fila guardada: no hay y no se calcula
+            report = get_cohort_report()
+        self.assertEqual((report['bookings'], report['stale']), (0, True))
+
+        out = StringIO()
+        call_command('refresh_cohorts', stdout=out)
+        self.assertIn('1 clientes', out.getvalue())
+        report = get_cohort_report()
+        self.assertEqual((report['bookings'], report['stale']), (1, False))
+
+        # Un informe de un día anterior se sigue mostrando, marcado como viejo
+        CohortReport.objects.update(day=date.today() - timedelta(days=1))
+        report = get_cohort_report()
+        self.assertEqual((report['bookings'], report['stale']), (1, True))
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_cohort_report_page(self):
+        """Verificar la página de cohortes"""
+        User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        self.client.login(username='admin', password='adminpass123')
+        response = self.client.get(reverse('dashboard:cohorts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Cohortes de Clientes')
+        self.assertContains(response, 'Todavía no hay un informe calculado')
@@ -0,0 +1,115 @@
+"""
+Tests para los widgets del dashboard
+"""
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from accounts.models import UserProfile
+from services.models import Category, Service
+from bookings.models import Booking, Review
+from bookings.admin import BookingAdmin
+from dashboard.widgets import WIDGETS, render_widget
+
+
+class DashboardWidgetsTest(TestCase):
+    """Tests para los widgets del dashboard y su caché"""
+
+    def setUp(self):
+        """Crear reservas en distintos estados"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        UserProfile.objects.create(user=self.user)
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Relajante',
+            category=self.category,
+            duration_minutes=60,
+            price=50.00,
+            max_capacity=5
+        )
+        self.today = timezone.localdate()
+        self.pending = self.book(self.today)
+        self.book(self.today + timedelta(days=1), status='confirmed', paid=True, payment_date=timezone.now())
+        completed = self.book(self.today - timedelta(days=3), status='completed', paid=True,
+                              payment_date=timezone.now() - timedelta(days=3))
+        Review.objects.create(booking=completed, rating=4)
+
+    def book(self, day, **kwargs):
+        return Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=day,
+            booking_time=time(10, 0),
+            total_price=50.00,
+            **kwargs
+        )
+
+    def test_widget_numbers(self):
+        """Verificar las cifras de cada widget y que los de reservas comparten un agregado"""
+        compute = {name: widget.compute for name, widget in WIDGETS.items()}
+        with self.assertNumQueries(3):  # Versión, reservas e ingresos
+            self.assertEqual(compute['total-bookings'](self.today), {'total_bookings': 3})
+        with self.assertNumQueries(1):  # Solo la versión: el agregado ya está en la caché
+            self.assertEqual(compute['total-revenue'](self.today), {'total_revenue': Decimal('100.00')})
+        with self.assertNumQueries(1):
+            self.assertEqual(compute['community'](self.today), {'total_users': 1, 'total_services': 1})
+        with self.assertNumQueries(1):
+            self.assertEqual(compute['today'](self.today), {
+                'today_bookings': 1, 'pending_bookings': 1, 'today_revenue': Decimal('50.00'),
+            })
+        self.assertEqual(compute['rating'](self.today), {'avg_rating': 4})
+        status = compute['status'](self.today)
+        self.assertEqual(
+            (status['pending_bookings'], status['confirmed_bookings'], status['completed_bookings']), (1, 1, 1)
+        )
+        self.assertEqual([b.id for b in compute['upcoming'](self.today)['upcoming_bookings']], [
+            self.pending.id, Booking.objects.get(status='confirmed').id,
+        ])
+
+    def test_widgets_cached_and_invalidated_by_topic(self):
+        """Verificar que cada widget se cachea y solo se invalida con sus temas"""
+        render_widget('today')
+        render_widget('rating')
+        with self.assertNumQueries(2):  # Solo la versión de los datos de cada uno
+            render_widget('today')
+            render_widget('rating')
+
+        Review.objects.filter(booking__status='completed').update(rating=2)
+        Review.objects.get().save()
+        with self.assertNumQueries(1):
+            render_widget('today')
+        self.assertIn('2.0', render_widget('rating'))
+
+        self.pending.paid = True
+        self.pending.payment_date = timezone.now()
+        self.pending.save()
+        self.assertIn('$100', render_widget('today'))
+
+        BookingAdmin(Booking, None)._update_status(Booking.objects.filter(id=self.pending.id), 'cancelled')
+        self.assertIn('0%', render_widget('status'))
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_shell_and_widget_endpoints(self):
+        """Verificar que la página principal no consulta estadísticas y los widgets responden aparte"""
+        User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        self.client.login(username='admin', password='adminpass123')
+
+        response = self.client.get(reverse('dashboard:index'))
+        self.assertEqual(response.status_code, 200)
+        for name in WIDGETS:
+            self.assertContains(response, reverse('dashboard:widget', args=[name]))
+
+        response = self.client.get(reverse('dashboard:widget', args=['total-bookings']))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Total Reservas')
+        self.assertNotContains(response, '<nav')
+        self.assertEqual(self.client.get(reverse('dashboard:widget', args=['nope'])).status_code, 404)
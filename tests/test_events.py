@@ -0,0 +1,149 @@
+"""
+Tests para los eventos de reservas en vivo del dashboard
+"""
+import asyncio
+import json
+from datetime import date, time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.events import EventHub, format_sse, hub, stream
+
+
+class EventHubTest(TestCase):
+    """Tests para EventHub y el formato SSE"""
+
+    def test_publish_reaches_subscribers(self):
+        """Verificar que un evento publicado llega a cada cola suscrita"""
+        event_hub = EventHub()
+
+        async def scenario():
+            first, second = event_hub.subscribe(), event_hub.subscribe()
+            event_hub.publish({'type': 'booking.created', 'id': 1})
+            received = [await asyncio.wait_for(queue.get(), 1) for queue in (first, second)]
+            event_hub.unsubscribe(first)
+            event_hub.unsubscribe(second)
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertEqual(received, [{'type': 'booking.created', 'id': 1}] * 2)
+        self.assertEqual(event_hub.subscriber_count, 0)
+
+    def test_stream_format(self):
+        """Verificar el mensaje inicial y el formato de los eventos"""
+        async def scenario():
+            queue = asyncio.Queue()
+            await queue.put({'type': 'booking.paid', 'id': 7})
+            messages = stream(queue)
+            return [await messages.__anext__(), await messages.__anext__()]
+
+        retry, message = asyncio.run(scenario())
+        self.assertTrue(retry.startswith('retry:'))
+        self.assertEqual(message, format_sse({'type': 'booking.paid', 'id': 7}))
+        self.assertTrue(message.startswith('event: booking.paid\ndata: '))
+        self.assertEqual(json.loads(message.split('data: ')[1])['id'], 7)
+
+
+class BookingEventSignalsTest(TestCase):
+    """Tests para la publicación de eventos desde las señales de reservas"""
+
+    def setUp(self):
+        """Crear un usuario y un servicio para las reservas"""
+        self.user = User.objects.create_user(username='ana', password='testpass123', first_name='Ana')
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+
+    def published(self, action):
+        """Tipos de evento publicados al confirmar la transacción de `action`"""
+        with mock.patch.object(EventHub, 'subscriber_count', 1), \
+                mock.patch.object(hub, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                action()
+        return [call.args[0]['type'] for call in publish.call_args_list]
+
+    def test_lifecycle_events(self):
+        """Verificar los eventos de creación, pago y cancelación"""
+        bookings = []
+        self.assertEqual(self.published(lambda: bookings.append(Booking.objects.create(
+            user=self.user, service=self.service, booking_date=date(2026, 5, 4),
+            booking_time=time(10, 0), total_price=50.00,
+        ))), ['booking.created'])
+        booking = bookings[0]
+
+        def pay():
+            booking.paid = True
+            booking.save()
+        self.assertEqual(self.published(pay), ['booking.paid'])
+
+        def cancel():
+            booking.status = 'cancelled'
+            booking.save()
+        self.assertEqual(self.published(cancel), ['booking.cancelled'])
+
+        def touch():
+            booking.save()
+        self.assertEqual(self.published(touch), [])
+
+    def test_no_subscribers_no_events(self):
+        """Verificar que sin dashboards conectados no se publica nada"""
+        with mock.patch.object(hub, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Booking.objects.create(
+                    user=self.user, service=self.service, booking_date=date(2026, 5, 4),
+                    booking_time=time(10, 0), total_price=50.00,
+                )
+        publish.assert_not_called()
+
+
+class BookingEventsViewTest(TestCase):
+    """Tests para el endpoint SSE del dashboard"""
+
+    def setUp(self):
+        """Crear un administrador y un usuario común"""
+        self.admin = User.objects.create_superuser(
+            username='admin', password='adminpass123', email='admin@example.com'
+        )
+        User.objects.create_user(username='ana', password='testpass123')
+
+    def test_requires_staff(self):
+        """Verificar que solo el staff puede abrir el flujo de eventos"""
+        self.assertEqual(self.client.get(reverse('dashboard:events')).status_code, 403)
+        self.client.login(username='ana', password='testpass123')
+        self.assertEqual(self.client.get(reverse('dashboard:events')).status_code, 403)
+
+    async def test_stream_delivers_events(self):
+        """Verificar que el flujo entrega los eventos publicados y libera la suscripción"""
+        await sync_to_async(self.client.force_login)(self.admin)
+        self.async_client.cookies = self.client.cookies
+
+        response = await self.async_client.get(reverse('dashboard:events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        messages = aiter(response.streaming_content)
+        self.assertTrue((await anext(messages)).startswith(b'retry:'))
+        self.assertEqual(hub.subscriber_count, 1)
+        hub.publish({'type': 'booking.created', 'id': 3})
+        self.assertIn(b'event: booking.created', await asyncio.wait_for(anext(messages), 1))
+
+        # El handler ASGI cierra la respuesta al terminar de enviarla
+        await messages.aclose()
+        await sync_to_async(response.close)()
+        self.assertEqual(hub.subscriber_count, 0)
+
+    def test_stream_ends_after_lifetime(self):
+        """Verificar que la conexión termina sola para que el cliente reconecte"""
+        async def scenario():
+            return [message async for message in stream(asyncio.Queue(), seconds=0.05)]
+
+        messages = asyncio.run(scenario())
+        self.assertTrue(messages[0].startswith('retry:'))
+        self.assertLessEqual(len(messages), 2)
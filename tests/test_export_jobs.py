@@ -0,0 +1,166 @@
+"""
+Tests para las exportaciones en segundo plano del dashboard
+"""
+import csv
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.reports import REPORTS
+from dashboard.export_jobs import claim_next_job, fail_stale_jobs, purge_export_jobs, run_export_job, submit_export
+from dashboard.models import ExportJob
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    DASHBOARD_EXPORT_CHUNK_SIZE=2,
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class ExportJobTest(TestCase):
+    """Tests para la cola, el worker, la caché de archivos y las vistas de avance"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        """Crear un administrador y cinco reservas"""
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username='admin', password='adminpass123', email='admin@example.com'
+        )
+        self.user = User.objects.create_user(username='ana', password='testpass123', first_name='Ana')
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+        for day in range(1, 6):
+            self.book(date(2026, 5, day), status='completed' if day % 2 else 'pending')
+
+    def book(self, booking_date, status='pending'):
+        return Booking.objects.create(
+            user=self.user, service=self.service, booking_date=booking_date,
+            booking_time=time(10, 0), total_price=50.00, status=status, contact_phone='2025551234',
+        )
+
+    def run_worker(self):
+        call_command('run_export_worker', '--once', stdout=StringIO())
+
+    def test_worker_builds_file_with_progress(self):
+        """Verificar que el worker genera el archivo con los filtros y registra el avance"""
+        job = submit_export('history', 'csv', {'status': 'completed', 'date': ''}, self.admin)
+        self.assertEqual((job.status, job.params), ('pending', {'status': 'completed'}))
+
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual((job.processed, job.total, job.percent), (3, 3, 100))
+        with job.file.open('rb') as file:
+            rows = list(csv.reader(file.read().decode('utf-8-sig').splitlines()))
+        self.assertEqual([row[1] for row in rows[1:]], ['2026-05-05', '2026-05-03', '2026-05-01'])
+
+    def test_identical_exports_reuse_the_job(self):
+        """Verificar que un pedido igual reutiliza el trabajo en cola, o el hecho hasta que cambian los datos"""
+        job = submit_export('bookings', 'xlsx', {}, self.admin)
+        self.assertEqual(submit_export('bookings', 'xlsx', {}, self.admin), job)
+        self.assertNotEqual(submit_export('bookings', 'pdf', {}, self.admin), job)
+
+        self.run_worker()
+        self.assertEqual(submit_export('bookings', 'xlsx', {}, self.admin), job)
+
+        self.book(date(2026, 5, 6))
+        job = submit_export('bookings', 'xlsx', {}, self.admin)
+        self.assertEqual(job.status, 'pending')
+
+        # En cola se reutiliza aunque cambien los datos: todavía no los leyó
+        self.book(date(2026, 5, 7))
+        self.assertEqual(submit_export('bookings', 'xlsx', {'date': ''}, self.admin), job)
+        self.assertNotEqual(submit_export('bookings', 'xlsx', {'status': 'pending'}, self.admin), job)
+        self.assertEqual(ExportJob.objects.filter(status='pending').count(), 2)
+
+    def test_failed_job_is_retried(self):
+        """Verificar que un error queda en el trabajo y el siguiente pedido se vuelve a encolar"""
+        def broken(params, count=False):
+            raise ValueError('sin datos')
+
+        job = submit_export('revenue', 'pdf', {}, self.admin)
+        with mock.patch.dict(REPORTS, {'revenue': REPORTS['revenue']._replace(build=broken)}):
+            run_export_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'sin datos'))
+        self.assertNotEqual(submit_export('revenue', 'pdf', {}, self.admin), job)
+
+    def test_claim_once(self):
+        """Verificar que un trabajo en cola se toma una sola vez"""
+        job = submit_export('revenue', 'xlsx', {}, self.admin)
+        self.assertEqual(claim_next_job(), job)
+        self.assertIsNone(claim_next_job())
+
+    def test_stale_and_expired_jobs(self):
+        """Verificar que se cortan los trabajos interrumpidos y se borran los vencidos con su archivo"""
+        job = submit_export('bookings', 'csv', {}, self.admin)
+        self.run_worker()
+        job.refresh_from_db()
+        storage, name = job.file.storage, job.file.name
+        self.assertTrue(storage.exists(name))
+
+        long_ago = timezone.now() - timedelta(days=2)
+        ExportJob.objects.filter(pk=job.pk).update(finished_at=long_ago)
+        stale = submit_export('revenue', 'pdf', {}, self.admin)
+        ExportJob.objects.filter(pk=stale.pk).update(status='running', started_at=long_ago)
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        self.assertEqual(purge_export_jobs(), 1)
+        self.assertFalse(storage.exists(name))
+        self.assertEqual(list(ExportJob.objects.values_list('status', flat=True)), ['failed'])
+
+    async def test_views(self):
+        """Verificar el alta, el fragmento que se consulta hasta terminar y la descarga"""
+        await sync_to_async(self.client.force_login)(self.admin)
+        self.async_client.cookies = self.client.cookies
+
+        response = await self.async_client.post(reverse('dashboard:export_job_create'), {'kind': 'revenue', 'format': 'doc'})
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.post(
+            reverse('dashboard:export_job_create'), {'kind': 'history', 'format': 'csv', 'status': 'pending'}
+        )
+        self.assertContains(response, 'hx-trigger="every 1s"')
+        job = await ExportJob.objects.aget()
+
+        await sync_to_async(self.run_worker)()
+        response = await self.async_client.get(reverse('dashboard:export_job', args=[job.pk]))
+        self.assertNotContains(response, 'hx-trigger')
+        download = reverse('dashboard:export_job_download', args=[job.pk])
+        self.assertContains(response, download)
+
+        response = await self.async_client.get(download)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        await sync_to_async(response.close)()
+        self.assertEqual(len(content.decode('utf-8-sig').splitlines()), 1 + 2)
+
+    def test_requires_staff(self):
+        """Verificar que las exportaciones en segundo plano requieren staff"""
+        self.client.login(username='ana', password='testpass123')
+        response = self.client.post(reverse('dashboard:export_job_create'), {'kind': 'bookings', 'format': 'csv'})
+        self.assertNotEqual(response.status_code, 200)
+        self.assertFalse(ExportJob.objects.exists())
@@ -0,0 +1,186 @@
+"""
+Tests para las exportaciones de reservas del dashboard
+"""
+import csv
+import re
+from datetime import date, time
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from openpyxl import load_workbook
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.pdf_reports import PdfReport
+
+
+class ExportTestMixin:
+    """Reservas de ejemplo y descarga de exportaciones con el cliente async"""
+
+    def setUp(self):
+        """Crear un administrador y cinco reservas de dos servicios"""
+        self.admin = User.objects.create_superuser(
+            username='admin', password='adminpass123', email='admin@example.com'
+        )
+        self.user = User.objects.create_user(
+            username='ana', password='testpass123', first_name='Ana', last_name='Pérez', email='ana@example.com'
+        )
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.massage = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+        facial = Service.objects.create(
+            name='Facial, completo', category=category, duration_minutes=30, price=30.00, max_capacity=5
+        )
+        for day, service, status in [
+            (1, self.massage, 'pending'), (2, self.massage, 'cancelled'), (3, facial, 'completed'),
+            (4, self.massage, 'completed'), (5, facial, 'pending'),
+        ]:
+            Booking.objects.create(
+                user=self.user, service=service, booking_date=date(2026, 5, day),
+                booking_time=time(10, 0), total_price=service.price, status=status, contact_phone='2025551234',
+            )
+
+    async def download(self, name, content_type, **params):
+        """Contenido descargado de la exportación `name` con `params`"""
+        await sync_to_async(self.client.force_login)(self.admin)
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse(f'dashboard:{name}'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], content_type)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        await sync_to_async(response.close)()
+        return content
+
+
+@override_settings(DASHBOARD_EXPORT_CHUNK_SIZE=2)
+class BookingsCsvExportTest(ExportTestMixin, TestCase):
+    """Tests para la exportación CSV en streaming"""
+
+    async def export(self, **params):
+        """Filas del CSV exportado con `params`"""
+        content = await self.download('export_bookings_csv', 'text/csv; charset=utf-8', **params)
+        return list(csv.reader(content.decode('utf-8-sig').splitlines()))
+
+    async def test_full_history_in_order(self):
+        """Verificar que se exportan todas las reservas, de la más reciente a la más antigua"""
+        rows = await self.export()
+        self.assertEqual(rows[0][:3], ['ID', 'Fecha', 'Hora'])
+        self.assertEqual([row[1] for row in rows[1:]], [f'2026-05-0{day}' for day in range(5, 0, -1)])
+        self.assertEqual(rows[1][3:9], ['ana', 'Ana', 'Pérez', 'ana@example.com', 'Facial, completo', 'Pendiente'])
+
+    async def test_same_filters_as_management(self):
+        """Verificar los filtros de estado y servicio, ignorando valores inválidos"""
+        rows = await self.export(status='completed', service=str(self.massage.id), date='mañana')
+        self.assertEqual([(row[1], row[8]) for row in rows[1:]], [('2026-05-04', 'Completada')])
+
+    async def test_sent_in_chunks_under_asgi_and_wsgi(self):
+        """Verificar que la respuesta se consume por tandas con el iterador que corresponde al servidor"""
+        await sync_to_async(self.client.force_login)(self.admin)
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse('dashboard:export_bookings_csv'))
+        chunks = [chunk async for chunk in response.streaming_content]
+        await sync_to_async(response.close)()
+        self.assertEqual(len(chunks), 4)  # Encabezado y tres tandas de dos filas
+
+        response = await sync_to_async(self.client.get)(reverse('dashboard:export_bookings_csv'))
+        self.assertFalse(response.is_async)
+        chunks = await sync_to_async(list)(response.streaming_content)
+        await sync_to_async(response.close)()
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b''.join(chunks).decode('utf-8-sig').count('\n'), 6)
+
+    def test_requires_staff(self):
+        """Verificar que la exportación requiere staff"""
+        self.client.login(username='ana', password='testpass123')
+        response = self.client.get(reverse('dashboard:export_bookings_csv'))
+        self.assertNotEqual(response.status_code, 200)
+
+
+@override_settings(DASHBOARD_EXPORT_CHUNK_SIZE=2, DASHBOARD_EXPORT_SPOOL_SIZE=1024)
+class ExcelExportTest(ExportTestMixin, TestCase):
+    """Tests para las exportaciones Excel en modo solo escritura"""
+
+    async def workbook(self, name, **params):
+        content = await self.download(
+            name, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', **params
+        )
+        return load_workbook(BytesIO(content))
+
+    async def test_bookings_full_history_with_styles(self):
+        """Verificar todas las reservas (sin tope), los filtros y los estilos con nombre"""
+        sheet = (await self.workbook('export_bookings_excel')).active
+        rows = list(sheet.iter_rows(min_row=3, values_only=True))
+        self.assertEqual(rows[0], ('Usuario', 'Servicio', 'Fecha', 'Estado', 'Monto'))
+        self.assertEqual(len(rows), 1 + 5)
+        self.assertEqual(rows[1][:2], ('Ana Pérez', 'Facial, completo'))
+        self.assertEqual(sheet['A3'].style, 'header')
+        self.assertEqual((sheet['C4'].style, sheet['E4'].style), ('date', 'money'))
+        self.assertEqual(sheet['C4'].value.date(), date(2026, 5, 5))
+
+        sheet = (await self.workbook('export_bookings_excel', status='cancelled')).active
+        self.assertEqual(sheet.max_row, 4)
+
+    async def test_revenue(self):
+        """Verificar el reporte de ingresos en Excel"""
+        sheet = (await self.workbook('export_revenue_excel')).active
+        self.assertEqual(sheet['A1'].value, 'Reporte de Ingresos')
+        self.assertEqual([sheet[f'A{row}'].value for row in range(5, 8)], [
+            'Ingresos Totales', 'Ingresos Hoy', 'Ingresos Este Mes',
+        ])
+        self.assertEqual(sheet['B5'].style, 'money')
+
+
+class PdfReportTest(TestCase):
+    """Tests para el armado de informes PDF por bloques"""
+
+    def test_blocks_span_pages_with_page_count(self):
+        """Verificar que las filas se reparten en varias páginas con el total en el pie"""
+        report = PdfReport('Listado')
+        report.table(
+            ['Número', 'Texto'], ([str(number), 'x' * 200] for number in range(300)),
+            widths=[100, 100], fit=[1], block_rows=70,
+        )
+        content = report.save().read()
+        self.assertTrue(content.startswith(b'%PDF'))
+        pages = int(re.search(rb'/Count (\d+)', content).group(1))
+        self.assertGreater(pages, 1)
+        # Un formulario con el total, referenciado desde cada página
+        self.assertEqual(content.count(b'pageCount'), pages)
+
+    def test_empty_table(self):
+        """Verificar un informe sin filas"""
+        report = PdfReport('Vacío')
+        report.table(['Número'], [], widths=[100])
+        self.assertIn(b'/Count 1', report.save().read())
+
+
+@override_settings(DASHBOARD_EXPORT_CHUNK_SIZE=2)
+class PdfExportTest(ExportTestMixin, TestCase):
+    """Tests para las exportaciones PDF"""
+
+    async def test_bookings_pdf(self):
+        """Verificar el PDF de reservas con filtros y en bloques"""
+        content = await self.download('export_bookings_pdf', 'application/pdf', status='completed')
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertIn(b'/Count 1', content)
+
+    async def test_revenue_pdf(self):
+        """Verificar el PDF de ingresos"""
+        content = await self.download('export_revenue_pdf', 'application/pdf')
+        self.assertTrue(content.startswith(b'%PDF'))
+
+    async def test_revenue_pdf_escapes_service_name(self):
+        """Verificar que un nombre de servicio con marcado no rompe el PDF filtrado"""
+        self.massage.name = 'Masaje & <Spa'
+        await sync_to_async(self.massage.save)()
+        booking = await Booking.objects.filter(service=self.massage, status='completed').afirst()
+        booking.paid, booking.payment_date = True, timezone.now()
+        await sync_to_async(booking.save)()
+        content = await self.download('export_revenue_pdf', 'application/pdf', service=self.massage.id)
+        self.assertTrue(content.startswith(b'%PDF'))
@@ -223,3 +223,65 @@ class ProfileFormTest(TestCase):
         })
         self.assertFalse(form.is_valid())
 
+
+
+class BookingFormCapacityTest(TestCase):
+    """Tests para el chequeo de capacidad con solapamiento por duración"""
+    
+    def setUp(self):
+        """Crear servicio de 90 minutos con capacidad 1"""
+        from services.models import Availability
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Descontracturante',
+            category=self.category,
+            duration_minutes=90,
+            price=70.00,
+            max_capacity=1
+        )
+        self.tomorrow = (timezone.now() + timedelta(days=1)).date()
+        Availability.objects.create(
+            service=self.service,
+            day_of_week=self.tomorrow.weekday(),
+            start_time=time(9, 0),
+            end_time=time(18, 0)
+        )
+        Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=time(10, 0),
+            total_price=70.00
+        )
+    
+    def form_for(self, start):
+        return BookingForm(data={
+            'booking_date': self.tomorrow,
+            'booking_time': start,
+            'contact_phone': '1234567890'
+        }, service=self.service)
+    
+    def test_overlapping_booking_rejected(self):
+        """Verificar que una reserva que se solapa con otra es rechazada"""
+        form = self.form_for(time(10, 30))
+        self.assertFalse(form.is_valid())
+        self.assertIn(
+            'No hay capacidad disponible para esta fecha y hora. Intenta otro horario.',
+            form.non_field_errors()
+        )
+    
+    def test_booking_ending_before_existing_rejected(self):
+        """Verificar que una reserva anterior que termina dentro de otra es rechazada"""
+        self.assertFalse(self.form_for(time(9, 0)).is_valid())
+    
+    def test_adjacent_booking_allowed(self):
+        """Verificar que una reserva contigua no genera conflicto"""
+        self.assertTrue(self.form_for(time(11, 30)).is_valid())
+    
+    def test_cancelled_booking_frees_capacity(self):
+        """Verificar que las reservas canceladas no cuentan"""
+        for booking in Booking.objects.all():
+            booking.status = 'cancelled'
+            booking.save()
+        self.assertTrue(self.form_for(time(10, 30)).is_valid())
@@ -0,0 +1,113 @@
+"""
+Tests para el mapa de calor de ocupación
+"""
+from datetime import date, time
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User
+
+from services.models import Availability, Category, Service
+from bookings.models import Booking
+from dashboard.heatmap import SLOTS_PER_DAY, get_heatmap, heatmap_range, occupied_minutes, weekday_counts
+
+
+class HeatmapTest(TestCase):
+    """Tests para occupied_minutes y get_heatmap"""
+
+    def setUp(self):
+        """Crear un servicio con horario los lunes"""
+        cache.clear()
+        self.user = User.objects.create_user(username='ana', password='testpass123')
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=2
+        )
+        Availability.objects.create(
+            service=self.service, day_of_week=0, start_time=time(10, 0), end_time=time(12, 0)
+        )
+
+    def book(self, booking_date, booking_time, status='confirmed'):
+        return Booking.objects.create(
+            user=self.user, service=self.service, booking_date=booking_date,
+            booking_time=booking_time, total_price=50.00, status=status,
+        )
+
+    def test_minutes_split_across_slots(self):
+        """Verificar que una reserva reparte su duración entre las franjas que cubre"""
+        booked = occupied_minutes(
+            np.array([0]), np.array([2]), np.array([10 * 60 + 5]), np.array([60]), service_count=1
+        )
+        self.assertEqual(booked.shape, (1, 7, SLOTS_PER_DAY))
+        self.assertEqual(booked[0, 2, 40:45].tolist(), [10, 15, 15, 15, 5])
+        self.assertEqual(booked.sum(), 60)
+
+    def test_wraps_past_sunday_midnight(self):
+        """Verificar que lo que pasa de la medianoche del domingo cae el lunes"""
+        booked = occupied_minutes(
+            np.array([0]), np.array([6]), np.array([23 * 60 + 30]), np.array([60]), service_count=1
+        )
+        self.assertEqual((booked[0, 6].sum(), booked[0, 0, :2].tolist()), (30, [15, 15]))
+
+    def test_weekday_counts(self):
+        """Verificar los días de la semana de un rango (lunes 4 a lunes 11 de mayo de 2026)"""
+        self.assertEqual(weekday_counts(date(2026, 5, 4), date(2026, 5, 11)).tolist(), [2, 1, 1, 1, 1, 1, 1])
+
+    def test_heatmap(self):
+        """Verificar utilización, horario y exclusión de canceladas"""
+        monday = date(2026, 5, 4)
+        self.book(monday, time(10, 0))
+        self.book(monday, time(10, 0), status='completed')
+        self.book(monday, time(11, 0), status='cancelled')
+
+        heatmap = get_heatmap(monday, date(2026, 5, 10))
+        self.assertEqual(heatmap['bookings'], 2)
+        self.assertEqual((heatmap['slots'][0], heatmap['slots'][-1]), (time(10, 0), time(11, 45)))
+        service, = heatmap['services']
+        monday_row = service['rows'][0]
+        self.assertEqual(monday_row['day'], 'Lunes')
+        self.assertEqual([cell['rate'] for cell in monday_row['cells']], [1.0] * 4 + [0.0] * 4)
+        self.assertTrue(all(cell['open'] for cell in monday_row['cells']))
+        self.assertFalse(any(cell['open'] for cell in service['rows'][1]['cells']))
+        self.assertEqual(service['booked_minutes'], 120)
+
+    def test_cached_per_range(self):
+        """Verificar la caché por rango y su invalidación al cambiar reservas"""
+        monday = date(2026, 5, 4)
+        get_heatmap(monday, monday)
+        with self.assertNumQueries(1):  # Solo la versión de los datos
+            get_heatmap(monday, monday)
+        self.book(monday, time(10, 0))
+        self.assertEqual(get_heatmap(monday, monday)['bookings'], 1)
+
+    def test_range_defaults(self):
+        """Verificar el rango por defecto con parámetros inválidos"""
+        today = date(2026, 5, 31)
+        self.assertEqual(heatmap_range({'start': 'ayer'}, today), (date(2026, 3, 3), today))
+        self.assertEqual(
+            heatmap_range({'start': '2026-01-01', 'end': '2026-01-31'}, today), (date(2026, 1, 1), date(2026, 1, 31))
+        )
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_page_and_csv_export(self):
+        """Verificar la página del mapa de calor y su exportación CSV"""
+        User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        self.client.login(username='admin', password='adminpass123')
+        self.book(date(2026, 5, 4), time(10, 0))
+        params = {'start': '2026-05-04', 'end': '2026-05-10'}
+
+        response = self.client.get(reverse('dashboard:occupancy'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Mapa de Ocupación')
+
+        response = self.client.get(reverse('dashboard:export_occupancy_csv'), params)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0], 'Servicio,Día,Franja,Minutos reservados,Utilización,En horario')
+        self.assertIn('Masaje,Lunes,10:00,15.0,0.500,sí', lines)
+        self.assertEqual(len(lines), 1 + 7 * 8)
@@ -0,0 +1,120 @@
+"""
+Tests para las retenciones temporales de cupos
+"""
+from io import StringIO
+
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.models import Category, Service, Availability
+from services.availability import get_peak_occupancy, get_free_slots
+from bookings.models import Booking, SlotHold
+from bookings.holds import place_hold, purge_expired_holds
+from bookings.reservations import reserve_booking, CapacityError
+
+
+class SlotHoldTest(TestCase):
+    """Tests para retener, convertir y purgar cupos"""
+
+    def setUp(self):
+        """Crear servicio con capacidad 1"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otro', password='testpass123')
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Relajante',
+            category=self.category,
+            duration_minutes=60,
+            price=50.00,
+            max_capacity=1
+        )
+        for day in range(7):
+            Availability.objects.create(
+                service=self.service,
+                day_of_week=day,
+                start_time=time(9, 0),
+                end_time=time(18, 0)
+            )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def booking(self, user, start=time(10, 0)):
+        return Booking(
+            user=user,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=start,
+            total_price=50.00
+        )
+
+    def test_hold_takes_capacity_from_others(self):
+        """Verificar que una retención vigente ocupa capacidad para los demás"""
+        place_hold(self.user, self.service, self.tomorrow, time(10, 0))
+        self.assertEqual(get_peak_occupancy(self.service, self.tomorrow, time(10, 30)), 1)
+        self.assertEqual(get_peak_occupancy(self.service, self.tomorrow, time(10, 0), holder=self.user), 0)
+        # Solo se descuenta la retención del mismo horario
+        self.assertEqual(get_peak_occupancy(self.service, self.tomorrow, time(10, 30), holder=self.user), 1)
+        with self.assertRaises(CapacityError):
+            place_hold(self.other, self.service, self.tomorrow, time(10, 30))
+        with self.assertRaises(CapacityError):
+            reserve_booking(self.booking(self.other))
+        slot_times = [slot.time for slot in get_free_slots(self.service, self.tomorrow, self.tomorrow)]
+        self.assertNotIn(time(10, 0), slot_times)
+
+    def test_hold_converts_into_booking(self):
+        """Verificar que la retención propia se convierte en la reserva"""
+        place_hold(self.user, self.service, self.tomorrow, time(10, 0))
+        reserve_booking(self.booking(self.user))
+        self.assertFalse(SlotHold.objects.exists())
+        self.assertEqual(get_peak_occupancy(self.service, self.tomorrow, time(10, 0)), 1)
+
+    def test_new_hold_replaces_previous(self):
+        """Verificar que un usuario retiene un solo horario por servicio"""
+        place_hold(self.user, self.service, self.tomorrow, time(10, 0))
+        place_hold(self.user, self.service, self.tomorrow, time(14, 0))
+        self.assertEqual(SlotHold.objects.get().booking_time, time(14, 0))
+
+    def test_expired_hold_frees_capacity(self):
+        """Verificar que una retención vencida no cuenta y el barrido la borra"""
+        hold = place_hold(self.user, self.service, self.tomorrow, time(10, 0))
+        SlotHold.objects.filter(id=hold.id).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(get_peak_occupancy(self.service, self.tomorrow, time(10, 0)), 0)
+        place_hold(self.other, self.service, self.tomorrow, time(14, 0))
+
+        self.assertEqual(purge_expired_holds(), 1)
+        self.assertEqual(SlotHold.objects.get().user, self.other)
+
+    def test_purge_command_batches(self):
+        """Verificar que el comando borra en lotes todas las retenciones vencidas"""
+        past = timezone.now() - timedelta(minutes=1)
+        SlotHold.objects.bulk_create([
+            SlotHold(user=self.user, service=self.service, booking_date=self.tomorrow,
+                     booking_time=time(10, 0), expires_at=past)
+            for _ in range(5)
+        ])
+        out = StringIO()
+        with self.assertNumQueries(8):  # 3 lotes × (SELECT + DELETE), la versión del calendario y la lista de espera
+            call_command('purge_expired_holds', batch_size=2, stdout=out)
+        self.assertFalse(SlotHold.objects.exists())
+        self.assertIn('5 retenciones', out.getvalue())
+
+    def test_hold_endpoint(self):
+        """Verificar el endpoint que retiene un horario"""
+        url = reverse('bookings:hold', args=[self.service.id])
+        data = {'booking_date': self.tomorrow.isoformat(), 'booking_time': '10:00'}
+
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['hold'], SlotHold.objects.get().id)
+
+        self.client.login(username='otro', password='testpass123')
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('capacidad', response.json()['error'])
+
+        response = self.client.post(url, {'booking_date': self.tomorrow.isoformat(), 'booking_time': '20:00'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,124 @@
+"""
+Tests para el valor de vida del cliente en UserProfile
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from accounts.models import UserProfile
+from services.models import Category, Service, Availability
+from bookings.models import Booking
+from bookings.bulk import create_bookings_bulk
+from dashboard.user_stats import get_user_counts
+
+
+class LifetimeValueTest(TestCase):
+    """Tests para el mantenimiento incremental de los contadores del perfil"""
+
+    def setUp(self):
+        """Crear dos clientes con perfil y un servicio"""
+        self.ana = User.objects.create_user(username='ana', password='testpass123', first_name='Ana')
+        self.luis = User.objects.create_user(username='luis', password='testpass123', first_name='Luis')
+        UserProfile.objects.create(user=self.ana)
+        UserProfile.objects.create(user=self.luis)
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+        self.today = timezone.localdate()
+
+    def book(self, user, days=1, paid=False):
+        return Booking.objects.create(
+            user=user,
+            service=self.service,
+            booking_date=self.today + timedelta(days=days),
+            booking_time=time(10, 0),
+            total_price=self.service.price,
+            paid=paid,
+        )
+
+    def profile(self, user):
+        profile = UserProfile.objects.get(user=user)
+        return profile.lifetime_bookings, profile.lifetime_spent, profile.last_booking_date
+
+    def test_counters_follow_booking_lifecycle(self):
+        """Verificar crear, pagar, mover, reasignar y borrar reservas"""
+        first = self.book(self.ana, days=1)
+        later = self.book(self.ana, days=5, paid=True)
+        self.assertEqual(self.profile(self.ana), (2, Decimal('50.00'), self.today + timedelta(days=5)))
+
+        first.paid = True
+        first.save()
+        self.assertEqual(self.profile(self.ana)[1], Decimal('100.00'))
+
+        later.booking_date = self.today + timedelta(days=2)
+        later.save()
+        self.assertEqual(self.profile(self.ana)[2], self.today + timedelta(days=2))
+
+        later.user = self.luis
+        later.save()
+        self.assertEqual(self.profile(self.ana), (1, Decimal('50.00'), self.today + timedelta(days=1)))
+        self.assertEqual(self.profile(self.luis), (1, Decimal('50.00'), self.today + timedelta(days=2)))
+
+        first.delete()
+        self.assertEqual(self.profile(self.ana), (0, Decimal('0.00'), None))
+
+    def test_bulk_create_updates_counters(self):
+        """Verificar que las reservas masivas suman al perfil"""
+        for day in range(7):
+            Availability.objects.create(
+                service=self.service, day_of_week=day, start_time=time(9, 0), end_time=time(18, 0)
+            )
+        tomorrow = (self.today + timedelta(days=1)).isoformat()
+        create_bookings_bulk(self.ana, [
+            {'service': self.service.id, 'booking_date': tomorrow, 'booking_time': start, 'contact_phone': '1234567890'}
+            for start in ('10:00', '12:00')
+        ])
+        self.assertEqual(self.profile(self.ana)[0], 2)
+
+    def test_recompute_command(self):
+        """Verificar que el comando recalcula los contadores desde las reservas"""
+        self.book(self.ana, days=3, paid=True)
+        self.book(self.luis, days=4)
+        UserProfile.objects.update(lifetime_bookings=0, lifetime_spent=0, last_booking_date=None)
+
+        out = StringIO()
+        call_command('recompute_lifetime_values', stdout=out)
+        self.assertIn('2 perfiles', out.getvalue())
+        self.assertEqual(self.profile(self.ana), (1, Decimal('50.00'), self.today + timedelta(days=3)))
+        self.assertEqual(self.profile(self.luis), (1, Decimal('0.00'), self.today + timedelta(days=4)))
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_users_stats_reads_counters(self):
+        """Verificar que las estadísticas de usuarios leen los contadores del perfil"""
+        admin = User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        UserProfile.objects.create(user=admin)
+        self.book(self.ana, paid=True)
+        self.book(self.ana, days=2, paid=True)
+        self.book(self.luis)
+        self.client.login(username='admin', password='adminpass123')
+
+        response = self.client.get(reverse('dashboard:users'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_users'], 3)
+        self.assertEqual(response.context['users_with_bookings'], 2)
+        top = response.context['top_users']
+        self.assertEqual([row['user'] for row in top], [self.ana, self.luis])
+        self.assertEqual((top[0]['total_spent'], top[0]['average_per_booking']), (Decimal('100.00'), Decimal('50.00')))
+
+        # Los totales quedan en la caché hasta que cambia una reserva o un perfil
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user_counts()['total_users'], 3)
+        self.book(admin, days=3)
+        self.assertEqual(get_user_counts()['users_with_bookings'], 3)
+        UserProfile.objects.get(user=self.luis).delete()
+        self.assertEqual(get_user_counts()['total_users'], 2)
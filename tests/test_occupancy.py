@@ -0,0 +1,94 @@
+"""
+Tests para la proyección de ocupación por horario
+"""
+from io import StringIO
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.models import Category, Service
+from bookings.models import Booking, ServiceDayOccupancy
+from bookings.admin import BookingAdmin
+
+
+class ServiceDayOccupancyTest(TestCase):
+    """Tests para el mantenimiento incremental de ServiceDayOccupancy"""
+
+    def setUp(self):
+        """Crear servicio y usuario"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Relajante',
+            category=self.category,
+            duration_minutes=60,
+            price=50.00,
+            max_capacity=5
+        )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def book(self, start=time(10, 0), **kwargs):
+        return Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=start,
+            total_price=50.00,
+            **kwargs
+        )
+
+    def units(self):
+        return {
+            row.booking_time: row.booked_units
+            for row in ServiceDayOccupancy.objects.filter(booked_units__gt=0)
+        }
+
+    def test_create_cancel_and_reschedule(self):
+        """Verificar que crear, cancelar y mover reservas actualiza la ocupación"""
+        first = self.book()
+        self.book()
+        self.assertEqual(self.units(), {time(10, 0): 2})
+
+        first.booking_time = time(14, 0)
+        first.save()
+        self.assertEqual(self.units(), {time(10, 0): 1, time(14, 0): 1})
+
+        first.cancel()
+        self.assertEqual(self.units(), {time(10, 0): 1})
+
+    def test_delete_and_inactive_bookings(self):
+        """Verificar que borrar descuenta y las reservas inactivas no suman"""
+        booking = self.book()
+        self.book(status='cancelled')
+        booking.delete()
+        self.assertEqual(self.units(), {})
+
+    def test_admin_bulk_actions(self):
+        """Verificar que las acciones masivas con update() mantienen la ocupación"""
+        self.book()
+        self.book(time(11, 0))
+        admin = BookingAdmin(Booking, None)
+
+        admin._update_status(Booking.objects.all(), 'cancelled')
+        self.assertEqual(self.units(), {})
+
+        admin._update_status(Booking.objects.all(), 'confirmed')
+        self.assertEqual(self.units(), {time(10, 0): 1, time(11, 0): 1})
+
+        admin._update_status(Booking.objects.all(), 'pending')
+        self.assertEqual(self.units(), {time(10, 0): 1, time(11, 0): 1})
+
+    def test_rebuild_occupancy_command(self):
+        """Verificar que el comando recalcula la proyección desde las reservas"""
+        self.book()
+        self.book()
+        self.book(time(12, 0))
+        ServiceDayOccupancy.objects.update(booked_units=99)
+
+        out = StringIO()
+        call_command('rebuild_occupancy', stdout=out)
+        self.assertEqual(self.units(), {time(10, 0): 2, time(12, 0): 1})
+        self.assertIn('2 horarios', out.getvalue())
@@ -0,0 +1,129 @@
+"""
+Tests para los datasets de reportes y sus renderizadores
+"""
+import csv
+import json
+from datetime import timedelta, time
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.renderers import export_file
+from dashboard.reports import get_report
+
+
+class ReportTestMixin:
+    """Pagos de hoy y de hace 40 días en dos servicios"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username='admin', password='adminpass123', email='admin@example.com'
+        )
+        self.user = User.objects.create_user(username='ana', password='testpass123')
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.massage = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+        self.facial = Service.objects.create(
+            name='Facial', category=category, duration_minutes=60, price=80.00, max_capacity=5
+        )
+        self.today = timezone.localdate()
+        self.book(self.massage, 'completed')
+        self.book(self.facial, 'confirmed')
+        self.book(self.facial, 'completed', days_ago=40)
+        self.book(self.massage, 'pending', paid=False)
+
+    def book(self, service, status, days_ago=0, paid=True):
+        return Booking.objects.create(
+            user=self.user, service=service, booking_date=self.today - timedelta(days=days_ago),
+            booking_time=time(10, 0), total_price=service.price, status=status, paid=paid,
+            payment_date=timezone.now() - timedelta(days=days_ago) if paid else None,
+        )
+
+    def revenue(self, **params):
+        summary, by_service = get_report('revenue', params).sections
+        return [row[1] for row in summary.rows], by_service.rows
+
+
+class RevenueReportTest(ReportTestMixin, TestCase):
+    """Tests para el dataset de ingresos con filtros"""
+
+    def test_without_filters(self):
+        """Verificar el resumen y el desglose por servicio leídos del acumulado"""
+        summary, by_service = self.revenue()
+        self.assertEqual(summary[:2], [Decimal('210.00'), Decimal('130.00')])
+        self.assertEqual(by_service, [('Facial', 2, Decimal('160.00')), ('Masaje', 1, Decimal('50.00'))])
+
+    def test_date_status_and_service_filters(self):
+        """Verificar el rango de fechas, el estado (desde las reservas) y el servicio"""
+        week_ago = (self.today - timedelta(days=7)).isoformat()
+        self.assertEqual(self.revenue(start=week_ago)[0][0], Decimal('130.00'))
+        self.assertEqual(self.revenue(end=week_ago)[0][0], Decimal('80.00'))
+        self.assertEqual(self.revenue(status='completed')[1], [
+            ('Facial', 1, Decimal('80.00')), ('Masaje', 1, Decimal('50.00')),
+        ])
+        self.assertEqual(self.revenue(status='completed', start=week_ago, end=self.today.isoformat())[0][0], Decimal('50.00'))
+        self.assertEqual(self.revenue(service=str(self.facial.id))[0][0], Decimal('160.00'))
+        # Valores inválidos se ignoran
+        self.assertEqual(self.revenue(start='ayer', status='pagada', service='x')[0][0], Decimal('210.00'))
+
+    def test_memoized_across_formats(self):
+        """Verificar que el mismo reporte en otro formato no vuelve a calcularse"""
+        export_file('revenue', 'pdf', {'status': 'completed'}).close()
+        with self.assertNumQueries(1):  # Solo la versión de los datos
+            export_file('revenue', 'xlsx', {'status': 'completed', 'date': 'ignorado'}).close()
+        self.book(self.massage, 'completed')
+        self.assertEqual(self.revenue(status='completed')[0][0], Decimal('180.00'))
+
+
+class RendererTest(ReportTestMixin, TestCase):
+    """Tests para los renderizadores CSV y JSON y la vista genérica"""
+
+    def test_csv_sections(self):
+        """Verificar las secciones del CSV separadas por una línea vacía"""
+        with export_file('revenue', 'csv', {}) as file:
+            rows = list(csv.reader(file.read().decode('utf-8-sig').splitlines()))
+        self.assertEqual(rows[0], ['Métrica', 'Monto'])
+        self.assertEqual(rows[1], ['Ingresos Totales', '210.00'])
+        self.assertEqual(rows[4:7], [[], ['Ingresos por Servicio'], ['Servicio', 'Reservas', 'Ingresos']])
+
+    def test_json(self):
+        """Verificar el JSON con columnas tipadas y filas"""
+        with export_file('history', 'json', {'status': 'confirmed'}) as file:
+            data = json.load(file)
+        self.assertEqual(data['params'], {'status': 'confirmed'})
+        section, = data['sections']
+        self.assertEqual(section['columns'][9], {'label': 'Pagado', 'format': 'bool'})
+        row, = section['rows']
+        self.assertEqual((row[7], row[8], row[9], row[11]), ('Facial', 'Confirmada', True, '80.00'))
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    async def test_export_view(self):
+        """Verificar la exportación genérica por tipo y formato, y el formulario de la página de ingresos"""
+        await sync_to_async(self.client.force_login)(self.admin)
+        self.async_client.cookies = self.client.cookies
+
+        response = await self.async_client.get(
+            reverse('dashboard:export_report', args=['revenue', 'json']), {'service': str(self.massage.id)}
+        )
+        self.assertEqual(response['Content-Type'], 'application/json')
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        await sync_to_async(response.close)()
+        self.assertEqual(json.loads(content)['sections'][1]['rows'], [['Masaje', 1, '50.00']])
+
+        response = await self.async_client.get(reverse('dashboard:export_report', args=['revenue', 'doc']))
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get(reverse('dashboard:revenue'))
+        self.assertContains(response, reverse('dashboard:export_report', args=['revenue', 'xlsx']))
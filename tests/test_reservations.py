@@ -0,0 +1,111 @@
+"""
+Tests para la reserva atómica de capacidad
+"""
+import threading
+from datetime import timedelta, time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from services.models import Category, Service
+from bookings.models import Booking, ServiceDayLock
+from bookings.reservations import CapacityError, reserve_booking, lock_service_days
+
+
+def make_service(max_capacity):
+    category = Category.objects.create(name='Masajes', icon='🧖')
+    return Service.objects.create(
+        name='Masaje Descontracturante',
+        category=category,
+        duration_minutes=90,
+        price=70.00,
+        max_capacity=max_capacity
+    )
+
+
+def make_booking(user, service, booking_date, start):
+    return Booking(
+        user=user,
+        service=service,
+        booking_date=booking_date,
+        booking_time=start,
+        contact_phone='1234567890',
+        total_price=service.price
+    )
+
+
+class ReserveBookingTest(TestCase):
+    """Tests para reserve_booking"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.service = make_service(max_capacity=1)
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+    
+    def test_reserve_saves_booking(self):
+        """Verificar que una reserva con capacidad se guarda"""
+        booking = reserve_booking(make_booking(self.user, self.service, self.tomorrow, time(10, 0)))
+        self.assertIsNotNone(booking.pk)
+        self.assertEqual(ServiceDayLock.objects.get(service=self.service, date=self.tomorrow).version, 1)
+    
+    def test_reserve_rejects_overlap(self):
+        """Verificar que una reserva solapada sin capacidad se rechaza"""
+        reserve_booking(make_booking(self.user, self.service, self.tomorrow, time(10, 0)))
+        with self.assertRaises(CapacityError):
+            reserve_booking(make_booking(self.user, self.service, self.tomorrow, time(11, 0)))
+        self.assertEqual(Booking.objects.count(), 1)
+    
+    def test_lock_service_days_creates_rows_once(self):
+        """Verificar que el bloqueo crea una fila por servicio y día"""
+        pairs = [(self.service.id, self.tomorrow), (self.service.id, self.tomorrow)]
+        lock_service_days(pairs)
+        lock_service_days(pairs)
+        lock = ServiceDayLock.objects.get()
+        self.assertEqual(lock.version, 2)
+
+
+class ConcurrentReservationTest(TransactionTestCase):
+    """Prueba de estrés multi-hilo: nunca se supera la capacidad"""
+    
+    THREADS = 12
+    CAPACITY = 3
+    
+    def setUp(self):
+        self.service = make_service(max_capacity=self.CAPACITY)
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='testpass123')
+            for i in range(self.THREADS)
+        ]
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+    
+    def test_no_overbooking_under_concurrency(self):
+        """Verificar que hilos concurrentes no sobre-reservan el mismo horario"""
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+        
+        def worker(user, start):
+            try:
+                barrier.wait()
+                reserve_booking(make_booking(user, self.service, self.tomorrow, start))
+                outcomes.append('ok')
+            except CapacityError:
+                outcomes.append('full')
+            finally:
+                connection.close()
+        
+        # Horarios escalonados que se solapan todos entre 10:45 y 11:30
+        starts = [time(10, 0), time(10, 15), time(10, 30), time(10, 45)]
+        threads = [
+            threading.Thread(target=worker, args=(user, starts[i % len(starts)]))
+            for i, user in enumerate(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(outcomes), self.THREADS)
+        self.assertEqual(outcomes.count('ok'), self.CAPACITY)
+        self.assertEqual(Booking.objects.filter(service=self.service).count(), self.CAPACITY)
@@ -0,0 +1,126 @@
+"""
+Tests para el acumulado diario de ingresos
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.models import DailyRevenue
+from dashboard.revenue import revenue_breakdown, revenue_summary
+
+
+class DailyRevenueTest(TestCase):
+    """Tests para el mantenimiento incremental de DailyRevenue"""
+
+    def setUp(self):
+        """Crear dos servicios de categorías distintas"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.massages = Category.objects.create(name='Masajes', icon='🧖')
+        self.facials = Category.objects.create(name='Faciales', icon='✨')
+        self.massage = Service.objects.create(
+            name='Masaje', category=self.massages, duration_minutes=60, price=50.00, max_capacity=5
+        )
+        self.facial = Service.objects.create(
+            name='Facial', category=self.facials, duration_minutes=60, price=80.00, max_capacity=5
+        )
+        self.today = timezone.localdate()
+
+    def book(self, service, paid=False, **kwargs):
+        return Booking.objects.create(
+            user=self.user,
+            service=service,
+            booking_date=self.today,
+            booking_time=time(10, 0),
+            total_price=service.price,
+            paid=paid,
+            payment_date=timezone.now() if paid else None,
+            **kwargs
+        )
+
+    def rollup(self):
+        return {
+            (row.date, row.service_id): (row.revenue, row.paid_count)
+            for row in DailyRevenue.objects.filter(paid_count__gt=0)
+        }
+
+    def test_payment_changes_update_rollup(self):
+        """Verificar que pagar, cambiar el monto y revertir el pago ajustan el acumulado"""
+        booking = self.book(self.massage)
+        self.assertEqual(self.rollup(), {})
+
+        booking.paid = True
+        booking.payment_date = timezone.now()
+        booking.save()
+        self.assertEqual(self.rollup(), {(self.today, self.massage.id): (Decimal('50.00'), 1)})
+
+        booking.total_price = Decimal('65.00')
+        booking.save()
+        self.assertEqual(self.rollup(), {(self.today, self.massage.id): (Decimal('65.00'), 1)})
+
+        booking.payment_date = timezone.now() - timedelta(days=2)
+        booking.save()
+        self.assertEqual(
+            self.rollup(),
+            {(timezone.localdate(booking.payment_date), self.massage.id): (Decimal('65.00'), 1)}
+        )
+
+        booking.paid = False
+        booking.save()
+        self.assertEqual(self.rollup(), {})
+
+    def test_delete_paid_booking(self):
+        """Verificar que borrar una reserva pagada la descuenta"""
+        self.book(self.massage, paid=True).delete()
+        self.assertEqual(self.rollup(), {})
+
+    def test_summary_and_breakdown(self):
+        """Verificar los totales y desgloses leídos del acumulado"""
+        self.book(self.massage, paid=True)
+        self.book(self.facial, paid=True)
+        self.book(self.facial, paid=True)
+        self.book(self.facial)
+
+        summary = revenue_summary(self.today)
+        self.assertEqual(summary['total'], Decimal('210.00'))
+        self.assertEqual(summary['today'], Decimal('210.00'))
+        self.assertEqual(
+            [(row['category__name'], row['total'], row['count']) for row in revenue_breakdown('category__name')],
+            [('Faciales', Decimal('160.00'), 2), ('Masajes', Decimal('50.00'), 1)]
+        )
+
+    def test_backfill_command(self):
+        """Verificar que el comando reconstruye el acumulado por tramos"""
+        self.book(self.massage, paid=True)
+        old = self.book(self.facial, paid=True)
+        Booking.objects.filter(id=old.id).update(payment_date=timezone.now() - timedelta(days=40))
+        DailyRevenue.objects.update(revenue=0, paid_count=0)
+
+        out = StringIO()
+        call_command('backfill_revenue', chunk_days=7, stdout=out)
+        self.assertEqual(self.rollup(), {
+            (self.today, self.massage.id): (Decimal('50.00'), 1),
+            (timezone.localdate(timezone.now() - timedelta(days=40)), self.facial.id): (Decimal('80.00'), 1),
+        })
+        self.assertIn('2 filas', out.getvalue())
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_revenue_report_reads_rollup(self):
+        """Verificar que el reporte de ingresos usa el acumulado"""
+        User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        self.book(self.facial, paid=True)
+        self.client.login(username='admin', password='adminpass123')
+        response = self.client.get(reverse('dashboard:revenue'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_all_time'], Decimal('80.00'))
+        self.assertEqual(response.context['daily_revenue'][0]['count'], 1)
@@ -0,0 +1,103 @@
+"""
+Tests para la búsqueda de próximos horarios libres
+"""
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.models import Category, Service, Availability
+from services.search import find_earliest_slots
+from bookings.models import Booking
+
+
+class EarliestSlotsTest(TestCase):
+    """Tests para find_earliest_slots y su endpoint"""
+
+    def setUp(self):
+        """Crear dos faciales con horarios distintos y uno de otra categoría"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.facials = Category.objects.create(name='Faciales', icon='✨')
+        other = Category.objects.create(name='Masajes', icon='🧖')
+        self.morning = self.service('Facial Hidratante', self.facials, time(9, 0), time(11, 0))
+        self.afternoon = self.service('Facial Premium', self.facials, time(15, 0), time(17, 0), duration=90)
+        self.massage = self.service('Masaje', other, time(8, 0), time(9, 0))
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def service(self, name, category, start, end, duration=60):
+        service = Service.objects.create(
+            name=name,
+            category=category,
+            duration_minutes=duration,
+            price=50.00,
+            max_capacity=1
+        )
+        for day in range(7):
+            Availability.objects.create(service=service, day_of_week=day, start_time=start, end_time=end)
+        return service
+
+    def services(self, **filters):
+        return Service.objects.filter(**filters).prefetch_related('availabilities').order_by('id')
+
+    def test_merges_services_in_time_order(self):
+        """Verificar que los horarios de varios servicios salen en orden cronológico"""
+        slots = find_earliest_slots(
+            self.services(category=self.facials), self.tomorrow, self.tomorrow + timedelta(days=5), 5
+        )
+        self.assertEqual(
+            [(slot.date, slot.time, slot.service) for slot in slots],
+            [
+                (self.tomorrow, time(9, 0), self.morning),
+                (self.tomorrow, time(9, 30), self.morning),
+                (self.tomorrow, time(10, 0), self.morning),
+                (self.tomorrow, time(15, 0), self.afternoon),
+                (self.tomorrow, time(15, 30), self.afternoon),
+            ]
+        )
+
+    def test_skips_full_slots(self):
+        """Verificar que los horarios llenos no aparecen"""
+        Booking.objects.create(
+            user=self.user,
+            service=self.morning,
+            booking_date=self.tomorrow,
+            booking_time=time(9, 0),
+            total_price=50.00
+        )
+        slots = find_earliest_slots(self.services(id=self.morning.id), self.tomorrow, self.tomorrow, 5)
+        self.assertEqual([slot.time for slot in slots], [time(10, 0)])
+
+    def test_stops_early_with_wide_window(self):
+        """Verificar que una ventana amplia no calcula calendarios completos"""
+        services = list(self.services(category=self.facials))
+        with self.assertNumQueries(2):  # Primer día de cada servicio
+            find_earliest_slots(services, self.tomorrow, self.tomorrow + timedelta(days=90), 3)
+
+    def test_endpoint(self):
+        """Verificar el endpoint de búsqueda con filtro de duración"""
+        url = reverse('services:earliest')
+        response = self.client.get(url, {
+            'category': self.facials.id,
+            'duration': 90,
+            'from': self.tomorrow.isoformat(),
+            'limit': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['service'] for result in results], [self.afternoon.id] * 2)
+        self.assertEqual(results[0]['time'], '15:00')
+
+        response = self.client.get(url, {
+            'service': [self.massage.id, self.morning.id],
+            'from': self.tomorrow.isoformat(),
+            'limit': 1,
+        })
+        self.assertEqual(response.json()['results'][0]['service'], self.massage.id)
+
+    def test_endpoint_validation(self):
+        """Verificar errores de parámetros"""
+        url = reverse('services:earliest')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'category': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'category': self.facials.id, 'limit': 500}).status_code, 400)
@@ -0,0 +1,134 @@
+"""
+Tests para las reservas recurrentes
+"""
+import time as clock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from accounts.models import UserProfile
+from services.models import Category, Service, Availability
+from bookings.models import Booking, BookingSeries, ServiceDayOccupancy
+from bookings.series import create_series, SeriesConflictError
+
+
+class BookingSeriesTest(TestCase):
+    """Tests para crear y cancelar series de reservas"""
+
+    def setUp(self):
+        """Crear servicio disponible de lunes a viernes"""
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        UserProfile.objects.create(user=self.user)
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Relajante',
+            category=self.category,
+            duration_minutes=60,
+            price=50.00,
+            max_capacity=1
+        )
+        for day in range(5):
+            Availability.objects.create(
+                service=self.service,
+                day_of_week=day,
+                start_time=time(9, 0),
+                end_time=time(19, 0)
+            )
+        today = timezone.localdate()
+        # Próximo martes
+        self.tuesday = today + timedelta(days=(1 - today.weekday()) % 7 or 7)
+
+    def series(self, occurrences=12, start_date=None, interval_weeks=1):
+        return BookingSeries(
+            user=self.user,
+            service=self.service,
+            start_date=start_date or self.tuesday,
+            booking_time=time(18, 0),
+            interval_weeks=interval_weeks,
+            occurrences=occurrences,
+            contact_phone='1234567890'
+        )
+
+    def test_series_creates_all_occurrences(self):
+        """Verificar que una serie crea una reserva por semana"""
+        bookings, conflicts = create_series(self.series())
+        self.assertEqual(len(bookings), 12)
+        self.assertEqual(conflicts, [])
+        dates = list(Booking.objects.order_by('booking_date').values_list('booking_date', flat=True))
+        self.assertEqual(dates, [self.tuesday + timedelta(weeks=week) for week in range(12)])
+        self.assertEqual(ServiceDayOccupancy.objects.filter(booked_units=1).count(), 12)
+
+    def test_conflict_rejects_whole_series(self):
+        """Verificar que por defecto un conflicto rechaza la serie completa"""
+        Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tuesday + timedelta(weeks=3),
+            booking_time=time(17, 30),
+            total_price=50.00
+        )
+        with self.assertRaises(SeriesConflictError) as context:
+            create_series(self.series())
+        self.assertEqual([day for day, _ in context.exception.conflicts], [self.tuesday + timedelta(weeks=3)])
+        self.assertFalse(BookingSeries.objects.exists())
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_skip_conflicts(self):
+        """Verificar que se pueden reservar solo las fechas libres"""
+        saturday = self.tuesday + timedelta(days=4)
+        # Ninguna fecha disponible: no hay nada que reservar
+        with self.assertRaises(SeriesConflictError):
+            create_series(self.series(occurrences=3, start_date=saturday), skip_conflicts=True)
+
+        Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tuesday,
+            booking_time=time(18, 0),
+            total_price=50.00
+        )
+        bookings, conflicts = create_series(self.series(occurrences=4), skip_conflicts=True)
+        self.assertEqual(len(bookings), 3)
+        self.assertEqual(len(conflicts), 1)
+
+    def test_cancel_series_and_single_occurrence(self):
+        """Verificar que se puede cancelar una sesión o la serie completa"""
+        bookings, _ = create_series(self.series(occurrences=4))
+        Booking.objects.get(id=bookings[0].id).cancel()
+        series = BookingSeries.objects.get()
+        self.assertEqual(series.cancel(), 3)
+        self.assertFalse(Booking.objects.filter(status__in=Booking.ACTIVE_STATUSES).exists())
+        self.assertFalse(ServiceDayOccupancy.objects.filter(booked_units__gt=0).exists())
+
+    def test_large_series_query_count(self):
+        """Verificar que una serie de cientos de sesiones usa pocas consultas y es rápida"""
+        started = clock.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            bookings, _ = create_series(self.series(occurrences=260, interval_weeks=1))
+        self.assertEqual(len(bookings), 260)
+        self.assertLess(clock.perf_counter() - started, 1.0)
+        # Solo crecen los lotes de INSERT/UPDATE según el límite de parámetros
+        self.assertLess(len(queries), 25)
+
+    def test_series_view(self):
+        """Verificar la vista de creación y cancelación de series"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.post(reverse('bookings:series_create', args=[self.service.id]), {
+            'start_date': self.tuesday.isoformat(),
+            'booking_time': '18:00',
+            'interval_weeks': 2,
+            'occurrences': 5,
+            'contact_phone': '1234567890',
+        })
+        self.assertRedirects(response, reverse('bookings:list'), fetch_redirect_response=False)
+        series = BookingSeries.objects.get()
+        self.assertEqual(series.bookings.count(), 5)
+
+        response = self.client.post(reverse('bookings:series_cancel', args=[series.id]))
+        self.assertRedirects(response, reverse('bookings:list'), fetch_redirect_response=False)
+        self.assertEqual(series.bookings.filter(status='cancelled').count(), 5)
@@ -0,0 +1,102 @@
+"""
+Tests para las estadísticas por servicio y categoría
+"""
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from services.models import Category, Service
+from bookings.models import Booking, Review
+from dashboard.service_stats import compute_service_stats, get_service_stats
+
+
+class ServiceStatsTest(TestCase):
+    """Tests para compute_service_stats y get_service_stats"""
+
+    def setUp(self):
+        """Crear servicios con reservas recientes y antiguas"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.massages = Category.objects.create(name='Masajes', icon='🧖')
+        self.empty = Category.objects.create(name='Vacía', icon='')
+        self.massage = Service.objects.create(
+            name='Masaje', category=self.massages, duration_minutes=60, price=50.00, max_capacity=5
+        )
+        self.stones = Service.objects.create(
+            name='Piedras', category=self.massages, duration_minutes=60, price=70.00, max_capacity=5
+        )
+        self.today = timezone.localdate()
+
+    def book(self, service, days_ago=0, rating=None):
+        booking = Booking.objects.create(
+            user=self.user,
+            service=service,
+            booking_date=self.today - timedelta(days=days_ago),
+            booking_time=time(10, 0),
+            total_price=service.price,
+        )
+        if rating:
+            Review.objects.create(booking=booking, rating=rating)
+        return booking
+
+    def test_metrics_without_fan_out(self):
+        """Verificar conteos, ingresos y calificaciones sin duplicar filas"""
+        self.book(self.massage, rating=5)
+        self.book(self.massage, rating=3)
+        self.book(self.massage)
+        self.book(self.stones, days_ago=100, rating=4)
+
+        with self.assertNumQueries(2):
+            stats = compute_service_stats(self.today)
+        massage, stones = stats['services']
+        self.assertEqual(
+            (massage['name'], massage['total_bookings'], massage['total_revenue'], massage['avg_rating']),
+            ('Masaje', 3, Decimal('150.00'), 4.0)
+        )
+        self.assertEqual((stones['total_bookings'], stones['total_revenue']), (1, Decimal('70.00')))
+        self.assertEqual(
+            [(c['name'], c['total_services'], c['total_bookings']) for c in stats['categories']],
+            [('Masajes', 2, 4), ('Vacía', 0, 0)]
+        )
+
+    def test_time_window(self):
+        """Verificar que la ventana excluye reservas fuera del rango"""
+        self.book(self.massage)
+        self.book(self.stones, days_ago=100, rating=4)
+
+        stones = next(s for s in compute_service_stats(self.today, 90)['services'] if s['id'] == self.stones.id)
+        self.assertEqual((stones['total_bookings'], stones['total_revenue'], stones['avg_rating']), (0, 0, None))
+
+    def test_cached_until_change(self):
+        """Verificar que el resultado se cachea hasta que cambia una reserva"""
+        self.book(self.massage)
+        get_service_stats(30)
+        with self.assertNumQueries(1):  # Solo la versión de los datos
+            get_service_stats(30)
+
+        self.book(self.massage)
+        self.assertEqual(get_service_stats(30)['services'][0]['total_bookings'], 2)
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_services_stats_view_window(self):
+        """Verificar el filtro de ventana en la página de estadísticas"""
+        User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        self.book(self.stones, days_ago=100)
+        self.client.login(username='admin', password='adminpass123')
+
+        response = self.client.get(reverse('dashboard:services'), {'days': '90'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['days'], 90)
+        self.assertEqual(sum(s['total_bookings'] for s in response.context['services']), 0)
+
+        response = self.client.get(reverse('dashboard:services'), {'days': '7'})
+        self.assertIsNone(response.context['days'])
+        self.assertEqual(sum(s['total_bookings'] for s in response.context['services']), 1)
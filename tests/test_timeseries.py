@@ -0,0 +1,113 @@
+"""
+Tests para las series temporales de ingresos
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.db.models import Count, Sum
+
+from services.models import Category, Service
+from bookings.models import Booking
+from dashboard.revenue import revenue_series
+from dashboard.timeseries import bucket_start, time_series
+
+
+class TimeSeriesTest(TestCase):
+    """Tests para time_series y revenue_series"""
+
+    def setUp(self):
+        """Crear un servicio y reservas pagadas en distintos meses"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje', category=category, duration_minutes=60, price=50.00, max_capacity=5
+        )
+
+    def pay(self, paid_at):
+        return Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=paid_at.date(),
+            booking_time=time(10, 0),
+            total_price=self.service.price,
+            paid=True,
+            payment_date=paid_at,
+        )
+
+    def test_bucket_start(self):
+        """Verificar el inicio de período para cada granularidad"""
+        value = date(2026, 5, 14)
+        self.assertEqual(bucket_start(value, 'day'), value)
+        self.assertEqual(bucket_start(value, 'week'), date(2026, 5, 11))
+        self.assertEqual(bucket_start(value, 'month'), date(2026, 5, 1))
+        self.assertEqual(bucket_start(value, 'quarter'), date(2026, 4, 1))
+
+    @override_settings(TIME_ZONE='America/Mexico_City')
+    def test_buckets_use_local_timezone(self):
+        """Verificar que un pago nocturno cae en su día local y no en el de UTC"""
+        tz = ZoneInfo('America/Mexico_City')
+        self.pay(datetime(2026, 3, 31, 23, 30, tzinfo=tz))
+        self.pay(datetime(2026, 4, 1, 9, 0, tzinfo=tz))
+
+        days = time_series(
+            Booking.objects.filter(paid=True), 'payment_date', 'day', date(2026, 3, 31), date(2026, 4, 1),
+            count=Count('id'),
+        )
+        self.assertEqual([(row['bucket'], row['count']) for row in days], [
+            (date(2026, 3, 31), 1), (date(2026, 4, 1), 1),
+        ])
+
+        quarters = time_series(
+            Booking.objects.filter(paid=True), 'payment_date', 'quarter', date(2026, 1, 1), date(2026, 6, 30),
+            count=Count('id'),
+        )
+        self.assertEqual([(row['label'], row['count']) for row in quarters], [('T1 2026', 1), ('T2 2026', 1)])
+
+    def test_revenue_series_by_month(self):
+        """Verificar la serie mensual leída del acumulado diario"""
+        tz = ZoneInfo('UTC')
+        self.pay(datetime(2025, 12, 20, 12, 0, tzinfo=tz))
+        self.pay(datetime(2026, 1, 5, 12, 0, tzinfo=tz))
+        self.pay(datetime(2026, 1, 25, 12, 0, tzinfo=tz))
+
+        series = revenue_series(date(2025, 12, 1), date(2026, 1, 31), 'month')
+        self.assertEqual(
+            [(row['bucket'], row['total'], row['count'], row['average']) for row in series],
+            [
+                (date(2025, 12, 1), Decimal('50.00'), 1, Decimal('50.00')),
+                (date(2026, 1, 1), Decimal('100.00'), 2, Decimal('50.00')),
+            ]
+        )
+        self.assertEqual(revenue_series(date(2026, 1, 10), date(2026, 1, 31), 'month')[0]['count'], 1)
+
+    def test_invalid_granularity(self):
+        """Verificar error con granularidad inválida"""
+        with self.assertRaises(ValueError):
+            time_series(Booking.objects.all(), 'payment_date', 'year', date(2026, 1, 1), date(2026, 1, 2),
+                        total=Sum('total_price'))
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_report_granularity_switch(self):
+        """Verificar el selector de granularidad del reporte de ingresos"""
+        User.objects.create_superuser(username='admin', password='adminpass123', email='admin@example.com')
+        self.pay(datetime(2026, 2, 10, 12, 0, tzinfo=ZoneInfo('UTC')))
+        self.client.login(username='admin', password='adminpass123')
+
+        response = self.client.get(reverse('dashboard:revenue'), {
+            'granularity': 'week', 'start': '2026-01-01', 'end': '2026-03-31',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['granularity'], 'week')
+        self.assertContains(response, '<!-- Ingresos por período -->', count=1)
+        self.assertEqual([row['bucket'] for row in response.context['daily_revenue']], [date(2026, 2, 9)])
+
+        response = self.client.get(reverse('dashboard:revenue'), {'granularity': 'decade', 'start': 'ayer'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['granularity'], 'day')
@@ -0,0 +1,173 @@
+"""
+Tests para la lista de espera
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core import mail
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+
+from accounts.models import UserProfile
+from services.models import Category, Service, Availability
+from bookings.models import Booking, Waitlist
+from bookings.admin import BookingAdmin
+
+
+class WaitlistTest(TestCase):
+    """Tests para la promoción automática de la lista de espera"""
+
+    def setUp(self):
+        """Crear servicio con capacidad 1 y una reserva que lo llena"""
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.other = User.objects.create_user(username='otro', email='otro@example.com', password='testpass123')
+        UserProfile.objects.create(user=self.user)
+        UserProfile.objects.create(user=self.other)
+        self.category = Category.objects.create(name='Masajes', icon='🧖')
+        self.service = Service.objects.create(
+            name='Masaje Relajante',
+            category=self.category,
+            duration_minutes=60,
+            price=50.00,
+            max_capacity=1
+        )
+        for day in range(7):
+            Availability.objects.create(
+                service=self.service,
+                day_of_week=day,
+                start_time=time(9, 0),
+                end_time=time(18, 0)
+            )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            user=self.user,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=time(10, 0),
+            total_price=50.00
+        )
+
+    def wait(self, start, user=None):
+        return Waitlist.objects.create(
+            user=user or self.other,
+            service=self.service,
+            booking_date=self.tomorrow,
+            booking_time=start,
+            contact_phone='1234567890'
+        )
+
+    def test_cancellation_promotes_first_in_line(self):
+        """Verificar que cancelar promueve a la primera entrada en orden de llegada"""
+        first = self.wait(time(10, 30))
+        second = self.wait(time(10, 0), user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.cancel()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, 'promoted')
+        self.assertEqual(first.booking.booking_time, time(10, 30))
+        self.assertEqual(second.status, 'waiting')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Tienes lugar', mail.outbox[0].subject)
+
+    def test_non_overlapping_entries_untouched(self):
+        """Verificar que solo se consideran entradas que se cruzan con el intervalo liberado"""
+        entry = self.wait(time(14, 0))
+        self.booking.cancel()
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'waiting')
+
+    def test_reschedule_releases_original_interval(self):
+        """Verificar que mover una reserva libera su horario original"""
+        entry = self.wait(time(10, 0))
+        self.booking.booking_time = time(15, 0)
+        self.booking.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'promoted')
+
+    def test_admin_bulk_cancel_promotes(self):
+        """Verificar que la acción masiva del admin también promueve"""
+        entry = self.wait(time(10, 0))
+        BookingAdmin(Booking, None)._update_status(Booking.objects.all(), 'cancelled')
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'promoted')
+
+    def test_past_entries_expire(self):
+        """Verificar que las entradas de horarios pasados vencen en la promoción y en la limpieza"""
+        yesterday = self.tomorrow - timedelta(days=2)
+        past_booking = Booking.objects.create(
+            user=self.user, service=self.service, booking_date=yesterday,
+            booking_time=time(10, 0), total_price=50.00
+        )
+        released = self.wait(time(10, 0))
+        Waitlist.objects.filter(id=released.id).update(booking_date=yesterday)
+        past_booking.status = 'cancelled'
+        past_booking.save()
+        released.refresh_from_db()
+        self.assertEqual(released.status, 'expired')
+        self.assertIsNone(released.booking)
+
+        untouched = self.wait(time(16, 0))
+        stale = self.wait(time(14, 0))
+        Waitlist.objects.filter(id=stale.id).update(booking_date=yesterday)
+        out = StringIO()
+        call_command('purge_expired_holds', stdout=out)
+        self.assertIn('1 entradas', out.getvalue())
+        self.assertEqual(Waitlist.objects.get(id=stale.id).status, 'expired')
+        self.assertEqual(Waitlist.objects.get(id=untouched.id).status, 'waiting')
+
+    def test_join_waitlist_view(self):
+        """Verificar que un usuario puede anotarse en la lista de espera"""
+        self.client.login(username='otro', password='testpass123')
+        data = {
+            'booking_date': self.tomorrow.isoformat(),
+            'booking_time': '10:00',
+            'contact_phone': '1234567890',
+        }
+        response = self.client.post(reverse('bookings:waitlist_join', args=[self.service.id]), data)
+        self.assertRedirects(response, reverse('bookings:list'), fetch_redirect_response=False)
+        self.assertTrue(Waitlist.objects.filter(user=self.other, status='waiting').exists())
+
+        response = self.client.post(reverse('bookings:waitlist_join', args=[self.service.id]), data)
+        self.assertEqual(Waitlist.objects.filter(user=self.other).count(), 1)
+
+    def test_join_requires_full_slot_within_availability(self):
+        """Verificar que solo se acepta un horario lleno y dentro de la disponibilidad"""
+        self.client.login(username='otro', password='testpass123')
+        url = reverse('bookings:waitlist_join', args=[self.service.id])
+        for start in ('18:15', '14:00'):
+            self.client.post(url, {
+                'booking_date': self.tomorrow.isoformat(),
+                'booking_time': start,
+                'contact_phone': '1234567890',
+            })
+        self.assertFalse(Waitlist.objects.exists())
+
+    def test_promotion_expires_entries_outside_availability(self):
+        """Verificar que una entrada que quedó fuera de la disponibilidad vence en lugar de reservarse"""
+        entry = self.wait(time(10, 0))
+        Availability.objects.filter(day_of_week=self.tomorrow.weekday()).update(start_time=time(12, 0))
+        self.booking.cancel()
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'expired')
+        self.assertFalse(Booking.objects.filter(user=self.other).exists())
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_full_slot_offers_waitlist(self):
+        """Verificar que un horario lleno ofrece unirse a la lista de espera"""
+        self.client.login(username='otro', password='testpass123')
+        response = self.client.post(reverse('bookings:create', args=[self.service.id]), {
+            'booking_date': self.tomorrow.isoformat(),
+            'booking_time': '10:00',
+            'contact_phone': '1234567890',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['capacity_full'])
+        self.assertContains(response, reverse('bookings:waitlist_join', args=[self.service.id]))